@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The /events/ Server-Sent Events stream holds connections open and needs to
+be served from here (e.g. uvicorn DolphinFinder_project.asgi:application)
+rather than from the WSGI application.
 """
 
 import os
@@ -67,6 +67,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.MetricsMiddleware',  # Outermost, so request timings cover the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,6 +76,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
+    'backend.middleware.ReplicaPinMiddleware',  # Lets safe requests read from replicas; pins recent writers to the primary
     'backend.middleware.RequestLoggingMiddleware',  # Custom middleware for logging requests and responses
     #'backend.middleware.JWTDebugMiddleware',  # Custom middleware for JWT debugging
 ]
@@ -114,15 +116,38 @@ if not host_ID or not supabase_password:
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',  # PostgreSQL database engine
+        'ENGINE': 'backend.db',  # PostgreSQL engine with pooled connections (see backend/db)
         'HOST': f'db.{host_ID}.supabase.co',  # Supabase database host
         'NAME': 'postgres',  # Database name
         'USER': 'postgres',  # Database user
         'PASSWORD': supabase_password,  # Database password
         'PORT': '5432',  # Default PostgreSQL port
+        # Connections are returned to the pool when Django closes them at the end of
+        # each request, so leave CONN_MAX_AGE at its default of 0
+        'POOL': {
+            'min_size': 2,  # Connections opened on first use and kept open
+            'max_size': 10,  # Upper bound per process; checkouts beyond it wait
+            'timeout': 10,  # Seconds to wait for a free connection before OperationalError
+            'max_lifetime': 1800,  # Seconds before a connection is recycled
+            'max_idle': 300,  # Seconds an idle connection above min_size is kept
+            'ping_after': 5,  # Idle seconds after which checkout runs SELECT 1
+        },
     }
 }
 
+# Optional read replicas, e.g. SUPABASE_REPLICA_HOSTS=host-a,host-b. Each one is
+# added as replica_<n> with the primary's credentials and pool settings.
+for index, replica_host in enumerate(h.strip() for h in os.getenv('SUPABASE_REPLICA_HOSTS', '').split(',') if h.strip()):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'TEST': {'MIRROR': 'default'},  # Tests read the test primary instead
+    }
+
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]  # Aliases that serve reads
+REPLICA_PIN_SECONDS = 10  # Seconds a user reads from the primary after writing; cover replication lag
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -178,6 +203,10 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'EXCEPTION_HANDLER': 'backend.utils.custom_exception_handler',
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.FastJSONRenderer',  # JSONRenderer's output, encoded with orjson when installed
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # JWT settings for Supabase integration
@@ -193,6 +222,72 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),  # Adjust as needed
 }
 
+# Cache backends. locmem is per process; point 'default' at a shared backend
+# (Redis, Memcached) in production so all workers see the same entries.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Response cache for public read endpoints (get_profile, get_user_projects, unfiltered homepage)
+RESPONSE_CACHE_ALIAS = 'default'  # Cache in CACHES that stores rendered responses
+RESPONSE_CACHE_TIMEOUT = 3600  # Seconds; entries are invalidated on write, this only bounds memory
+
+# Verified Supabase JWT cache (per process, LRU)
+SUPABASE_TOKEN_CACHE_SIZE = 1024  # Max number of verified tokens kept in memory
+SUPABASE_TOKEN_CACHE_TTL = 300  # Seconds; entries never outlive the token's exp claim
+
+# Authenticated profile cache (per process, with an optional shared tier)
+PROFILE_CACHE_SIZE = 1024  # Max number of profiles kept in memory per process
+PROFILE_CACHE_TTL = 60  # Seconds a per-process entry lives; bounds staleness across workers
+PROFILE_CACHE_ALIAS = None  # Name of a shared cache in CACHES (e.g. 'default'), or None to disable
+PROFILE_CACHE_SHARED_TTL = 300  # Seconds an entry lives in the shared tier
+
+# Cursor pagination for list endpoints (opt-in with ?page_size= or ?cursor=)
+PAGINATION_PAGE_SIZE = 20  # Default number of items per page
+PAGINATION_MAX_PAGE_SIZE = 100  # Upper bound for ?page_size=
+
+# Sparse fieldsets (?fields=) and the ?projection=summary project lists
+PROJECT_SUMMARY_LENGTH = 200  # Characters of content a summary returns, truncated by the database
+
+# Bulk join request moderation (/join-request/moderate/)
+JOIN_REQUEST_MODERATION_MAX_IDS = 100  # Max ids per request; use project_id to answer every pending request
+
+# /batch/ endpoint
+BATCH_MAX_REQUESTS = 20  # Max sub-requests per batch
+BATCH_MAX_WORKERS = 4  # Threads used for read-only batches; 1 runs everything sequentially
+
+# Bulk lookups (/profiles/?ids=, /projects/?ids=)
+BULK_LOOKUP_MAX_IDS = 100  # Max ids per request
+
+# Delta sync (/sync/?since=)
+SYNC_OVERLAP_SECONDS = 5  # Cursor rewind so late-committing rows are not skipped
+SYNC_TOMBSTONE_RETENTION_DAYS = 30  # Tombstones older than this can be pruned; older cursors get 410
+
+# Server-pushed events (/events/, needs the ASGI application)
+EVENTS_BROKER = 'backend.events.InProcessBroker'  # Dotted path to a backend.events.Broker; in-process only reaches one worker
+EVENTS_QUEUE_SIZE = 100  # Pending events per stream before the oldest are dropped
+EVENTS_KEEPALIVE_SECONDS = 15  # Interval of keep-alive comments on idle streams
+
+# Native async read views (backend/async_views.py)
+# Only worth turning on when served from asgi.py: under WSGI each async view
+# is run through async_to_sync(), which costs time and frees no threads
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "False") == "True"  # Route read endpoints to the async views
+
+# Streamed list responses (backend/streaming.py)
+STREAMING_MIN_ROWS = 1000  # Unpaginated lists longer than this are streamed rather than rendered whole; None disables
+STREAMING_CHUNK_SIZE = 500  # Rows fetched and rendered per chunk
+
+# Error logging (backend.utils.custom_exception_handler)
+ERROR_LOG_WINDOW_SECONDS = 60  # Identical errors within this window are counted, not logged again
+
+# Prometheus metrics (/metrics)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # Bearer token scrapers must send; unset, /metrics is only served with DEBUG on
+
 # Additional CORS settings
 CORS_ALLOW_METHODS = [
     'DELETE',
@@ -217,6 +312,12 @@ CORS_ALLOW_HEADERS = [
 
 
 
+# Debug records kept per logger (fraction, 0-1). Covers child loggers; unlisted loggers keep everything
+LOG_DEBUG_SAMPLE_RATES = {
+    'backend.middleware': float(os.getenv('LOG_REQUEST_SAMPLE_RATE', '0.01')),  # Per-request Request/Response lines
+}
+LOG_QUEUE_SIZE = 10000  # Records waiting for the log writer thread before new ones are dropped
+
 # Add detailed logging configuration
 LOGGING = {
     'version': 1,
@@ -231,6 +332,12 @@ LOGGING = {
             'style': '{',
         },
     },
+    'filters': {
+        'sample_debug': {
+            '()': 'backend.log_handlers.SamplingFilter',
+            'rates': LOG_DEBUG_SAMPLE_RATES,
+        },
+    },
     'handlers': {
         'console': {
             'level': 'DEBUG',
@@ -243,6 +350,14 @@ LOGGING = {
             'filename': 'debug.log',
             'formatter': 'verbose',
         },
+        # Formats and writes on a background thread; must sort after its targets
+        'queued': {
+            'level': 'DEBUG',
+            'class': 'backend.log_handlers.BackgroundHandler',
+            'targets': ['cfg://handlers.console', 'cfg://handlers.file'],
+            'queue_size': LOG_QUEUE_SIZE,
+            'filters': ['sample_debug'],
+        },
     },
     'loggers': {
         'django': {
@@ -251,18 +366,18 @@ LOGGING = {
             'propagate': True,
         },
         'django.request': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queued'],
             'level': 'DEBUG',
             'propagate': False,
         },
         'backend': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queued'],
             'level': 'DEBUG',
             'propagate': False,
         },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queued'],
         'level': 'INFO',
     },
 }
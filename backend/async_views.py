@@ -0,0 +1,270 @@
+# backend/async_views.py
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, MethodNotAllowed, NotAuthenticated, PermissionDenied
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from . import views
+from .authentication import SupabaseAuthentication
+from .budgets import query_budget
+from .cache import aresponse_cache_key, aget_cached_response, acache_response
+from .conditional import object_validators, aqueryset_validators, not_modified, set_validators
+from .models import Profile, Project, JoinRequest
+from .pagination import wants_pagination, apaginate_queryset, page_data
+from .permissions import IsAuthenticatedWithProfile
+from .renderers import FastJSONRenderer
+from .routers import read_from_primary
+from .search import search_projects
+from .streaming import wants_streaming, astreaming_response
+from .serializers import (
+    ProfileSerializer, parse_expand, expand_join_requests, parse_fields, parse_projection, parse_join_request_projection,
+    select_fields, project_values, project_feed_values,
+)
+
+# Native async versions of the read endpoints, routed instead of their sync
+# counterparts in views.py when ASYNC_READ_VIEWS is on. Under ASGI a request
+# waiting on the database or cache no longer pins a worker thread for its
+# whole lifetime. Writes on shared routes are handed to the sync views.
+#
+# GET responses carry the same status, body and Allow/Vary headers as the
+# sync views, but are always rendered as JSON: Accept is not negotiated, so
+# the browsable API is only served when ASYNC_READ_VIEWS is off. OPTIONS is
+# answered by the sync view itself.
+
+
+def async_api_view(methods, authentication_classes=None, permission_classes=(IsAuthenticatedWithProfile,)):
+    """
+    Minimal async counterpart of DRF's @api_view: authenticates with
+    authentication_classes (DEFAULT_AUTHENTICATION_CLASSES when None, as in
+    DRF), checks permissions, renders JSON and sends errors through the
+    configured exception handler. Authenticators with an aauthenticate()
+    method are awaited; the others run in a worker thread. OPTIONS is always
+    allowed and handed to the sync view of the same name in views.py.
+    """
+    allow = ', '.join(['OPTIONS', *methods])
+
+    def decorator(func):
+        @wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method == 'OPTIONS':
+                # DRF's metadata response, authenticated like the sync view
+                return await sync_to_async(getattr(views, func.__name__))(request, *args, **kwargs)
+            request = Request(request)
+            try:
+                # Same order as DRF: a disallowed method is only reported to callers that pass the checks
+                await _authenticate(request, authentication_classes)
+                for permission in permission_classes:
+                    if not permission().has_permission(request, None):
+                        if getattr(request.user, 'is_authenticated', False):
+                            raise PermissionDenied()
+                        raise NotAuthenticated()
+                if request.method not in methods:
+                    raise MethodNotAllowed(request.method)
+                response = await func(request, *args, **kwargs)
+            except Exception as exc:
+                response = _handle_exception(request, exc, args, kwargs)
+            return _finalize(request, response, allow)
+        view.csrf_exempt = True
+        return view
+    return decorator
+
+
+async def _authenticate(request, authentication_classes):
+    # Identities forced by /batch/ or APIClient.force_authenticate() are used as is
+    if getattr(request._request, '_force_auth_user', None) is not None:
+        return
+    if authentication_classes is None:
+        authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    for authentication_class in authentication_classes:
+        authenticator = authentication_class()
+        if hasattr(authenticator, 'aauthenticate'):
+            result = await authenticator.aauthenticate(request)
+        else:
+            result = await sync_to_async(authenticator.authenticate)(request)
+        if result is not None:
+            request.user, request.auth = result
+            return
+    request.user, request.auth = AnonymousUser(), None
+
+
+def _handle_exception(request, exc, args, kwargs):
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        exc.auth_header = 'Bearer'
+    context = {'view': None, 'args': args, 'kwargs': kwargs, 'request': request}
+    response = api_settings.EXCEPTION_HANDLER(exc, context)
+    if response is None:
+        raise exc
+    return response
+
+
+def _finalize(request, response, allow):
+    if isinstance(response, Response):
+        response.accepted_renderer = FastJSONRenderer()
+        response.accepted_media_type = 'application/json'
+        response.renderer_context = {'view': None, 'request': request, 'response': response}
+    # The headers DRF's finalize_response() adds, streamed responses included
+    response['Allow'] = allow
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+async def _cached_read(request, key):
+    entry = await aget_cached_response(key)
+    if entry is None:
+        # The response about to be built will be cached for everyone; build it from the primary
+        read_from_primary()
+        return None
+    data, validators = entry
+    return not_modified(request, validators) or set_validators(Response(data), validators)
+
+
+@query_budget(1)
+@async_api_view(['GET'], authentication_classes=(SupabaseAuthentication,))
+async def get_current_user(request):
+    # The profile is already available as request.user
+    return Response(select_fields(ProfileSerializer(request.user).data, parse_fields(request, ProfileSerializer)))
+
+
+@async_api_view(['GET'], authentication_classes=(SupabaseAuthentication,))
+async def _get_profile(request, user_id):
+    fields = parse_fields(request, ProfileSerializer)
+    cache_key = await aresponse_cache_key(request, f'profile:{user_id}')
+    cached = await _cached_read(request, cache_key)
+    if cached:
+        return cached
+
+    try:
+        profile = await Profile.objects.aget(user_id=user_id)
+    except Profile.DoesNotExist:
+        return Response({"detail": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    validators = object_validators(request, profile)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+    data = select_fields(ProfileSerializer(profile).data, fields)
+    await acache_response(cache_key, data, validators)
+    return set_validators(Response(data), validators)
+
+
+@query_budget(GET=2, PATCH=3, PUT=3)
+@csrf_exempt  # Like @api_view: CSRF is left to the authenticators
+async def profile_detail(request, user_id):
+    if request.method != 'GET':
+        return await sync_to_async(views.profile_detail)(request, user_id)
+    response = await _get_profile(request, user_id)
+    # The route also takes the writes handed to the sync view
+    response['Allow'] = ', '.join(views.profile_detail.cls().allowed_methods)
+    return response
+
+
+@query_budget(3)
+@async_api_view(['GET'], permission_classes=(AllowAny,))
+async def get_projects(request):
+    search_query = request.query_params.get('query', None)
+    values = parse_projection(request, project_feed_values)
+
+    cache_key = None
+    if not search_query:
+        cache_key = await aresponse_cache_key(request, 'projects')
+        cached = await _cached_read(request, cache_key)
+        if cached:
+            return cached
+
+    if search_query:
+        projects = search_projects(Project.objects.all(), search_query)
+    else:
+        projects = Project.objects.all().order_by('-created_at')
+
+    validators = await aqueryset_validators(request, projects)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    # Owners stored as '' or '0' are rendered as 'unknown' by the query itself
+    if wants_pagination(request):
+        rows, next_cursor = await apaginate_queryset(request, values.rows(projects), values.position)
+        data = page_data(values.serialize(rows), next_cursor)
+    elif wants_streaming(validators):
+        # Too large to hold in memory (or the cache) at once
+        return set_validators(astreaming_response(values, projects), validators)
+    else:
+        data = await values.adata(projects)
+    if cache_key:
+        await acache_response(cache_key, data, validators)
+    return set_validators(Response(data), validators)
+
+
+@query_budget(3)
+@async_api_view(['GET'], permission_classes=(IsAuthenticated,))
+async def get_user_projects(request, user_id):
+    values = parse_projection(request, project_values)
+    cache_key = await aresponse_cache_key(request, f'user-projects:{user_id}')
+    cached = await _cached_read(request, cache_key)
+    if cached:
+        return cached
+
+    projects = Project.objects.filter(user_id=user_id).order_by('-created_at')
+    validators = await aqueryset_validators(request, projects)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    if wants_pagination(request):
+        rows, next_cursor = await apaginate_queryset(request, values.rows(projects), values.position)
+        data = page_data(values.serialize(rows), next_cursor)
+    else:
+        data = await values.adata(projects)
+    await acache_response(cache_key, data, validators)
+    return set_validators(Response(data), validators)
+
+
+async def _join_request_list(request, join_requests, vary_on_user=False):
+    expand = parse_expand(request)
+    values = parse_join_request_projection(request, expand)
+
+    # Expanded objects change independently of the requests, so only plain lists get validators
+    validators = None
+    if not expand:
+        validators = await aqueryset_validators(request, join_requests, vary_on_user=vary_on_user)
+        cached = not_modified(request, validators)
+        if cached:
+            return cached
+
+    next_cursor = None
+    paginated = wants_pagination(request)
+    if not paginated and wants_streaming(validators):
+        return set_validators(astreaming_response(values, join_requests), validators)
+    if paginated:
+        rows, next_cursor = await apaginate_queryset(request, values.rows(join_requests), values.position)
+        data = values.serialize(rows)
+    else:
+        data = await values.adata(join_requests)
+    if expand:
+        data = await sync_to_async(expand_join_requests)(data, expand)
+    response = Response(page_data(data, next_cursor) if paginated else data)
+    return set_validators(response, validators) if validators else response
+
+
+@query_budget(4)
+@async_api_view(['GET'], authentication_classes=(SupabaseAuthentication,))
+async def get_received_join_requests(request, user_id):
+    # Verify user is getting their own requests
+    if request.user.user_id != user_id:
+        return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
+
+    join_requests = JoinRequest.objects.filter(receiver_id=user_id).order_by('-created_at')
+    return await _join_request_list(request, join_requests)
+
+
+@query_budget(4)
+@async_api_view(['GET'], authentication_classes=(SupabaseAuthentication,))
+async def get_sent_join_requests(request):
+    join_requests = JoinRequest.objects.filter(sender_id=request.user.user_id).order_by('-created_at')
+    return await _join_request_list(request, join_requests, vary_on_user=True)
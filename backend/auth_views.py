@@ -3,11 +3,13 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
+from .budgets import query_budget
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+@query_budget(8)
 @csrf_exempt
 def supabase_auth(request):
     """
@@ -17,8 +19,8 @@ def supabase_auth(request):
         return JsonResponse({'error': 'Only POST method is allowed'}, status=405)
     
     try:
-        # Log the raw request body for debugging
-        logger.info(f"Request body: {request.body}")
+        # The body carries tokens; log only its size
+        logger.debug("Request body: %d bytes", len(request.body))
         
         # Handle empty request body
         if not request.body:
@@ -28,7 +30,7 @@ def supabase_auth(request):
         try:
             data = json.loads(request.body)
         except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+            logger.error("JSON decode error: %s", e)
             return JsonResponse({'error': f"Invalid JSON: {str(e)}"}, status=400)
         
         # Extract user_id from data
@@ -49,12 +51,12 @@ def supabase_auth(request):
         token, created = Token.objects.get_or_create(user=user)
         
         # Log success
-        logger.info(f"Authentication successful for user_id={user_id}")
+        logger.info("Authentication successful for user_id=%s", user_id)
         
         return JsonResponse({
             'token': token.key,
             'user_id': user.username,
         })
     except Exception as e:
-        logger.error(f"Authentication error: {str(e)}")
+        logger.error("Authentication error: %s", e)
         return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
@@ -1,18 +1,174 @@
+import hashlib
+import time
 import jwt
+from asgiref.sync import sync_to_async
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.conf import settings
+from django.core.cache import caches
+from .cache import LRUCache, invalidate_responses
+from .metrics import auth_timer
 from .models import Profile
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Verified token payloads, keyed by a SHA-256 digest of the raw token so the
+# bearer tokens themselves are never kept in memory. hits/misses are exposed
+# through token_cache.stats().
+token_cache = LRUCache(max_size=getattr(settings, 'SUPABASE_TOKEN_CACHE_SIZE', 1024))
+
+
+def decode_token(token):
+    """
+    Verify a Supabase JWT and return its payload, reusing a previous
+    verification of the same token while it is still valid.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    # Raises jwt.InvalidTokenError (and subclasses) on failure; failures are never cached
+    payload = jwt.decode(
+        token,
+        settings.SUPABASE_JWT_SECRET,
+        algorithms=["HS256"],
+        options={"verify_aud": False}  # Ignore audience verification
+    )
+
+    # Never keep an entry past the token's own exp claim
+    expires_at = time.time() + getattr(settings, 'SUPABASE_TOKEN_CACHE_TTL', 300)
+    exp = payload.get('exp')
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    token_cache.set(key, payload, expires_at)
+    return payload
+
+
+# Resolved profiles, keyed by the token's sub claim. The local tier is always
+# on; PROFILE_CACHE_ALIAS optionally names a Django cache shared by all workers.
+profile_cache = LRUCache(max_size=getattr(settings, 'PROFILE_CACHE_SIZE', 1024))
+
+PROFILE_FIELDS = [f.attname for f in Profile._meta.concrete_fields]
+
+
+def _shared_profile_cache():
+    alias = getattr(settings, 'PROFILE_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def _profile_key(user_id):
+    return f'profile:{user_id}'
+
+
+def get_cached_profile(user_id):
+    """
+    Return a Profile for user_id from the cache tiers, or None on a miss.
+    Each call returns a fresh instance so requests never share state.
+    """
+    values = profile_cache.get(user_id)
+    if values is None:
+        shared = _shared_profile_cache()
+        if shared is None:
+            return None
+        values = shared.get(_profile_key(user_id))
+        if values is None:
+            return None
+        profile_cache.set(user_id, values, time.time() + getattr(settings, 'PROFILE_CACHE_TTL', 60))
+    return Profile.from_db('default', PROFILE_FIELDS, values)
+
+
+async def aget_cached_profile(user_id):
+    """
+    Async get_cached_profile(). The local tier is read in place; the shared
+    tier goes through the cache's async API.
+    """
+    values = profile_cache.get(user_id)
+    if values is None:
+        shared = _shared_profile_cache()
+        if shared is None:
+            return None
+        values = await shared.aget(_profile_key(user_id))
+        if values is None:
+            return None
+        profile_cache.set(user_id, values, time.time() + getattr(settings, 'PROFILE_CACHE_TTL', 60))
+    return Profile.from_db('default', PROFILE_FIELDS, values)
+
+
+def cache_profile(profile):
+    values = tuple(getattr(profile, name) for name in PROFILE_FIELDS)
+    profile_cache.set(profile.user_id, values, time.time() + getattr(settings, 'PROFILE_CACHE_TTL', 60))
+    shared = _shared_profile_cache()
+    if shared is not None:
+        shared.set(_profile_key(profile.user_id), values, getattr(settings, 'PROFILE_CACHE_SHARED_TTL', 300))
+
+
+def invalidate_profile(user_id):
+    """
+    Drop a profile from both cache tiers. Call after any write to the row.
+    """
+    profile_cache.delete(user_id)
+    shared = _shared_profile_cache()
+    if shared is not None:
+        shared.delete(_profile_key(user_id))
+
+
 class SupabaseAuthentication(BaseAuthentication):
     """
     Custom authentication class for validating Supabase JWT tokens.
     """
     
     def authenticate(self, request):
+        with auth_timer() as timer:
+            credentials = self._get_credentials(request)
+            if credentials is None:
+                timer.outcome = 'anonymous'
+                return None
+            user_id, email, payload = credentials
+            
+            # Get or create profile based on the user_id, skipping the database on warm paths
+            try:
+                profile = get_cached_profile(user_id)
+                if profile is None:
+                    profile = self._load_profile(user_id, email)
+                
+                # Add is_authenticated attribute to the profile
+                profile.is_authenticated = True
+                    
+            except Exception as e:
+                raise AuthenticationFailed(f'Profile error: {str(e)}')
+            
+        # Return profile and token payload
+        return (profile, payload)
+    
+    async def aauthenticate(self, request):
+        """
+        Async equivalent of authenticate() for async views. Warm requests are
+        answered from the profile cache without leaving the event loop; only
+        a cold profile load runs in a worker thread.
+        """
+        with auth_timer() as timer:
+            credentials = self._get_credentials(request)
+            if credentials is None:
+                timer.outcome = 'anonymous'
+                return None
+            user_id, email, payload = credentials
+            
+            try:
+                profile = await aget_cached_profile(user_id)
+                if profile is None:
+                    profile = await sync_to_async(self._load_profile)(user_id, email)
+                profile.is_authenticated = True
+            except Exception as e:
+                raise AuthenticationFailed(f'Profile error: {str(e)}')
+        return (profile, payload)
+    
+    def _get_credentials(self, request):
+        """
+        Verify the bearer token and return (user_id, email, payload), or None
+        when the request carries no bearer token.
+        """
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
             return None
@@ -21,12 +177,7 @@ class SupabaseAuthentication(BaseAuthentication):
         
         try:
             # Decode the JWT token using the SUPABASE_JWT_SECRET
-            payload = jwt.decode(
-                token,
-                settings.SUPABASE_JWT_SECRET,
-                algorithms=["HS256"],
-                options={"verify_aud": False}  # Ignore audience verification
-            )
+            payload = decode_token(token)
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed('Token expired')
         except jwt.InvalidTokenError as e:
@@ -39,30 +190,25 @@ class SupabaseAuthentication(BaseAuthentication):
             
         # Get email from token if available
         email = payload.get('email', '')
+        return user_id, email, payload
+    
+    def _load_profile(self, user_id, email):
+        profile, created = Profile.objects.get_or_create(
+            user_id=user_id,
+            defaults={
+                'email': email,
+                'username': email.split('@')[0] if email else f'user_{user_id[:8]}'
+            }
+        )
         
-        # Get or create profile based on the user_id
-        try:
-            profile, created = Profile.objects.get_or_create(
-                user_id=user_id,
-                defaults={
-                    'email': email,
-                    'username': email.split('@')[0] if email else f'user_{user_id[:8]}'
-                }
-            )
-            
-            # Add is_authenticated attribute to the profile
-            profile.is_authenticated = True
-            
-            # Add username attribute if it's not set
-            if not profile.username:
-                profile.username = email.split('@')[0] if email else f'user_{user_id[:8]}'
-                profile.save(update_fields=['username'])
-                
-        except Exception as e:
-            raise AuthenticationFailed(f'Profile error: {str(e)}')
-            
-        # Return profile and token payload
-        return (profile, payload)
+        # Add username attribute if it's not set
+        if not profile.username:
+            profile.username = email.split('@')[0] if email else f'user_{user_id[:8]}'
+            profile.save(update_fields=['username'])
+            invalidate_responses(f'profile:{user_id}')
+        
+        cache_profile(profile)
+        return profile
     
     def authenticate_header(self, request):
-        return 'Bearer'
\ No newline at end of file
+        return 'Bearer'
@@ -0,0 +1,174 @@
+# backend/batch_views.py
+import asyncio
+import contextvars
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import async_to_sync
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .budgets import query_budget
+from .streaming import is_list_stream
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ALLOWED_METHODS = SAFE_METHODS + ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Request headers that describe the outer batch body and must not leak into sub-requests
+BODY_META_KEYS = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_CONTENT_LENGTH', 'wsgi.input')
+# Preconditions meant for the batch itself: they would turn items into 304s or 412s
+CONDITIONAL_META_KEYS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE')
+
+
+@query_budget(None)  # The sum of its sub-requests' budgets
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def batch(request):
+    """
+    Run several API calls in one round trip.
+
+    The body is a JSON array of {"method", "path", "body"} objects addressed
+    to the routes in backend/urls.py. The caller is authenticated once and
+    each sub-request is dispatched straight to its view with that identity,
+    so every item gets the status and body it would get if called directly.
+    Batches made only of safe methods run in parallel; any write makes the
+    whole batch run sequentially, in order.
+    """
+    items = request.data
+    if not isinstance(items, list) or not items:
+        return Response({"detail": "Expected a non-empty list of requests"}, status=status.HTTP_400_BAD_REQUEST)
+
+    max_requests = getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+    if len(items) > max_requests:
+        return Response({"detail": f"At most {max_requests} requests per batch"}, status=status.HTTP_400_BAD_REQUEST)
+
+    errors = [_validate_item(item) for item in items]
+    if any(errors):
+        return Response({"detail": "Invalid batch", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Authenticate once; sub-requests reuse the result instead of re-running auth
+    user = request.user
+    auth = request.auth
+    authenticated = bool(getattr(user, 'is_authenticated', False))
+
+    sub_requests = [_build_sub_request(request, item, user if authenticated else None, auth) for item in items]
+
+    max_workers = getattr(settings, 'BATCH_MAX_WORKERS', 4)
+    if max_workers > 1 and len(sub_requests) > 1 and all(sub.method in SAFE_METHODS for sub in sub_requests):
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(sub_requests))) as executor:
+            # Each worker gets a copy of this context so per-request state (e.g. replica routing) carries over
+            futures = [executor.submit(contextvars.copy_context().run, _dispatch_in_thread, sub) for sub in sub_requests]
+            results = [future.result() for future in futures]
+    else:
+        results = [_dispatch(sub) for sub in sub_requests]
+
+    return Response(results)
+
+
+def _validate_item(item):
+    if not isinstance(item, dict):
+        return "Each request must be an object"
+    method = str(item.get('method', 'GET')).upper()
+    if method not in ALLOWED_METHODS:
+        return f"Unsupported method: {method}"
+    path = item.get('path')
+    if not isinstance(path, str) or not path.startswith('/'):
+        return "path must be an absolute path such as /profile/<user_id>/"
+    route = urlsplit(path).path.rstrip('/')
+    if route == '/batch':
+        return "Batches cannot be nested"
+    if route == '/events':
+        return "Event streams cannot be batched"
+    return None
+
+
+def _build_sub_request(request, item, user, auth):
+    url = urlsplit(item['path'])
+    method = str(item.get('method', 'GET')).upper()
+    body = b''
+    if item.get('body') is not None:
+        body = json.dumps(item['body']).encode()
+
+    sub = HttpRequest()
+    sub.method = method
+    sub.path = sub.path_info = url.path
+    sub.META = {
+        key: value for key, value in request.META.items() if key not in BODY_META_KEYS + CONDITIONAL_META_KEYS
+    }
+    sub.META.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+    })
+    sub.GET = QueryDict(url.query)
+    sub.COOKIES = request.COOKIES
+    sub._stream = io.BytesIO(body)
+    sub._read_started = False
+
+    # DRF's Request honours these and skips its authenticators
+    if user is not None:
+        sub._force_auth_user = user
+        sub._force_auth_token = auth
+    return sub
+
+
+def _dispatch(sub):
+    try:
+        match = resolve(sub.path_info)
+    except Resolver404:
+        return {"status": status.HTTP_404_NOT_FOUND, "body": {"detail": "Not found."}}
+
+    sub.resolver_match = match
+    view = match.func
+    if asyncio.iscoroutinefunction(view):
+        view = async_to_sync(view)
+    try:
+        response = view(sub, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Unhandled error in batch sub-request %s %s", sub.method, sub.path)
+        return {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "body": {"detail": "Internal server error"}}
+
+    if response.streaming and not is_list_stream(response):
+        # Other streams (such as /events/) may never end; reading one would hold the worker forever
+        response.close()
+        return {"status": status.HTTP_400_BAD_REQUEST, "body": {"detail": "Streaming responses cannot be batched"}}
+    return {"status": response.status_code, "body": _response_body(response)}
+
+
+def _dispatch_in_thread(sub):
+    try:
+        return _dispatch(sub)
+    finally:
+        # Worker threads get their own connections; don't leave them open
+        connections.close_all()
+
+
+def _response_body(response):
+    # DRF responses are still unrendered here, so their data can be embedded as-is
+    if hasattr(response, 'data'):
+        return response.data
+    if response.streaming:
+        # Large lists are streamed (backend/streaming.py); they are finite, so a batch embeds them whole
+        content = async_to_sync(_aread)(response) if response.is_async else b''.join(response)
+    else:
+        content = getattr(response, 'content', b'')
+    if not content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(content)
+    return content.decode(response.charset or 'utf-8')
+
+
+async def _aread(response):
+    return b''.join([chunk async for chunk in response])
@@ -0,0 +1,45 @@
+# Query budgets: the most database queries a view may run for one request.
+#
+# Budgets are fixed numbers, so a view that runs a query per row (an N+1)
+# cannot stay within one. QueryBudgetTests in backend/tests.py requests
+# every route in backend/urls.py with N and 10N rows in the database and
+# fails when the count grows with the rows or exceeds the view's budget;
+# MetricsMiddleware logs requests that go over budget in production.
+#
+# Budgets are counted with cold caches: they include the profile load done
+# by SupabaseAuthentication, which warm requests skip.
+
+ANY_METHOD = '*'
+
+
+def query_budget(queries=None, **per_method):
+    """
+    Declare a view's query budget, for every method with query_budget(3) or
+    per method with query_budget(GET=2, PATCH=4). A budget of None means
+    the count is not fixed (as for /batch/), but it must still not grow with
+    the number of rows. Apply it above @api_view.
+    """
+    budgets = {method.upper(): value for method, value in per_method.items()}
+    if queries is not None or not budgets:
+        budgets[ANY_METHOD] = queries
+
+    def decorator(view):
+        view.query_budget = budgets
+        return view
+    return decorator
+
+
+def get_query_budget(view, method):
+    """
+    Return the budget view declared for method. Raises LookupError when it
+    declared none.
+    """
+    # DRF function views are wrapped in a class named after the function
+    name = getattr(view, 'cls', view).__name__
+    budgets = getattr(view, 'query_budget', None)
+    if budgets is None:
+        raise LookupError(f"{name} declares no query budget")
+    try:
+        return budgets[method] if method in budgets else budgets[ANY_METHOD]
+    except KeyError:
+        raise LookupError(f"{name} declares no query budget for {method}") from None
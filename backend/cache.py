@@ -0,0 +1,148 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LRUCache:
+    """
+    Small thread-safe, per-process LRU cache with per-entry expiry.
+
+    Used for hot lookups on the request path (verified tokens, resolved
+    profiles) where a round trip to a shared cache would cost more than
+    the work being saved.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                # Expired entries are dropped lazily on lookup
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expires_at=None):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Shared response cache for public read endpoints.
+#
+# Entries live in a Django cache (RESPONSE_CACHE_ALIAS), so locmem works in
+# tests and any shared backend works in production. Every key embeds the
+# current generation of its namespace (e.g. "projects" or
+# "user-projects:<user_id>"); writers call invalidate_responses() to move the
+# namespace to a new generation, which orphans all of its entries at once
+# regardless of their query parameters. The timeout only bounds memory.
+
+def _response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(namespace):
+    return f'response-generation:{namespace}'
+
+
+def _generation(cache, namespace):
+    # Seeded from the clock so a generation key lost to eviction can never
+    # come back with a value that matches older entries
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key, 0)
+    return generation
+
+
+async def _ageneration(cache, namespace):
+    key = _generation_key(namespace)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, time.time_ns(), None)
+        generation = await cache.aget(key, 0)
+    return generation
+
+
+def _path_digest(request):
+    return hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+
+
+def response_cache_key(request, namespace):
+    cache = _response_cache()
+    return f'response:{namespace}:{_generation(cache, namespace)}:{_path_digest(request)}'
+
+
+async def aresponse_cache_key(request, namespace):
+    cache = _response_cache()
+    return f'response:{namespace}:{await _ageneration(cache, namespace)}:{_path_digest(request)}'
+
+
+def get_cached_response(key):
+    return _response_cache().get(key)
+
+
+async def aget_cached_response(key):
+    return await _response_cache().aget(key)
+
+
+def cache_response(key, data, validators):
+    _response_cache().set(key, (data, validators), getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 3600))
+
+
+async def acache_response(key, data, validators):
+    await _response_cache().aset(key, (data, validators), getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 3600))
+
+
+def invalidate_responses(*namespaces):
+    cache = _response_cache()
+    for namespace in namespaces:
+        key = _generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
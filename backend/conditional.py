@@ -0,0 +1,88 @@
+import hashlib
+from collections import namedtuple
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .pagination import page_query, wants_pagination
+
+# HTTP validators (ETag / Last-Modified) for the read endpoints.
+#
+# Every model carries updated_at = auto_now, so a list's state can be
+# summarised by max(updated_at) plus the row count (which catches deletes)
+# in one aggregate query. If the client already holds that state the view
+# answers 304 without fetching or serializing the rows. A paginated request
+# is summarised by its page alone (the ids and updated_at of the rows on
+# it), which costs the same as fetching the page however long the list is.
+# Lists get an ETag only: deleting a row does not move max(updated_at), so
+# a Last-Modified date would let If-Modified-Since revalidate a stale list.
+
+# count is the number of rows in a list (None for single objects)
+Validators = namedtuple('Validators', ['etag', 'last_modified', 'count'], defaults=[None])
+
+
+def _make_validators(request, last_modified, *parts, vary_on_user=False):
+    # The URL (with its query string) is part of the tag, so different filters
+    # or pages never share a validator. Endpoints whose content depends on the
+    # caller rather than the URL also mix in the user.
+    if vary_on_user:
+        parts += (getattr(request.user, 'user_id', None) or getattr(request.user, 'pk', ''),)
+    key = '|'.join(str(part) for part in (request.get_full_path(), last_modified, *parts))
+    etag = '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+    return Validators(etag, last_modified)
+
+
+def object_validators(request, obj):
+    return _make_validators(request, obj.updated_at)
+
+
+def queryset_validators(request, queryset, vary_on_user=False):
+    if wants_pagination(request):
+        page, _, _ = page_query(request, queryset)
+        return _page_validators(request, list(page.values_list('pk', 'updated_at')), vary_on_user)
+    summary = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    return _list_validators(request, summary['last_modified'], summary['count'], vary_on_user, count=summary['count'])
+
+
+async def aqueryset_validators(request, queryset, vary_on_user=False):
+    if wants_pagination(request):
+        page, _, _ = page_query(request, queryset)
+        return _page_validators(request, [row async for row in page.values_list('pk', 'updated_at')], vary_on_user)
+    summary = await queryset.order_by().aaggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    return _list_validators(request, summary['last_modified'], summary['count'], vary_on_user, count=summary['count'])
+
+
+def _page_validators(request, rows, vary_on_user):
+    # The ids catch rows that were deleted from the page or moved onto it
+    last_modified = max((updated_at for _, updated_at in rows), default=None)
+    return _list_validators(request, last_modified, [pk for pk, _ in rows], vary_on_user)
+
+
+def _list_validators(request, last_modified, summary, vary_on_user, count=None):
+    # last_modified still feeds the ETag, but is not sent as Last-Modified
+    validators = _make_validators(request, last_modified, summary, vary_on_user=vary_on_user)
+    return validators._replace(last_modified=None, count=count)
+
+
+def not_modified(request, validators):
+    """
+    Return a 304 response if the request's If-None-Match / If-Modified-Since
+    match the validators, otherwise None.
+    """
+    last_modified = validators.last_modified
+    response = get_conditional_response(
+        request,
+        etag=validators.etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators):
+    response['ETag'] = validators.etag
+    if validators.last_modified:
+        response['Last-Modified'] = http_date(validators.last_modified.timestamp())
+    # Clients may keep the body but must revalidate before reusing it
+    response['Cache-Control'] = 'private, no-cache'
+    return response
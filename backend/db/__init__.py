@@ -0,0 +1,3 @@
+# Pooled PostgreSQL backend. Use with DATABASES[...]['ENGINE'] = 'backend.db'
+# and tune the pool per alias with DATABASES[...]['POOL'].
+from .pool import ConnectionPool, PoolTimeout, pool_stats  # noqa: F401
@@ -0,0 +1,90 @@
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.utils.asyncio import async_unsafe
+from .pool import ConnectionPool, PoolTimeout, get_pool
+
+Database = base.Database
+
+# libpq PQtransactionStatus values (the same in psycopg2 and psycopg 3)
+TRANSACTION_IDLE = 0
+TRANSACTION_UNKNOWN = 4
+
+DEFAULT_POOL_OPTIONS = {
+    'min_size': 0,
+    'max_size': 10,
+    'timeout': 10.0,
+    'max_lifetime': 1800.0,
+    'max_idle': 300.0,
+    'ping_after': 5.0,
+}
+
+
+def check_connection(conn, ping):
+    if conn.closed or conn.info.transaction_status == TRANSACTION_UNKNOWN:
+        return False
+    if ping:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        # Outside autocommit the ping opened a transaction; don't hand that out
+        if conn.info.transaction_status != TRANSACTION_IDLE:
+            conn.rollback()
+    return True
+
+
+def reset_connection(conn):
+    if conn.closed:
+        raise Database.InterfaceError("connection already closed")
+    # Never return a connection with an open (or aborted) transaction
+    if conn.info.transaction_status != TRANSACTION_IDLE:
+        conn.rollback()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that takes connections from a per-alias
+    ConnectionPool and hands them back when Django closes them, instead of
+    opening a new connection for every request.
+    """
+
+    @property
+    def connection_pool(self):
+        conn_params = self.get_connection_params()
+        key = repr(sorted(conn_params.items()))
+        return get_pool(self.alias, key, lambda: self._create_pool(conn_params))
+
+    def _create_pool(self, conn_params):
+        options = {**DEFAULT_POOL_OPTIONS, **self.settings_dict.get('POOL', {})}
+        return ConnectionPool(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+            check=check_connection,
+            reset=reset_connection,
+            **options,
+        )
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        # Connections used to create and drop the test database are not pooled
+        if self.alias == NO_DB_ALIAS:
+            return super().get_new_connection(conn_params)
+
+        pool = self.connection_pool
+        try:
+            connection = pool.getconn()
+        except PoolTimeout as e:
+            raise Database.OperationalError(str(e)) from e
+        # Remember the pool so the connection goes back where it came from
+        self._checked_out_from = pool
+        # The parent sets this when it creates a connection; reused ones need it too
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        pool = getattr(self, '_checked_out_from', None)
+        if self.connection is None or pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self._checked_out_from = None
+            pool.putconn(self.connection)
@@ -0,0 +1,266 @@
+import threading
+import time
+from collections import deque
+
+# Thread-safe pool of DB-API connections.
+#
+# Django closes its connection at the end of every request (CONN_MAX_AGE=0);
+# the backend.db engine turns that close into a return to this pool, so the
+# next request on any thread (WSGI workers, or the per-request threads the
+# ASGI handler runs sync code in) reuses an open connection instead of paying
+# for TCP + TLS + auth again.
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool's timeout."""
+
+
+class ConnectionPool:
+    """
+    Hands out connections created by `connect`, keeping between min_size and
+    max_size of them open.
+
+    Connections are checked on checkout: `check(conn, ping)` must return True
+    for a usable connection, where ping is True once the connection has been
+    idle for ping_after seconds (so a cheap round trip can be spent on it).
+    Broken connections are discarded and replaced transparently. `reset(conn)`
+    returns a connection to a clean state on checkin and may raise to have it
+    discarded. Connections older than max_lifetime, or idle for longer than
+    max_idle while the pool holds more than min_size, are recycled.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, timeout=10.0, max_lifetime=1800.0,
+                 max_idle=300.0, ping_after=5.0, check=None, reset=None, close=None):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self.check = check or (lambda conn, ping: True)
+        self.reset = reset or (lambda conn: None)
+        self.close_connection = close or (lambda conn: conn.close())
+
+        self._idle = deque()  # (conn, created_at, returned_at), most recently returned last
+        self._created_at = {}  # id(conn) -> created_at for checked-out connections
+        self._size = 0  # Open connections, idle or in use, plus ones being created
+        self._opened = False
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'failed_checks': 0,
+            'connect_errors': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+        }
+
+    def getconn(self):
+        if self._closed:
+            raise PoolTimeout("Connection pool is closed")
+        if not self._opened:
+            self._fill()
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                expired = self._expire_idle()
+                entry, create = self._take(deadline)
+            # Closing can block on the network; do it off the lock
+            for conn in expired:
+                self._discard(conn)
+            if entry is None and not create:
+                # Woken by a checkin (or a timeout that has not expired yet)
+                waited = True
+                continue
+            if create:
+                conn = self._create()
+                self._checked_out(conn, time.monotonic(), started if waited else None)
+                return conn
+
+            conn, created_at, returned_at = entry
+            if self._healthy(conn, time.monotonic() - returned_at >= self.ping_after):
+                self._checked_out(conn, created_at, started if waited else None)
+                return conn
+            # Broken: drop it and go round again, which will create a replacement
+            with self._cond:
+                self._stats['failed_checks'] += 1
+                self._size -= 1
+            self._discard(conn)
+
+    def putconn(self, conn, discard=False):
+        with self._cond:
+            created_at = self._created_at.pop(id(conn), None)
+        if created_at is None:
+            # Not ours (or returned twice)
+            return
+        now = time.monotonic()
+        if not discard and not self._closed and now - created_at < self.max_lifetime:
+            try:
+                self.reset(conn)
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        with self._cond:
+            if discard:
+                self._size -= 1
+                self._stats['recycled'] += 1
+            else:
+                self._idle.append((conn, created_at, now))
+            self._cond.notify()
+        if discard:
+            self._discard(conn)
+
+    def close(self):
+        """
+        Close idle connections now and checked-out ones as they come back.
+        A closed pool hands out no more connections.
+        """
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._closed = True
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return dict(
+                self._stats,
+                size=self._size,
+                idle=len(self._idle),
+                in_use=len(self._created_at),
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
+
+    def _take(self, deadline):
+        # Called with the lock held. Returns (idle entry, False), (None, True)
+        # when the caller should create a connection, or (None, False) after
+        # waiting for a checkin.
+        if self._idle:
+            return self._idle.pop(), False
+        if self._size < self.max_size:
+            self._size += 1
+            return None, True
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._stats['timeouts'] += 1
+            raise PoolTimeout(f"No database connection available within {self.timeout}s (max_size={self.max_size})")
+        self._cond.wait(remaining)
+        return None, False
+
+    def _expire_idle(self):
+        # Called with the lock held; returns the connections the caller must
+        # close. The longest-idle connections sit at the left.
+        now = time.monotonic()
+        expired = []
+        while self._idle:
+            conn, created_at, returned_at = self._idle[0]
+            too_old = now - created_at >= self.max_lifetime
+            too_idle = now - returned_at >= self.max_idle and self._size > self.min_size
+            if not (too_old or too_idle):
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._stats['recycled'] += 1
+            expired.append(conn)
+        return expired
+
+    def _create(self):
+        # The slot was reserved in _take(); give it back if connecting fails
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._stats['connect_errors'] += 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+    def _checked_out(self, conn, created_at, waited):
+        with self._cond:
+            self._created_at[id(conn)] = created_at
+            self._stats['checkouts'] += 1
+            if waited is not None:
+                wait = time.monotonic() - waited
+                self._stats['waits'] += 1
+                self._stats['wait_time_total'] += wait
+                self._stats['wait_time_max'] = max(self._stats['wait_time_max'], wait)
+
+    def _healthy(self, conn, ping):
+        try:
+            return bool(self.check(conn, ping))
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            self.close_connection(conn)
+        except Exception:
+            pass
+
+    def _fill(self):
+        with self._cond:
+            if self._opened:
+                return
+            self._opened = True
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._create()
+            except Exception:
+                # The checkout that triggered the fill will retry and surface the error
+                return
+            now = time.monotonic()
+            with self._cond:
+                self._idle.append((conn, now, now))
+                self._cond.notify()
+
+
+# One pool per database alias, shared by every thread's connection wrapper
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, key, factory):
+    """
+    Return the pool for alias, creating it with factory() on first use. key
+    identifies the connection settings; when they change (as when the test
+    runner switches to the test database) the old pool is closed and
+    replaced.
+    """
+    with _pools_lock:
+        entry = _pools.get(alias)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        pool = factory()
+        _pools[alias] = (key, pool)
+    if entry is not None:
+        entry[1].close()
+    return pool
+
+
+def pool_stats():
+    """Return {alias: stats} for every pool created in this process."""
+    with _pools_lock:
+        pools = {alias: pool for alias, (key, pool) in _pools.items()}
+    return {alias: pool.stats() for alias, pool in pools.items()}
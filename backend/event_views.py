@@ -0,0 +1,82 @@
+# backend/event_views.py
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+from .authentication import SupabaseAuthentication
+from .budgets import query_budget
+from .events import get_broker, user_channel
+
+
+@query_budget(1)  # Authentication only; the stream itself runs no queries
+async def events(request):
+    """
+    Server-Sent Events stream of the caller's join-request updates.
+
+    Authenticates with the same Supabase bearer token as the REST API and
+    then holds the connection open, writing one SSE message per event
+    ("join_request.created" to the project owner, "join_request.updated" to
+    the sender) plus periodic keep-alive comments. Events are not replayed,
+    so clients should refresh their lists (or /sync/) after reconnecting.
+    Must be served by the ASGI application.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    try:
+        result = await SupabaseAuthentication().aauthenticate(request)
+    except AuthenticationFailed as e:
+        return _unauthorized(str(e.detail))
+    if result is None:
+        return _unauthorized("Authentication credentials were not provided.")
+    profile, _ = result
+    # The stream runs no queries; don't hold a (pooled) connection for hours
+    await sync_to_async(_release_connections)()
+
+    # Subscribe before responding so nothing published in between is lost
+    subscription = get_broker().subscribe(user_channel(profile.user_id))
+    response = StreamingHttpResponse(_stream(subscription), content_type='text/event-stream')
+    # Unsubscribes even if the stream is never iterated
+    response._resource_closers.append(subscription.close)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+def _release_connections():
+    for connection in connections.all(initialized_only=True):
+        # Closing inside atomic() would abort the transaction instead
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def _unauthorized(detail):
+    response = JsonResponse({"detail": detail}, status=401)
+    response['WWW-Authenticate'] = 'Bearer'
+    return response
+
+
+def format_event(event):
+    data = json.dumps(event['data'], cls=JSONEncoder, separators=(',', ':'))
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+async def _stream(subscription):
+    keepalive = getattr(settings, 'EVENTS_KEEPALIVE_SECONDS', 15)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        # Runs when the client disconnects and the stream is cancelled; response.close() covers the rest
+        subscription.close()
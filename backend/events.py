@@ -0,0 +1,153 @@
+import asyncio
+from abc import ABC, abstractmethod
+import logging
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Server-pushed events for the /events/ stream.
+#
+# Views publish small {"type", "data"} events to per-user channels once their
+# transaction commits; every open stream for that user receives them. The
+# broker is chosen by EVENTS_BROKER. InProcessBroker only reaches streams held
+# by the same process, which is enough for a single ASGI worker. Multi-worker
+# or multi-node deployments plug in a broker backed by a shared bus (Redis
+# pub/sub, Postgres LISTEN/NOTIFY, ...) by implementing the Broker interface.
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+class Subscription(ABC):
+    """
+    A single listener on a channel. Streams await get() for the next event
+    and call close() when the client goes away.
+    """
+
+    @abstractmethod
+    async def get(self):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+
+class Broker(ABC):
+    """
+    Interface for event brokers.
+
+    publish() is called from synchronous view code, possibly from any thread.
+    subscribe() is called from the event loop serving the stream and returns a
+    Subscription bound to that loop.
+    """
+
+    @abstractmethod
+    def publish(self, channel, event):
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel):
+        ...
+
+
+class _QueueSubscription(Subscription):
+
+    def __init__(self, broker, channel, loop, max_size):
+        self.broker = broker
+        self.channel = channel
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=max_size)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+    def deliver(self, event):
+        # Publishers run in worker threads; hand the event over to the stream's loop
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop is gone, so is the stream
+            self.close()
+
+    def _put(self, event):
+        if self._queue.full():
+            # Slow consumer: drop the oldest event rather than grow without bound
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+
+class InProcessBroker(Broker):
+    """
+    Delivers events to subscribers in the current process only.
+    """
+
+    def __init__(self, max_queue_size=None):
+        self.max_queue_size = max_queue_size or getattr(settings, 'EVENTS_QUEUE_SIZE', 100)
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, channel):
+        subscription = _QueueSubscription(self, channel, asyncio.get_running_loop(), self.max_queue_size)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'EVENTS_BROKER', 'backend.events.InProcessBroker'))()
+    return _broker
+
+
+def publish_on_commit(user_ids, event_type, data):
+    """
+    Publish an event to each user's channel once the current transaction
+    commits (immediately when there is none). Rolled-back writes never emit.
+    """
+    event = {'type': event_type, 'data': data}
+    channels = [user_channel(user_id) for user_id in dict.fromkeys(user_ids) if user_id]
+
+    def publish():
+        broker = get_broker()
+        for channel in channels:
+            try:
+                broker.publish(channel, event)
+            except Exception:
+                # Push is best effort; clients resync from the list endpoints
+                logger.exception("Failed to publish %s to %s", event_type, channel)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,98 @@
+from django.db import connections, router
+from django.utils import timezone
+from .models import JoinRequest, Project
+
+# Join request writes done as single SQL statements.
+#
+# Creating a request used to take three round trips (read the project, check
+# for a duplicate, insert), and two concurrent taps could both pass the
+# duplicate check. create_join_request() instead runs one
+# INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING: the project lookup,
+# the own-project check and the insert happen in the database, and the
+# joinreq_unique_project_sender constraint settles races.
+# moderate_join_requests() likewise answers many requests with one
+# UPDATE ... RETURNING rather than a get() and save() per request. Both
+# PostgreSQL and SQLite (3.35+) support the syntax.
+
+CREATED = 'created'
+DUPLICATE = 'duplicate'
+OWN_PROJECT = 'own_project'
+PROJECT_NOT_FOUND = 'project_not_found'
+
+
+def _column(model, name):
+    return model._meta.get_field(name).column
+
+
+def create_join_request(project_id, sender_id, message=''):
+    """
+    Create a pending join request from sender_id for project_id, addressed
+    to the project's owner. Returns (join_request, outcome); join_request is
+    None unless outcome is CREATED.
+    """
+    connection = connections[router.db_for_write(JoinRequest)]
+    qn = connection.ops.quote_name
+    table, project = qn(JoinRequest._meta.db_table), qn(Project._meta.db_table)
+    columns = ', '.join(
+        qn(_column(JoinRequest, name))
+        for name in ('project_id', 'sender_id', 'receiver_id', 'message', 'status', 'created_at', 'updated_at')
+    )
+    project_pk, owner = qn(_column(Project, 'id')), qn(_column(Project, 'user_id'))
+    sql = (
+        f'INSERT INTO {table} ({columns}) '
+        f'SELECT {project}.{project_pk}, %s, {project}.{owner}, %s, %s, %s, %s FROM {project} '
+        f'WHERE {project}.{project_pk} = %s AND {project}.{owner} <> %s '
+        f'ON CONFLICT ({qn(_column(JoinRequest, "project_id"))}, {qn(_column(JoinRequest, "sender_id"))}) DO NOTHING '
+        f'RETURNING {qn(_column(JoinRequest, "id"))}, {qn(_column(JoinRequest, "receiver_id"))}'
+    )
+    now = timezone.now()
+    stamp = connection.ops.adapt_datetimefield_value(now)
+    # One statement is its own transaction under autocommit; wrapping it in
+    # atomic() would only add a COMMIT round trip
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [sender_id, message, 'pending', stamp, stamp, project_id, sender_id])
+        row = cursor.fetchone()
+
+    if row is not None:
+        pk, receiver_id = row
+        join_request = JoinRequest(
+            id=pk, project_id=project_id, sender_id=sender_id, receiver_id=receiver_id,
+            message=message, status='pending', created_at=now, updated_at=now,
+        )
+        return join_request, CREATED
+
+    # Nothing was inserted; only this path pays a second query to say why
+    owner_id = Project.objects.using(connection.alias).filter(pk=project_id).values_list('user_id', flat=True).first()
+    if owner_id is None:
+        return None, PROJECT_NOT_FOUND
+    if owner_id == sender_id:
+        return None, OWN_PROJECT
+    return None, DUPLICATE
+
+
+def moderate_join_requests(receiver_id, new_status, ids=None, project_id=None):
+    """
+    Set the status of receiver_id's pending join requests, either those in
+    `ids` or all of those for `project_id`, with one UPDATE ... RETURNING.
+    Requests that are not pending or not addressed to receiver_id are left
+    alone. Returns the updated requests.
+    """
+    alias = router.db_for_write(JoinRequest)
+    qn = connections[alias].ops.quote_name
+
+    def column(name):
+        return qn(_column(JoinRequest, name))
+
+    if ids is not None:
+        target, params = f'{column("id")} IN ({", ".join(["%s"] * len(ids))})', list(ids)
+    else:
+        target, params = f'{column("project_id")} = %s', [project_id]
+    returning = ', '.join(qn(field.column) for field in JoinRequest._meta.concrete_fields)
+    sql = (
+        f'UPDATE {qn(JoinRequest._meta.db_table)} SET {column("status")} = %s, {column("updated_at")} = %s '
+        f'WHERE {column("receiver_id")} = %s AND {column("status")} = %s AND {target} '
+        f'RETURNING {returning}'
+    )
+    stamp = connections[alias].ops.adapt_datetimefield_value(timezone.now())
+    # raw() builds instances from the returned rows; list() runs it exactly once
+    return list(JoinRequest.objects.raw(sql, [new_status, stamp, receiver_id, 'pending', *params], using=alias))
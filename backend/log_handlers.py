@@ -0,0 +1,128 @@
+import copy
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueListener
+
+# Logging off the request path.
+#
+# BackgroundHandler renders a record's message and traceback, puts it on a
+# bounded in-memory queue and returns; a writer thread formats it and passes
+# it to the real handlers (file, console). Disk writes and console I/O
+# therefore cost a request no more than a queue put, and a slow disk cannot
+# stall it. SamplingFilter keeps only a fraction of high-volume debug
+# records.
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+class BackgroundHandler(logging.Handler):
+    """
+    Hand records to a writer thread that emits them with `targets`.
+
+    Configure it in LOGGING with the target handlers as cfg:// references,
+    e.g. 'targets': ['cfg://handlers.console', 'cfg://handlers.file'].
+    dictConfig sets handlers up in name order, so its name must sort after
+    the names of its targets. When the queue is full (the writer cannot keep
+    up) records are dropped rather than blocking the caller; `dropped`
+    counts them. Like QueueHandler, it should not be given a formatter of
+    its own: the targets' formatters apply.
+    """
+
+    def __init__(self, targets=(), queue_size=10000, level=logging.NOTSET):
+        # Indexing, unlike iteration, resolves dictConfig's cfg:// references
+        targets = [targets[i] for i in range(len(targets))]
+        for target in targets:
+            if not isinstance(target, logging.Handler):
+                raise ValueError(
+                    f"BackgroundHandler target {target!r} is not a configured handler; "
+                    "name the BackgroundHandler so it sorts after its targets"
+                )
+        super().__init__(level)
+        self.targets = targets
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._closed = False
+        self._start()
+        # The writer thread does not survive a fork (e.g. gunicorn --preload)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._restart)
+
+    def _start(self):
+        self.queue = queue.Queue(self.queue_size)
+        self.listener = _Listener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+
+    def _restart(self):
+        if not self._closed:
+            self._start()
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        """
+        Return a copy of record with its message and traceback rendered, as
+        QueueHandler.prepare() does. Its arguments may be changed by the
+        caller, and its traceback keeps frames alive, before the writer
+        thread gets to it.
+        """
+        # The copy keeps later handlers from seeing the changes
+        record = copy.copy(record)
+        record.message = record.msg = self.format(record)
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
+
+    def flush(self):
+        """Wait until every queued record has been written."""
+        self.queue.join()
+        for target in self.targets:
+            target.flush()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            # Writes out what is queued, then stops the thread
+            self.listener.stop()
+        super().close()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of records at or below `level` (DEBUG by default),
+    per logger. `rates` maps logger names to the fraction kept; a name also
+    covers its child loggers and the most specific match wins. Records from
+    loggers without a rate, and all records above `level`, pass.
+    """
+
+    def __init__(self, rates=None, level=logging.DEBUG):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.level = logging._checkLevel(level)
+        self._resolved = {}  # Logger name -> rate (None when not sampled)
+
+    def filter(self, record):
+        if record.levelno > self.level:
+            return True
+        rate = self._resolved.get(record.name, False)
+        if rate is False:
+            rate = self._resolved[record.name] = self._rate_for(record.name)
+        return rate is None or random.random() < rate
+
+    def _rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return None
@@ -0,0 +1,119 @@
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from django.core.management.base import BaseCommand
+from backend.log_handlers import BackgroundHandler, SamplingFilter
+
+FORMAT = '{levelname} {asctime} {module} {message}'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the time request-path logging adds per request: the previous "
+        "setup (eager f-string messages written synchronously to a file and "
+        "the console) against the current one (lazy %-style messages handed "
+        "to BackgroundHandler, with debug sampling). Each simulated request "
+        "logs what RequestLoggingMiddleware logs; output goes to a temporary "
+        "file and os.devnull."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000, help="Simulated requests per thread")
+        parser.add_argument('--threads', type=int, default=4, help="Concurrent request threads")
+        parser.add_argument('--sample-rate', type=float, default=0.01, help="Fraction of debug records kept")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory, open(os.devnull, 'w') as devnull:
+            results = []
+            for name, setup, log_request in (
+                ('sync', self._sync_handlers, _log_eagerly),
+                ('background', self._background_handler, _log_lazily),
+            ):
+                logger = logging.getLogger(f'bench.logging.{name}')
+                logger.propagate = False
+                logger.setLevel(logging.DEBUG)
+                handlers = setup(os.path.join(directory, f'{name}.log'), devnull, options)
+                for handler in handlers:
+                    logger.addHandler(handler)
+                try:
+                    latencies, elapsed = self._run(logger, log_request, options)
+                    started = time.perf_counter()
+                    for handler in handlers:
+                        handler.flush()
+                    drain = time.perf_counter() - started
+                finally:
+                    for handler in handlers:
+                        logger.removeHandler(handler)
+                        handler.close()
+                results.append((name, latencies, elapsed, drain))
+
+        self.stdout.write(
+            f"{options['threads']} threads x {options['requests']} requests, "
+            f"2 debug records per request, sample rate {options['sample_rate']}"
+        )
+        for name, latencies, elapsed, drain in results:
+            self.stdout.write(
+                f"{name:>10}: mean={statistics.fmean(latencies):6.2f}us  "
+                f"p99={_percentile(latencies, 99):6.2f}us  max={max(latencies):8.1f}us  "
+                f"wall={elapsed:6.2f}s  drain={drain * 1000:7.1f}ms"
+            )
+
+    def _sync_handlers(self, path, devnull, options):
+        # What the old configuration attached directly to the loggers
+        return _formatted([logging.FileHandler(path), logging.StreamHandler(devnull)])
+
+    def _background_handler(self, path, devnull, options):
+        targets = _formatted([logging.FileHandler(path), logging.StreamHandler(devnull)])
+        handler = BackgroundHandler(targets, queue_size=options['threads'] * options['requests'] * 2)
+        handler.addFilter(SamplingFilter({'bench.logging': options['sample_rate']}))
+        return [handler]
+
+    def _run(self, logger, log_request, options):
+        latencies = []
+        lock = threading.Lock()
+        start = threading.Barrier(options['threads'] + 1)
+
+        def worker():
+            mine = []
+            start.wait()
+            for i in range(options['requests']):
+                began = time.perf_counter()
+                log_request(logger, 'GET', f'/homepage/?page={i}', 200)
+                mine.append((time.perf_counter() - began) * 1e6)
+            with lock:
+                latencies.extend(mine)
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return latencies, time.perf_counter() - started
+
+
+def _formatted(handlers):
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(FORMAT, style='{'))
+    return handlers
+
+
+def _log_eagerly(logger, method, path, status_code):
+    # RequestLoggingMiddleware before: messages are built even when dropped
+    logger.debug(f"Request: {method} {path}")
+    logger.debug(f"Response: {method} {path} - {status_code}")
+
+
+def _log_lazily(logger, method, path, status_code):
+    logger.debug("Request: %s %s", method, path)
+    logger.debug("Response: %s %s - %s", method, path, status_code)
+
+
+def _percentile(values, percent):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1]
@@ -0,0 +1,78 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from backend.models import Project
+from backend.renderers import FastJSONRenderer
+from backend.serializers import ProjectSerializer, project_feed_values
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the two ways of rendering the project feed: ProjectSerializer "
+        "over model instances with JSONRenderer (the previous path) against "
+        "values_list() rows with FastJSONRenderer. Rows are inserted in a "
+        "transaction that is rolled back, and the outputs are checked to be "
+        "byte-for-byte identical."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='1000,10000,100000', help="Comma-separated row counts")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per path; the best is reported")
+
+    def handle(self, *args, **options):
+        try:
+            counts = [int(count) for count in options['rows'].split(',')]
+        except ValueError:
+            raise CommandError("--rows must be comma-separated integers")
+
+        for count in counts:
+            with transaction.atomic():
+                self._seed(count)
+                projects = Project.objects.order_by('-created_at')
+                slow, slow_bytes = self._time(lambda: JSONRenderer().render(_model_path(projects)), options['repeat'])
+                fast, fast_bytes = self._time(
+                    lambda: FastJSONRenderer().render(project_feed_values.data(projects)), options['repeat']
+                )
+                transaction.set_rollback(True)
+            if slow_bytes != fast_bytes:
+                raise CommandError(f"Outputs differ at {count} rows")
+            self.stdout.write(
+                f"{count:>7} rows: model={slow * 1000:8.1f}ms ({count / slow:9.0f} rows/s)  "
+                f"values={fast * 1000:8.1f}ms ({count / fast:9.0f} rows/s)  "
+                f"speedup={slow / fast:4.1f}x  {len(fast_bytes) / 1024:7.0f} KiB"
+            )
+
+    def _seed(self, count):
+        now = timezone.now()
+        Project.objects.bulk_create(
+            [
+                Project(
+                    title=f'Project {i} ✓',
+                    content='Looking for collaborators. ' * 8,
+                    # Some rows exercise the 'unknown' owner rewrite
+                    user_id='0' if i % 50 == 0 else f'user-{i % 500}',
+                    created_at=now - timedelta(seconds=i),
+                )
+                for i in range(count)
+            ],
+            batch_size=2000,
+        )
+
+    def _time(self, render, repeat):
+        timings, output = [], None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = render()
+            timings.append(time.perf_counter() - started)
+        return min(timings), output
+
+
+def _model_path(queryset):
+    data = ProjectSerializer(queryset, many=True).data
+    for project in data:
+        if not project.get('user_id') or project.get('user_id') == '0':
+            project['user_id'] = 'unknown'
+    return data
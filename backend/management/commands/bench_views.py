@@ -0,0 +1,170 @@
+import asyncio
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare sync WSGI and async ASGI throughput for one endpoint. "
+        "Requests are driven in-process through Django's WSGIHandler from a "
+        "fixed pool of worker threads, and through ASGIHandler on a single "
+        "event loop, against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/homepage/?page_size=20', help="Path (and query) to request")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per run")
+        parser.add_argument('--workers', type=int, default=8, help="WSGI worker threads")
+        parser.add_argument('--concurrency', type=int, default=64, help="In-flight requests (ASGI, and WSGI queue depth)")
+        parser.add_argument('--latency', type=float, default=20.0, help="Simulated database round trip per query, in ms")
+        parser.add_argument('--token', default='', help="Bearer token for authenticated endpoints")
+        parser.add_argument('--host', default='localhost', help="Host header; must be in ALLOWED_HOSTS")
+        parser.add_argument('--use-cache', action='store_true', help="Let repeated requests hit the response cache")
+
+    def handle(self, *args, **options):
+        self.options = options
+        connection_created.connect(self._add_latency)
+        try:
+            for connection in connections.all(initialized_only=True):
+                self._add_latency(connection=connection)
+            results = [
+                ('wsgi', self._run_wsgi()),
+                ('asgi', asyncio.run(self._run_asgi())),
+            ]
+        finally:
+            connection_created.disconnect(self._add_latency)
+
+        self.stdout.write(
+            f"{options['requests']} x GET {options['path']}  latency={options['latency']}ms  "
+            f"workers={options['workers']}  concurrency={options['concurrency']}"
+        )
+        for name, (elapsed, latencies, statuses) in results:
+            self.stdout.write(
+                f"{name}: {len(latencies) / elapsed:8.1f} req/s  "
+                f"p50={_percentile(latencies, 50):7.1f}ms  p95={_percentile(latencies, 95):7.1f}ms  "
+                f"statuses={dict(statuses)}"
+            )
+
+    def _add_latency(self, sender=None, connection=None, **kwargs):
+        # Fires on every reconnect of a reused connection object; add the wrapper once
+        if self.options['latency'] > 0 and self._sleep not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self._sleep)
+
+    def _sleep(self, execute, sql, params, many, context):
+        time.sleep(self.options['latency'] / 1000)
+        return execute(sql, params, many, context)
+
+    def _target(self, i):
+        url = urlsplit(self.options['path'])
+        query = url.query
+        if not self.options['use_cache']:
+            # A unique parameter makes every request a response-cache miss
+            query = f"{query}&_bench={i}" if query else f"_bench={i}"
+        return url.path, query
+
+    def _run_wsgi(self):
+        handler = WSGIHandler()
+        statuses = {}
+
+        def call(i):
+            path, query = self._target(i)
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': query,
+                'SERVER_NAME': self.options['host'],
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': self.options['host'],
+                'wsgi.input': io.BytesIO(b''),
+                'wsgi.errors': io.StringIO(),
+                'wsgi.url_scheme': 'http',
+            }
+            if self.options['token']:
+                environ['HTTP_AUTHORIZATION'] = f"Bearer {self.options['token']}"
+            started = time.perf_counter()
+            result = []
+
+            def start_response(status, headers, exc_info=None):
+                result.append(int(status.split()[0]))
+
+            response = handler(environ, start_response)
+            b''.join(response)
+            response.close()
+            return result[0], (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.options['workers']) as executor:
+            outcomes = list(executor.map(call, range(self.options['requests'])))
+        elapsed = time.perf_counter() - started
+        for code, _ in outcomes:
+            statuses[code] = statuses.get(code, 0) + 1
+        return elapsed, [latency for _, latency in outcomes], sorted(statuses.items())
+
+    async def _run_asgi(self):
+        handler = ASGIHandler()
+        semaphore = asyncio.Semaphore(self.options['concurrency'])
+        statuses = {}
+
+        async def call(i):
+            path, query = self._target(i)
+            headers = [(b'host', self.options['host'].encode())]
+            if self.options['token']:
+                headers.append((b'authorization', f"Bearer {self.options['token']}".encode()))
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': query.encode(),
+                'headers': headers,
+                'server': (self.options['host'], 80),
+                'client': ('127.0.0.1', 0),
+            }
+            received = False
+            done = asyncio.Event()
+            result = []
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Only reached by the disconnect listener; hold until the response is out
+                await done.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    result.append(message['status'])
+                elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                    done.set()
+
+            async with semaphore:
+                started = time.perf_counter()
+                await handler(scope, receive, send)
+                return result[0], (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(call(i) for i in range(self.options['requests'])))
+        elapsed = time.perf_counter() - started
+        for code, _ in outcomes:
+            statuses[code] = statuses.get(code, 0) + 1
+        return elapsed, [latency for _, latency in outcomes], sorted(statuses.items())
+
+
+def _percentile(values, percent):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1]
@@ -0,0 +1,285 @@
+import contextvars
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from django.conf import settings
+from django.http import HttpResponse
+from .budgets import query_budget
+
+# In-process request metrics, exposed at /metrics in the Prometheus text format.
+#
+# Observations are recorded into per-thread shards, so the request path never
+# takes a lock; a scrape sums the shards. Shards of threads that have exited
+# are folded into a base shard, which keeps memory bounded when servers
+# recycle worker threads. Everything is per process: scrape each worker.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+AUTH_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+
+class Histogram:
+    """
+    Prometheus histogram keyed by a tuple of label values.
+    """
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = {}  # thread -> {labels: entry}
+        self._retired = {}  # Folded shards of finished threads
+
+    def observe(self, value, *labels):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._new_shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # One count per bucket plus +Inf, then sum and count
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def collect(self):
+        """Return {labels: (cumulative bucket counts, sum, count)}."""
+        with self._lock:
+            self._fold_finished()
+            shards = [self._retired, *self._shards.values()]
+            totals = {}
+            for shard in shards:
+                _merge(totals, shard)
+        result = {}
+        for labels, entry in totals.items():
+            cumulative, running = [], 0
+            for count in entry[:-2]:
+                running += count
+                cumulative.append(running)
+            result[labels] = (cumulative, entry[-2], entry[-1])
+        return result
+
+    def clear(self):
+        with self._lock:
+            for shard in self._shards.values():
+                shard.clear()
+            self._retired.clear()
+
+    def _new_shard(self):
+        shard = self._local.shard = {}
+        with self._lock:
+            self._fold_finished()
+            self._shards[threading.current_thread()] = shard
+        return shard
+
+    def _fold_finished(self):
+        # Called with the lock held
+        for thread in [t for t in self._shards if not t.is_alive()]:
+            _merge(self._retired, self._shards.pop(thread))
+
+
+def _merge(into, shard):
+    # list() snapshots the items in one step, so a concurrent insert by the
+    # owning thread cannot break the iteration
+    for labels, entry in list(shard.items()):
+        total = into.get(labels)
+        if total is None:
+            into[labels] = list(entry)
+        else:
+            for i, value in enumerate(entry):
+                total[i] += value
+
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Time spent handling requests.', ('route', 'method', 'status'), LATENCY_BUCKETS
+)
+request_queries = Histogram(
+    'http_request_db_queries', 'Database queries executed per request.', ('route',), QUERY_COUNT_BUCKETS
+)
+request_db_time = Histogram(
+    'http_request_db_seconds', 'Time spent in database queries per request.', ('route',), LATENCY_BUCKETS
+)
+response_size = Histogram(
+    'http_response_size_bytes', 'Size of non-streaming response bodies.', ('route',), SIZE_BUCKETS
+)
+auth_duration = Histogram(
+    'supabase_auth_duration_seconds', 'Time spent in SupabaseAuthentication per request.', ('route', 'outcome'), AUTH_BUCKETS
+)
+
+HISTOGRAMS = (request_duration, request_queries, request_db_time, response_size, auth_duration)
+
+
+# Per-request accumulator. MetricsMiddleware installs one for each request;
+# the database hook and SupabaseAuthentication add to it from whatever
+# thread the work runs in (contextvars follow sync_to_async), and the
+# middleware turns it into observations when the response is ready.
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'auth_time', 'auth_outcome')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.auth_time = 0.0
+        self.auth_outcome = None
+
+
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request(token):
+    _request_stats.reset(token)
+
+
+def record_auth(seconds, outcome):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.auth_time += seconds
+        stats.auth_outcome = outcome
+
+
+class auth_timer:
+    """
+    Context manager timing one authentication attempt. The outcome is
+    'success' unless the block sets timer.outcome or raises ('failure').
+    """
+
+    def __init__(self):
+        self.outcome = 'success'
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_auth(time.perf_counter() - self.started, 'failure' if exc_type else self.outcome)
+        return False
+
+
+def time_queries(execute, sql, params, many, context):
+    """Connection execute wrapper feeding the current request's query stats."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries += 1
+
+
+def install_query_timer(sender=None, connection=None, **kwargs):
+    # connection_created fires on every reconnect of a reused wrapper; add the hook once
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+def observe_request(route, method, status, duration, stats, size=None):
+    request_duration.observe(duration, route, method, str(status))
+    request_queries.observe(stats.queries, route)
+    request_db_time.observe(stats.db_time, route)
+    if size is not None:
+        response_size.observe(size, route)
+    if stats.auth_outcome is not None:
+        auth_duration.observe(stats.auth_time, route, stats.auth_outcome)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+
+# backend.db pool stat -> (metric name, type)
+POOL_METRICS = {
+    'size': ('db_pool_connections', 'gauge'),
+    'idle': ('db_pool_connections_idle', 'gauge'),
+    'in_use': ('db_pool_connections_in_use', 'gauge'),
+    'min_size': ('db_pool_min_size', 'gauge'),
+    'max_size': ('db_pool_max_size', 'gauge'),
+    'checkouts': ('db_pool_checkouts_total', 'counter'),
+    'created': ('db_pool_connections_created_total', 'counter'),
+    'recycled': ('db_pool_connections_recycled_total', 'counter'),
+    'failed_checks': ('db_pool_failed_checks_total', 'counter'),
+    'connect_errors': ('db_pool_connect_errors_total', 'counter'),
+    'waits': ('db_pool_waits_total', 'counter'),
+    'timeouts': ('db_pool_timeouts_total', 'counter'),
+    'wait_time_total': ('db_pool_wait_seconds_total', 'counter'),
+    'wait_time_max': ('db_pool_wait_seconds_max', 'gauge'),
+}
+
+
+def _gauges():
+    # Stats other components already keep, reported as of the scrape
+    from .authentication import profile_cache, token_cache
+    from .db import pool_stats
+    from .utils import error_log
+
+    gauges = []
+    for cache_name, lru in (('token', token_cache), ('profile', profile_cache)):
+        stats = lru.stats()
+        gauges.append((f'auth_{cache_name}_cache_hits_total', 'counter', {}, stats['hits']))
+        gauges.append((f'auth_{cache_name}_cache_misses_total', 'counter', {}, stats['misses']))
+        gauges.append((f'auth_{cache_name}_cache_entries', 'gauge', {}, stats['size']))
+    for (route, status, exception), count in sorted(error_log.totals().items()):
+        labels = {'route': route, 'status': status, 'exception': exception}
+        gauges.append(('api_errors_total', 'counter', labels, count))
+    for alias, stats in sorted(pool_stats().items()):
+        for key, (name, kind) in POOL_METRICS.items():
+            gauges.append((name, kind, {'alias': alias}, stats[key]))
+    return gauges
+
+
+def render():
+    """Render every metric in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.append(f'# HELP {histogram.name} {histogram.documentation}')
+        lines.append(f'# TYPE {histogram.name} histogram')
+        for labels, (cumulative, total, count) in sorted(histogram.collect().items()):
+            bounds = [_format_bound(b) for b in histogram.buckets] + ['+Inf']
+            for bound, value in zip(bounds, cumulative):
+                lines.append(f'{histogram.name}_bucket{_labels(histogram.labelnames, labels, [("le", bound)])} {value}')
+            lines.append(f'{histogram.name}_sum{_labels(histogram.labelnames, labels)} {total}')
+            lines.append(f'{histogram.name}_count{_labels(histogram.labelnames, labels)} {count}')
+
+    typed = set()
+    for name, kind, labels, value in _gauges():
+        if name not in typed:
+            typed.add(name)
+            lines.append(f'# TYPE {name} {kind}')
+        lines.append(f'{name}{_labels(labels.keys(), labels.values())} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+@query_budget(0)
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Scrapers must send METRICS_TOKEN as a bearer
+    token. Without one the endpoint only answers when DEBUG is on.
+    """
+    expected = getattr(settings, 'METRICS_TOKEN', None)
+    if not expected and not settings.DEBUG:
+        return HttpResponse(status=404)
+    if expected:
+        provided = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(provided.encode(), f'Bearer {expected}'.encode()):
+            return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,6 +1,15 @@
 import logging
 import json
+import time
+import jwt
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.deprecation import MiddlewareMixin
+from . import metrics
+from .authentication import decode_token
+from .budgets import get_query_budget
+from .routers import allow_replica_reads, reset_replica_reads, pin_key, replica_aliases
 
 logger = logging.getLogger(__name__)
 
@@ -10,16 +19,136 @@ class RequestLoggingMiddleware(MiddlewareMixin):
     """
     
     def process_request(self, request):
-        logger.debug(f"Request: {request.method} {request.path}")
+        logger.debug("Request: %s %s", request.method, request.path)
         # Don't log headers or request bodies in production
         return None
         
     def process_response(self, request, response):
         status_code = getattr(response, 'status_code', None)
-        logger.debug(f"Response: {request.method} {request.path} - {status_code}")
+        logger.debug("Response: %s %s - %s", request.method, request.path, status_code)
         
         # Only log minimal error information
         if status_code and status_code >= 500:
-            logger.error(f"Server error: {request.method} {request.path} - {status_code}")
+            logger.error("Server error: %s %s - %s", request.method, request.path, status_code)
                 
-        return response
\ No newline at end of file
+        return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Decide per request whether reads may use a read replica (see
+    backend/routers.py). Safe-method requests may, unless the caller wrote
+    within the last REPLICA_PIN_SECONDS; successful writes start that window
+    so users always read their own writes. Callers are identified by the
+    sub claim of their bearer token.
+    """
+    sync_capable = True
+    async_capable = True
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        user_id = self._user_id(request)
+        pinned = bool(user_id) and cache.get(pin_key(user_id)) is not None
+        token = allow_replica_reads(request.method in self.SAFE_METHODS and not pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+        if self._wrote(request, response, user_id):
+            cache.set(pin_key(user_id), 1, getattr(settings, 'REPLICA_PIN_SECONDS', 10))
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        user_id = self._user_id(request)
+        pinned = bool(user_id) and await cache.aget(pin_key(user_id)) is not None
+        token = allow_replica_reads(request.method in self.SAFE_METHODS and not pinned)
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+        if self._wrote(request, response, user_id):
+            await cache.aset(pin_key(user_id), 1, getattr(settings, 'REPLICA_PIN_SECONDS', 10))
+        return response
+
+    def _user_id(self, request):
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return None
+        try:
+            return decode_token(auth_header.split(' ')[1]).get('sub')
+        except jwt.InvalidTokenError:
+            # The view's authentication will reject it
+            return None
+
+    def _wrote(self, request, response, user_id):
+        return bool(user_id) and request.method not in self.SAFE_METHODS and response.status_code < 400
+
+
+class MetricsMiddleware:
+    """
+    Record per-route request metrics for /metrics (see backend/metrics.py):
+    latency, database queries and time, response size and time spent in
+    SupabaseAuthentication. Routes are labelled by their URL pattern, so
+    label cardinality stays bounded. Place first so the timing covers the
+    rest of the middleware stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self._observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self._observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def _observe(self, request, response, stats, duration):
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        # Streaming bodies are still being produced; only their headers are timed
+        size = None if response.streaming else len(response.content)
+        metrics.observe_request(route, request.method, response.status_code, duration, stats, size)
+        if match:
+            self._check_budget(match.func, route, request.method, stats.queries)
+
+    def _check_budget(self, view, route, method, queries):
+        try:
+            budget = get_query_budget(view, method)
+        except LookupError:
+            return
+        if budget is not None and queries > budget:
+            logger.warning("%s %s ran %d queries, over its budget of %d", method, route, queries, budget)
@@ -0,0 +1,78 @@
+from django.db import migrations
+
+
+# PostgreSQL only: a tsvector over the project's title/content and its owner's
+# username/bio, kept current by triggers on both tables and indexed with GIN.
+# The column is not part of the Project model; backend.search queries it directly.
+FORWARD_SQL = [
+    "ALTER TABLE backend_project ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION backend_project_search_vector(p_title text, p_content text, p_user_id text)
+    RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(p_content, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(
+                   (SELECT coalesce(username, '') || ' ' || coalesce(bio, '')
+                    FROM backend_profile WHERE user_id = p_user_id), '')), 'C')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE FUNCTION backend_project_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := backend_project_search_vector(NEW.title, NEW.content, NEW.user_id);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER backend_project_search_vector_update
+    BEFORE INSERT OR UPDATE ON backend_project
+    FOR EACH ROW EXECUTE FUNCTION backend_project_search_vector_trigger()
+    """,
+    # Owner changes re-run the project trigger above for every project they own
+    """
+    CREATE FUNCTION backend_profile_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        UPDATE backend_project SET search_vector = NULL WHERE user_id = NEW.user_id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER backend_profile_search_vector_update
+    AFTER INSERT OR UPDATE OF username, bio ON backend_profile
+    FOR EACH ROW EXECUTE FUNCTION backend_profile_search_vector_trigger()
+    """,
+    "UPDATE backend_project SET search_vector = NULL",
+    "CREATE INDEX backend_project_search_vector_idx ON backend_project USING GIN (search_vector)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS backend_project_search_vector_idx",
+    "DROP TRIGGER IF EXISTS backend_profile_search_vector_update ON backend_profile",
+    "DROP FUNCTION IF EXISTS backend_profile_search_vector_trigger()",
+    "DROP TRIGGER IF EXISTS backend_project_search_vector_update ON backend_project",
+    "DROP FUNCTION IF EXISTS backend_project_search_vector_trigger()",
+    "DROP FUNCTION IF EXISTS backend_project_search_vector(text, text, text)",
+    "ALTER TABLE backend_project DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_on_postgresql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_remove_joinrequest_project_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_postgresql(FORWARD_SQL), run_on_postgresql(REVERSE_SQL)),
+    ]
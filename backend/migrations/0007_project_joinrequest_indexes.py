@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-18 11:56
+
+import logging
+
+from django.db import migrations, models
+
+logger = logging.getLogger('backend.migrations')
+
+
+def remove_duplicate_join_requests(apps, schema_editor):
+    # Concurrent requests could slip past the old exists() check. Keep one
+    # request per (project_id, sender_id) so the constraint applies: one the
+    # owner has already answered if there is any, else the newest.
+    JoinRequest = apps.get_model('backend', 'JoinRequest')
+    db_alias = schema_editor.connection.alias
+    seen = set()
+    duplicates = []
+    rows = JoinRequest.objects.using(db_alias).annotate(
+        answered=models.Case(models.When(status='pending', then=0), default=1, output_field=models.IntegerField()),
+    ).order_by('-answered', '-created_at', '-id').values_list('id', 'project_id', 'sender_id')
+    for pk, project_id, sender_id in rows.iterator():
+        if (project_id, sender_id) in seen:
+            duplicates.append(pk)
+        else:
+            seen.add((project_id, sender_id))
+    if duplicates:
+        JoinRequest.objects.using(db_alias).filter(id__in=duplicates).delete()
+        logger.warning("Removed %d duplicate join requests: ids %s", len(duplicates), sorted(duplicates))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_project_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joinrequest',
+            index=models.Index(fields=['receiver_id', 'created_at'], name='joinreq_receiver_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joinrequest',
+            index=models.Index(fields=['sender_id', 'created_at'], name='joinreq_sender_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_at', 'id'], name='project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user_id', 'created_at'], name='project_user_created_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_join_requests, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='joinrequest',
+            constraint=models.UniqueConstraint(fields=('project_id', 'sender_id'), name='joinreq_unique_project_sender'),
+        ),
+    ]
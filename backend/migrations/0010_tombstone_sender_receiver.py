@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='receiver_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='sender_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
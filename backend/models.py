@@ -19,6 +19,16 @@ class Project(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Homepage feed, newest first (id breaks ties for cursor pagination)
+            models.Index(fields=['created_at', 'id'], name='project_created_idx'),
+            # get_user_projects
+            models.Index(fields=['user_id', 'created_at'], name='project_user_created_idx'),
+            # max(updated_at) validators for conditional GETs
+            models.Index(fields=['updated_at'], name='project_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -37,5 +47,32 @@ class JoinRequest(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # get_received_join_requests / get_sent_join_requests
+            models.Index(fields=['receiver_id', 'created_at'], name='joinreq_receiver_created_idx'),
+            models.Index(fields=['sender_id', 'created_at'], name='joinreq_sender_created_idx'),
+        ]
+        constraints = [
+            # One request per sender and project; also serves project_id lookups
+            models.UniqueConstraint(fields=['project_id', 'sender_id'], name='joinreq_unique_project_sender'),
+        ]
+
+    def __str__(self):
+        return f"Request for project {self.project_id} by {self.sender_id}"
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted Project or JoinRequest, so delta-sync clients can
+    drop it from their local cache. Written by the post_delete handlers in
+    backend/signals.py. Join request tombstones keep the sender and
+    receiver, the only users they are reported to.
+    """
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+    sender_id = models.CharField(max_length=255, blank=True, null=True)
+    receiver_id = models.CharField(max_length=255, blank=True, null=True)
+
     def __str__(self):
-        return f"Request for project {self.project_id} by {self.sender_id}"
\ No newline at end of file
+        return f"Deleted {self.model} {self.object_id}"
@@ -0,0 +1,161 @@
+import base64
+import datetime
+import json
+import math
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+# Keyset (cursor) pagination for the list endpoints.
+#
+# Pagination is opt-in: a request is paginated only when it carries a
+# `cursor` or `page_size` query parameter, so existing clients keep getting
+# plain lists. A page is fetched with a single indexed range query on the
+# queryset's ordering (always ending in id as a tie-breaker), so its cost does
+# not depend on how deep into the list the client is.
+
+DEFAULT_ORDERING = ('-created_at', '-id')
+DATETIME_FIELDS = ('created_at', 'updated_at')
+ID_FIELDS = ('id', 'pk')
+BIGINT_MAX = 2 ** 63 - 1
+
+
+def wants_pagination(request):
+    params = request.query_params
+    return 'cursor' in params or 'page_size' in params
+
+
+def get_page_size(request):
+    default = getattr(settings, 'PAGINATION_PAGE_SIZE', 20)
+    maximum = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 100)
+    try:
+        page_size = int(request.query_params.get('page_size', default))
+    except (TypeError, ValueError):
+        raise ValidationError({'page_size': 'Must be an integer.'})
+    return max(1, min(page_size, maximum))
+
+
+def get_ordering(queryset):
+    ordering = [str(field) for field in queryset.query.order_by] or list(DEFAULT_ORDERING)
+    if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+        ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+    return ordering
+
+
+def encode_cursor(values):
+    values = [v.isoformat() if isinstance(v, datetime.datetime) else v for v in values]
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+    if not isinstance(values, list) or len(values) != length:
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+    return values
+
+
+def decode_position(cursor, ordering):
+    """
+    Decode a cursor into values for the ordering's fields, each converted to
+    its field's type. Anything a client could have forged (wrong types,
+    nulls, naive or impossible dates, ids out of range) is a 400.
+    """
+    values = decode_cursor(cursor, len(ordering))
+    try:
+        return [_coerce(field.lstrip('-'), value) for field, value in zip(ordering, values)]
+    except (ValueError, TypeError, OverflowError):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+
+
+def _coerce(name, value):
+    if value is None or isinstance(value, (bool, list, dict)):
+        raise TypeError(f'{name} cannot be {value!r}')
+    if name in DATETIME_FIELDS:
+        parsed = parse_datetime(value)  # TypeError for non-strings, ValueError for impossible dates
+        if parsed is None or timezone.is_naive(parsed):
+            raise ValueError(f'{name} must be an ISO 8601 datetime with a UTC offset')
+        return parsed
+    if name in ID_FIELDS:
+        if not isinstance(value, int) or not -BIGINT_MAX <= value <= BIGINT_MAX:
+            raise ValueError(f'{name} must be a 64-bit integer')
+        return value
+    if name == 'rank':
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError('rank must be finite')
+        return value
+    return value
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the "rows strictly after this position" predicate for an ordering,
+    i.e. the expanded form of (a, b, c) < (va, vb, vc) with per-field direction.
+    """
+    names = [field.lstrip('-') for field in ordering]
+    after = Q()
+    for i, field in enumerate(ordering):
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition = Q(**{f'{names[i]}__{lookup}': values[i]})
+        for j in range(i):
+            condition &= Q(**{names[j]: values[j]})
+        after |= condition
+    # Redundant bound on the leading column so the planner can range-scan its index
+    leading = 'lte' if ordering[0].startswith('-') else 'gte'
+    return Q(**{f'{names[0]}__{leading}': values[0]}) & after
+
+
+def page_query(request, queryset):
+    """
+    Return (page, ordering, page_size): the unevaluated query for the page
+    the request asks for, with one extra row to tell whether more follow.
+    """
+    ordering = get_ordering(queryset)
+    page_size = get_page_size(request)
+    queryset = queryset.order_by(*ordering)
+
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        queryset = queryset.filter(keyset_filter(ordering, decode_position(cursor, ordering)))
+
+    return queryset[:page_size + 1], ordering, page_size
+
+
+def paginate_queryset(request, queryset, position=None):
+    """
+    Return one page of the queryset as (items, next_cursor). next_cursor is
+    None on the last page. position(item, fields) returns an item's values
+    for the ordering fields; by default they are read as attributes, which
+    suits model instances.
+    """
+    page, ordering, page_size = page_query(request, queryset)
+    return _split_page(list(page), ordering, page_size, position)
+
+
+async def apaginate_queryset(request, queryset, position=None):
+    page, ordering, page_size = page_query(request, queryset)
+    return _split_page([item async for item in page], ordering, page_size, position)
+
+
+def _attributes(item, fields):
+    return [getattr(item, field) for field in fields]
+
+
+def _split_page(items, ordering, page_size, position=None):
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        fields = [field.lstrip('-') for field in ordering]
+        next_cursor = encode_cursor((position or _attributes)(items[-1], fields))
+    return items, next_cursor
+
+
+def page_data(results, next_cursor):
+    return {'results': results, 'next': next_cursor}
@@ -0,0 +1,43 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: without it responses are encoded by JSONRenderer
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    The output is byte-for-byte what JSONRenderer produces with the default
+    settings (compact separators, UTF-8, U+2028/U+2029 escaped): datetimes
+    and every type orjson does not handle natively are converted by DRF's
+    JSONEncoder, and data orjson rejects (such as non-string keys or
+    integers beyond 64 bits) falls back to JSONRenderer. The API renders no
+    floats; orjson would write exponents and non-finite values differently.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self._defaults(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer, for JavaScript's benefit
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    def _defaults(self, accepted_media_type, renderer_context):
+        # Indented, ASCII-only or non-strict output is left to JSONRenderer
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return False
+        return self.compact and self.strict and not self.ensure_ascii
+
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    return _encoder.default(obj)
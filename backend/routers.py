@@ -0,0 +1,67 @@
+import contextvars
+import random
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Read-replica routing.
+#
+# Reads go to one of DATABASE_REPLICAS only while serving a request that
+# ReplicaPinMiddleware has cleared for it: a safe-method request from a
+# caller who has not written recently. Writes, reads made while handling a
+# write, reads inside a transaction and everything outside a request
+# (management commands, migrations, the shell) stay on the primary. So do
+# reads that fill the shared response cache: a replica lagging behind a
+# write would otherwise put its stale rows in the cache under the new
+# generation, where they would stay until the next write.
+
+_read_from_replica = contextvars.ContextVar('read_from_replica', default=False)
+
+
+def allow_replica_reads(allowed):
+    """
+    Allow or forbid replica reads for the current context. Returns a token
+    for reset_replica_reads().
+    """
+    return _read_from_replica.set(allowed)
+
+
+def reset_replica_reads(token):
+    _read_from_replica.reset(token)
+
+
+def read_from_primary():
+    """Send the rest of the current request's reads to the primary."""
+    _read_from_replica.set(False)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads to a random replica when allowed.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or not _read_from_replica.get():
+            return None
+        # Keep reads inside a transaction on the connection doing the writing
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
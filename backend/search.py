@@ -0,0 +1,41 @@
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from .models import Profile, Project
+
+# Text search configuration used both by the search_vector triggers
+# (see migration 0006) and by the queries below. They must match.
+SEARCH_CONFIG = 'english'
+
+
+def uses_full_text_search():
+    return connection.vendor == 'postgresql'
+
+
+def search_projects(queryset, search_query):
+    """
+    Filter a Project queryset by a free-text query, most relevant first.
+
+    On PostgreSQL this matches against the trigger-maintained search_vector
+    column (title, content and the owner's username/bio) through its GIN
+    index and orders by ts_rank. Other databases fall back to the original
+    icontains search ordered by created_at.
+    """
+    if not uses_full_text_search():
+        return queryset.filter(
+            Q(title__icontains=search_query) |
+            Q(content__icontains=search_query) |
+            Q(user_id__in=Profile.objects.filter(
+                Q(username__icontains=search_query) |
+                Q(bio__icontains=search_query)
+            ).values_list('user_id', flat=True))
+        ).order_by('-created_at')
+
+    table = Project._meta.db_table
+    tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+    return queryset.filter(
+        RawSQL(f'"{table}"."search_vector" @@ {tsquery}', (search_query,), output_field=BooleanField())
+    ).annotate(
+        # Cast to double precision so the value round-trips exactly through JSON
+        rank=RawSQL(f'ts_rank("{table}"."search_vector", {tsquery})::float8', (search_query,), output_field=FloatField())
+    ).order_by('-rank', '-created_at')
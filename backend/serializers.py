@@ -1,5 +1,11 @@
-from rest_framework import serializers
+from functools import lru_cache
+from django.conf import settings
+from django.db.models import Case, CharField, F, Value, When
+from django.db.models.functions import Left
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import Profile, Project, JoinRequest
+from .pagination import get_ordering
 
 # This file contains the serializers for the Profile and Project models.
 
@@ -24,3 +30,288 @@ class JoinRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = JoinRequest
         fields = '__all__'
+
+
+# Input of create_join_request; the receiver comes from the project itself
+class JoinRequestCreateSerializer(serializers.Serializer):
+    project_id = serializers.IntegerField()
+    message = serializers.CharField(allow_blank=True, allow_null=True, default='')
+
+
+# Input of moderate_join_requests: a status for the listed requests, or for all pending ones of a project
+class JoinRequestModerationSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=['accepted', 'declined'])
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    project_id = serializers.IntegerField(required=False)
+
+    def validate_ids(self, ids):
+        max_ids = getattr(settings, 'JOIN_REQUEST_MODERATION_MAX_IDS', 100)
+        if len(ids) > max_ids:
+            raise serializers.ValidationError(f"At most {max_ids} ids per request")
+        return list(dict.fromkeys(ids))
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('project_id' in attrs):
+            raise serializers.ValidationError("Pass either ids or project_id")
+        return attrs
+
+
+
+class ValuesListSerializer:
+    """
+    Read-only fast path for serializer_class(queryset, many=True).data.
+
+    Rows are fetched with values_list() instead of being built into model
+    instances, and only fields whose JSON form differs from the database
+    value (datetimes) go through their DRF field's to_representation(), so
+    the result is identical to the ModelSerializer's. Keyword arguments
+    replace a field's column with a query expression, e.g. to rewrite
+    values in SQL. Only for serializers of plain model fields.
+
+    `only` limits the serialized fields (and so the selected columns);
+    `summary` returns the expressions of a lighter projection, such as a
+    truncated text column. variant() derives both from a base instance.
+    """
+
+    # Fields whose representation of a database value is the value itself
+    PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.ChoiceField, serializers.BooleanField)
+
+    def __init__(self, serializer_class, only=None, summary=None, **expressions):
+        self.serializer_class = serializer_class
+        self.only = only
+        self.summary = summary
+        self.expressions = expressions
+        self._fields = None
+        self._variants = {}
+
+    def variant(self, only=None, summary=False):
+        """
+        This serializer limited to the fields in `only` (all when None) and,
+        with summary=True, using its summary expressions. Variants are kept,
+        so their setup is paid once.
+        """
+        key = (frozenset(only) if only is not None else None, summary)
+        variant = self._variants.get(key)
+        if variant is None:
+            expressions = {**self.expressions, **(self.summary() if summary else {})}
+            variant = self._variants[key] = ValuesListSerializer(self.serializer_class, only, **expressions)
+        return variant
+
+    def _setup(self):
+        # Deferred until first use, when the app registry is ready
+        if self._fields is None:
+            fields = self.serializer_class().fields
+            if self.only is not None:
+                fields = {name: field for name, field in fields.items() if name in self.only}
+            self._names = list(fields)
+            self._index = {name: i for i, name in enumerate(self._names)}
+            self._converters = [
+                (i, field) for i, field in enumerate(fields.values())
+                if not isinstance(field, self.PASSTHROUGH_FIELDS)
+            ]
+            self._fields = fields
+        return self
+
+    def rows(self, queryset):
+        """
+        Narrow queryset to the tuples serialize() takes. Ordering fields
+        that are not serialized (e.g. a search rank) are appended, so
+        pagination can build cursors from the rows.
+        """
+        self._setup()
+        columns = [self.expressions.get(name, name) for name in self._names]
+        return queryset.values_list(*columns, *self._extra_columns(queryset))
+
+    def serialize(self, rows):
+        """Turn tuples fetched by rows() into the serializer's data."""
+        self._setup()
+        names = self._names
+        converters = [(i, _fast_representation(field)) for i, field in self._converters]
+        if not converters:
+            return [dict(zip(names, row)) for row in rows]
+        data = []
+        for row in rows:
+            row = list(row)
+            for i, to_representation in converters:
+                if row[i] is not None:
+                    row[i] = to_representation(row[i])
+            data.append(dict(zip(names, row)))
+        return data
+
+    def data(self, queryset):
+        return self.serialize(self.rows(queryset))
+
+    async def adata(self, queryset):
+        return self.serialize([row async for row in self.rows(queryset)])
+
+    def position(self, row, fields):
+        """Ordering values of a row, for pagination cursors."""
+        self._setup()
+        values = []
+        extra = len(self._names)
+        for field in fields:
+            field = _column(field)
+            if field in self._index:
+                values.append(row[self._index[field]])
+            else:
+                # Appended by rows(), in ordering order
+                values.append(row[extra])
+                extra += 1
+        return values
+
+    def _extra_columns(self, queryset):
+        # The columns pagination builds cursors from (see get_ordering)
+        extra = []
+        for field in get_ordering(queryset):
+            name = _column(field)
+            if name not in self._index and name not in extra:
+                extra.append(name)
+        return extra
+
+
+def _column(field):
+    name = field.lstrip('-')
+    return 'id' if name == 'pk' else name
+
+
+def _fast_representation(field):
+    """
+    field.to_representation, minus the per-value work that is the same for
+    every row. DateTimeField looks up the active timezone for each value,
+    which dominates serializing a page; it is resolved once per call here.
+    """
+    if not isinstance(field, serializers.DateTimeField):
+        return field.to_representation
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def to_representation(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return to_representation
+
+
+# Owners of projects created before user ids were enforced, rendered as 'unknown'
+UNKNOWN_OWNER = Case(
+    When(user_id__in=['', '0'], then=Value('unknown')),
+    default=F('user_id'),
+    output_field=CharField(),
+)
+
+
+
+def project_summary():
+    # ?projection=summary: cards only show the start of the content
+    return {'content': Left('content', getattr(settings, 'PROJECT_SUMMARY_LENGTH', 200))}
+
+
+project_values = ValuesListSerializer(ProjectSerializer, summary=project_summary)
+project_feed_values = ValuesListSerializer(ProjectSerializer, summary=project_summary, user_id=UNKNOWN_OWNER)
+join_request_values = ValuesListSerializer(JoinRequestSerializer)
+
+
+# Related objects that can be inlined into join requests with ?expand=
+JOIN_REQUEST_EXPANSIONS = ('sender', 'receiver', 'project')
+
+
+def parse_expand(request, allowed=JOIN_REQUEST_EXPANSIONS):
+    """
+    Read the comma-separated ?expand= parameter, rejecting unknown names.
+    """
+    value = request.query_params.get('expand', '')
+    expand = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = expand.difference(allowed)
+    if unknown:
+        raise serializers.ValidationError({'expand': f"Unknown expansion(s): {', '.join(sorted(unknown))}"})
+    return expand
+
+
+@lru_cache
+def _field_names(serializer_class):
+    return tuple(serializer_class().fields)
+
+
+def parse_fields(request, serializer_class):
+    """
+    Read the comma-separated ?fields= parameter (a sparse fieldset),
+    rejecting names serializer_class does not have. Returns None when the
+    request wants every field.
+    """
+    value = request.query_params.get('fields', '')
+    fields = {name.strip() for name in value.split(',') if name.strip()}
+    if not fields:
+        return None
+    unknown = fields.difference(_field_names(serializer_class))
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown field(s): {', '.join(sorted(unknown))}"})
+    return fields
+
+
+def parse_projection(request, values, required=()):
+    """
+    Return the ValuesListSerializer a list request asks for: values limited
+    to ?fields= and, with ?projection=summary, its summary variant. Fields
+    in `required` must not be left out.
+    """
+    projection = request.query_params.get('projection')
+    if projection is not None and (projection != 'summary' or values.summary is None):
+        raise serializers.ValidationError({'projection': f"Unknown projection: {projection}"})
+    fields = parse_fields(request, values.serializer_class)
+    missing = set(required).difference(fields) if fields is not None else ()
+    if missing:
+        raise serializers.ValidationError({'fields': f"Must include {', '.join(sorted(missing))}"})
+    return values.variant(fields, summary=projection == 'summary')
+
+
+def parse_join_request_projection(request, expand):
+    """parse_projection() for join request lists expanded with `expand`."""
+    # Expansions are looked up by their id fields, so ?fields= must keep those
+    return parse_projection(request, join_request_values, required=[f'{name}_id' for name in expand])
+
+
+def select_fields(data, fields):
+    """Keep only `fields` (from parse_fields()) of serialized data, a dict or a list of dicts."""
+    if fields is None:
+        return data
+    if isinstance(data, list):
+        return [select_fields(item, fields) for item in data]
+    return {name: value for name, value in data.items() if name in fields}
+
+
+def expand_join_requests(data, expand):
+    """
+    Inline sender/receiver profiles and projects into serialized join requests.
+    JoinRequest only stores raw ids, so related rows are fetched with one
+    IN query per model regardless of how many requests are in data.
+    Missing rows are rendered as None.
+    """
+    if not expand:
+        return data
+
+    profiles = {}
+    profile_fields = [field for field in ('sender', 'receiver') if field in expand]
+    if profile_fields:
+        user_ids = {item[f'{field}_id'] for item in data for field in profile_fields}
+        profiles = {
+            profile.user_id: ProfileSerializer(profile).data
+            for profile in Profile.objects.filter(user_id__in=user_ids)
+        }
+
+    projects = {}
+    if 'project' in expand:
+        project_ids = {item['project_id'] for item in data}
+        projects = {
+            project.id: ProjectSerializer(project).data
+            for project in Project.objects.filter(id__in=project_ids)
+        }
+
+    for item in data:
+        for field in profile_fields:
+            item[field] = profiles.get(item[f'{field}_id'])
+        if 'project' in expand:
+            item['project'] = projects.get(item['project_id'])
+    return data
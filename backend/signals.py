@@ -0,0 +1,19 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .metrics import install_query_timer
+from .models import JoinRequest, Project, Tombstone
+
+
+# Deletes are hard deletes, so leave a tombstone behind for /sync/ clients
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=JoinRequest)
+def record_tombstone(sender, instance, **kwargs):
+    tombstone = Tombstone(model=sender._meta.model_name, object_id=instance.pk)
+    if sender is JoinRequest:
+        tombstone.sender_id, tombstone.receiver_id = instance.sender_id, instance.receiver_id
+    tombstone.save()
+
+
+# Count and time every query for the per-request metrics
+connection_created.connect(install_query_timer, dispatch_uid='backend.metrics.install_query_timer')
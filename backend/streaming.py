@@ -0,0 +1,90 @@
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from .renderers import FastJSONRenderer
+
+# Streamed JSON arrays for large unpaginated lists.
+#
+# A plain list response holds every row, its serialized dict and the whole
+# rendered body in memory at once. Lists longer than STREAMING_MIN_ROWS are
+# instead read in chunks of STREAMING_CHUNK_SIZE rows (through a server-side
+# cursor on PostgreSQL) and sent as they are rendered, so worker memory stays
+# flat and the first rows leave before the last are read. The body is
+# byte-for-byte the one JSONRenderer would produce for the whole list.
+# Streamed lists are not stored in the response cache.
+
+
+def wants_streaming(validators):
+    """
+    Whether a list should be streamed, given the Validators computed for it
+    (whose count is the number of rows).
+    """
+    threshold = getattr(settings, 'STREAMING_MIN_ROWS', 1000)
+    count = validators.count if validators else None
+    return threshold is not None and count is not None and count > threshold
+
+
+def streaming_response(values, queryset):
+    """Stream queryset as a JSON array, serialized with a ValuesListSerializer."""
+    rows, chunk_size = _rows(values, queryset)
+
+    def chunks():
+        while chunk := _take(rows, chunk_size):
+            yield values.serialize(chunk)
+    return _response(_json_array(chunks()))
+
+
+def astreaming_response(values, queryset):
+    rows, chunk_size = _rows(values, queryset)
+
+    async def chunks():
+        # Not aiterator(): for values_list() querysets it starts the query in the event loop
+        while chunk := await sync_to_async(_take)(rows, chunk_size):
+            yield values.serialize(chunk)
+    return _response(_ajson_array(chunks()))
+
+
+def _rows(values, queryset):
+    chunk_size = getattr(settings, 'STREAMING_CHUNK_SIZE', 500)
+    # Routing is decided now: replica reads are only allowed while the view runs
+    rows = values.rows(queryset.using(queryset.db)).iterator(chunk_size=chunk_size)
+    return rows, chunk_size
+
+
+def _take(rows, count):
+    return list(islice(rows, count))
+
+
+def is_list_stream(response):
+    """Whether response is a (finite) list streamed by this module."""
+    return getattr(response, '_list_stream', False)
+
+
+def _response(content):
+    response = StreamingHttpResponse(content, content_type=FastJSONRenderer.media_type)
+    response._list_stream = True
+    return response
+
+
+def _render_items(chunk):
+    # Rendered as a list, minus the brackets
+    return FastJSONRenderer().render(chunk)[1:-1]
+
+
+def _json_array(chunks):
+    yield b'['
+    separator = b''
+    for chunk in chunks:
+        yield separator + _render_items(chunk)
+        separator = b','
+    yield b']'
+
+
+async def _ajson_array(chunks):
+    yield b'['
+    separator = b''
+    async for chunk in chunks:
+        yield separator + _render_items(chunk)
+        separator = b','
+    yield b']'
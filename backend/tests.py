@@ -1,11 +1,55 @@
 # backend/tests.py
 
-from django.test import TestCase
-from rest_framework.test import APIClient, APITestCase
+import asyncio
+import importlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import types
+from collections import defaultdict
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.http import StreamingHttpResponse
+from django.urls import ResolverMatch, URLPattern, resolve
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
 from rest_framework import status
-from .models import Profile, Project, JoinRequest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from django.db.models import Case, FloatField, Value, When
+from django.db.migrations.executor import MigrationExecutor
+from django.db.utils import ConnectionHandler
+from .models import Profile, Project, JoinRequest, Tombstone
+from .pagination import encode_cursor, paginate_queryset
+from .db import ConnectionPool, PoolTimeout, pool_stats
+from .db import base as pooled_backend
+from .routers import ReplicaRouter, allow_replica_reads, reset_replica_reads
+from . import async_views, metrics, urls, views
+from .budgets import get_query_budget
+from .utils import custom_exception_handler, error_log
+from .authentication import SupabaseAuthentication, profile_cache, token_cache
+from .event_views import events
+from .events import Broker, InProcessBroker, get_broker, user_channel
+from .log_handlers import BackgroundHandler, SamplingFilter
+from .renderers import FastJSONRenderer
+from .cache import LRUCache, get_cached_response, response_cache_key
+from .serializers import JoinRequestSerializer, ProjectSerializer, join_request_values, project_feed_values, project_values
 import jwt
 from django.conf import settings
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from datetime import timedelta
+from django.utils import timezone
+from django.utils.http import http_date
 
 class AuthenticationTests(APITestCase):
     """Tests for authentication functionality"""
@@ -79,6 +123,7 @@ class ProjectAPITests(APITestCase):
     
     def setUp(self):
         """Set up test data and clients"""
+        cache.clear()
         self.client = APIClient()
         # Create a test profile
         self.test_profile = Profile.objects.create(
@@ -108,4 +153,2266 @@ class ProjectAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         data = response.json()
         self.assertEqual(len(data), 1)
-        self.assertEqual(data[0]['title'], 'Test Project')
\ No newline at end of file
+        self.assertEqual(data[0]['title'], 'Test Project')
+
+class TokenCacheTests(APITestCase):
+    """Tests for the verified-token cache used by SupabaseAuthentication"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        self.token_cache = token_cache
+        self.token_cache.clear()
+        self.client = APIClient()
+        self.test_profile = Profile.objects.create(
+            user_id='test_user_id',
+            username='testuser',
+            email='test@example.com'
+        )
+
+    def _token(self, **claims):
+        payload = {'sub': 'test_user_id', 'email': 'test@example.com'}
+        payload.update(claims)
+        return jwt.encode(payload, settings.SUPABASE_JWT_SECRET, algorithm='HS256')
+
+    def test_repeated_token_is_served_from_cache(self):
+        """Test that the second request with the same token skips verification"""
+        token = self._token()
+        for _ in range(3):
+            response = self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        stats = self.token_cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_entry_does_not_outlive_exp_claim(self):
+        """Test that a cached token is re-verified once its exp claim has passed"""
+        now = time.time()
+        token = self._token(exp=int(now) + 60)
+        response = self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with mock.patch('time.time', return_value=now + 120):
+            self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.token_cache.stats()['hits'], 0)
+        self.assertEqual(self.token_cache.stats()['misses'], 2)
+
+    def test_invalid_token_is_not_cached(self):
+        """Test that failed verifications are not stored"""
+        token = jwt.encode({'sub': 'test_user_id'}, 'wrong-secret', algorithm='HS256')
+        for _ in range(2):
+            response = self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.token_cache.stats()['size'], 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+
+class ProfileCacheTests(APITestCase):
+    """Tests for the authenticated profile cache"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        profile_cache.clear()
+        self.client = APIClient()
+        self.test_profile = Profile.objects.create(
+            user_id='test_user_id',
+            username='testuser',
+            email='test@example.com'
+        )
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+
+    def test_warm_path_skips_database(self):
+        """Test that a cached profile is resolved without any query"""
+        self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+        with self.assertNumQueries(0):
+            response = self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['username'], 'testuser')
+
+    def test_profile_update_invalidates_cache(self):
+        """Test that PATCH /profile/<id>/ drops the cached profile"""
+        self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+        response = self.client.patch(
+            f'/profile/{self.test_profile.user_id}/',
+            {'bio': 'updated bio'},
+            format='json',
+            HTTP_AUTHORIZATION=f'Bearer {self.test_token}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+        self.assertEqual(response.json()['bio'], 'updated bio')
+
+    def test_shared_tier_serves_cold_workers(self):
+        """Test that a profile cached in the shared tier is used after a local miss"""
+        cache.clear()
+        with override_settings(PROFILE_CACHE_ALIAS='default'):
+            self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+            profile_cache.clear()
+            with self.assertNumQueries(0):
+                response = self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+        self.assertEqual(response.json()['user_id'], 'test_user_id')
+
+
+class ProjectSearchTests(APITestCase):
+    """Tests for /homepage/?query= search"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        self.client = APIClient()
+        Profile.objects.create(user_id='owner_id', username='dolphinlover', bio='Marine biology student')
+        Project.objects.create(title='Reef Mapper', content='Mapping coral reefs with drones', user_id='owner_id')
+        Project.objects.create(title='Budget App', content='Track spending', user_id='other_id')
+
+    def test_search_matches_title_and_content(self):
+        """Test that title and content terms match"""
+        response = self.client.get('/homepage/', {'query': 'coral'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['title'] for p in response.json()], ['Reef Mapper'])
+
+    def test_search_matches_owner_profile(self):
+        """Test that the owner's username and bio are searchable"""
+        for query in ('dolphinlover', 'biology'):
+            response = self.client.get('/homepage/', {'query': query})
+            self.assertEqual([p['title'] for p in response.json()], ['Reef Mapper'])
+
+    def test_search_without_matches(self):
+        """Test that a query matching nothing returns an empty list"""
+        response = self.client.get('/homepage/', {'query': 'spaceship'})
+        self.assertEqual(response.json(), [])
+
+
+@skipUnless(connections['default'].vendor == 'postgresql', "full-text search needs PostgreSQL")
+class PostgresSearchTests(APITestCase):
+    """Tests for the PostgreSQL full-text search path: triggers, ranking and rank cursors"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        self.client = APIClient()
+        Profile.objects.create(user_id='owner_id', username='dolphinlover', bio='Marine biology student')
+        # Older, but matches in the title (weight A) rather than the content (weight B)
+        Project.objects.create(title='Coral Survey', content='Field notes', user_id='owner_id')
+        Project.objects.create(title='Reef Mapper', content='Mapping coral reefs with drones', user_id='owner_id')
+        Project.objects.create(title='Budget App', content='Track spending', user_id='other_id')
+
+    def _search(self, query, **params):
+        response = self.client.get('/homepage/', {'query': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_orders_by_rank(self):
+        """Test that stronger matches come first regardless of age, and stemming applies"""
+        self.assertEqual([p['title'] for p in self._search('coral')], ['Coral Survey', 'Reef Mapper'])
+        self.assertEqual([p['title'] for p in self._search('mapped')], ['Reef Mapper'])
+
+    def test_triggers_keep_the_vector_current(self):
+        """Test that project and owner profile edits are searchable immediately"""
+        Project.objects.filter(title='Budget App').update(content='Saving for scuba gear')
+        self.assertEqual([p['title'] for p in self._search('scuba')], ['Budget App'])
+
+        self.assertEqual([p['title'] for p in self._search('oceanographer')], [])
+        Profile.objects.filter(user_id='owner_id').update(bio='Oceanographer')
+        self.assertEqual(len(self._search('oceanographer')), 2)
+        self.assertEqual(self._search('biology'), [])
+
+        # The owner's profile is picked up when a project is created for it
+        Profile.objects.create(user_id='other_id', username='skipper')
+        Project.objects.create(title='Ledger', content='Accounts', user_id='other_id')
+        self.assertCountEqual([p['title'] for p in self._search('skipper')], ['Ledger', 'Budget App'])
+
+    def test_rank_cursors_walk_every_result_once(self):
+        """Test that paging by rank returns the same results, in order, as the unpaginated search"""
+        for i in range(4):
+            Project.objects.create(title=f'Coral {i}', content='coral ' * i, user_id='owner_id')
+        expected = [p['id'] for p in self._search('coral')]
+        self.assertEqual(len(expected), 6)
+
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            page = self._search('coral', **params)
+            seen += [p['id'] for p in page['results']]
+            cursor = page['next']
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+
+
+class PaginationTests(APITestCase):
+    """Tests for cursor pagination on list endpoints"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        # Several projects share a created_at so the id tie-breaker is exercised
+        now = timezone.now()
+        for i in range(7):
+            Project.objects.create(
+                title=f'Project {i}',
+                content='content',
+                user_id='test_user_id',
+                created_at=now - timezone.timedelta(minutes=i // 3)
+            )
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+
+    def test_walk_all_pages(self):
+        """Test that following next cursors returns every project exactly once, in order"""
+        expected = list(Project.objects.order_by('-created_at', '-id').values_list('title', flat=True))
+        seen = []
+        params = {'page_size': 3}
+        while True:
+            response = self.client.get('/homepage/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.json()
+            self.assertLessEqual(len(data['results']), 3)
+            seen.extend(p['title'] for p in data['results'])
+            if not data['next']:
+                break
+            params = {'page_size': 3, 'cursor': data['next']}
+        self.assertEqual(seen, expected)
+
+    def test_unpaginated_response_is_a_list(self):
+        """Test that clients not asking for pages still get a plain list"""
+        response = self.client.get('/homepage/')
+        self.assertEqual(len(response.json()), 7)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = self.client.get('/homepage/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_forged_cursors(self):
+        """Test that well-formed cursors holding the wrong values are rejected with 400"""
+        now = timezone.now().isoformat()
+        forged = [
+            ['yesterday', 1],  # Not a datetime
+            [None, 1],
+            [now, 'one'],  # Wrong-type id
+            [now, 2 ** 64],
+            [now, True],
+            [now.replace('+00:00', ''), 1],  # Naive
+            ['2024-13-01T00:00:00+00:00', 1],  # Impossible date
+            [{'created_at': now}, 1],
+        ]
+        for values in forged:
+            for path in ('/homepage/', '/join-request/sent/'):
+                with self.subTest(values=values, path=path):
+                    response = self.client.get(
+                        path, {'cursor': encode_cursor(values)}, HTTP_AUTHORIZATION=f'Bearer {self.test_token}'
+                    )
+                    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                    self.assertEqual(response.json(), {'cursor': 'Invalid cursor.'})
+
+    def test_sent_join_requests_pages(self):
+        """Test that join-request lists accept the same pagination parameters"""
+        for project in Project.objects.all()[:5]:
+            JoinRequest.objects.create(project_id=project.id, sender_id='test_user_id', receiver_id='owner')
+        response = self.client.get(
+            '/join-request/sent/', {'page_size': 2},
+            HTTP_AUTHORIZATION=f'Bearer {self.test_token}'
+        )
+        data = response.json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNotNone(data['next'])
+
+
+class QueryPlanTests(APITestCase):
+    """
+    Capture the SQL each read view runs and check its query plan, so a change
+    that makes a hot lookup fall back to a full table scan fails the suite.
+    """
+
+    def setUp(self):
+        """Set up test data and clients"""
+        profile_cache.clear()
+        token_cache.clear()
+        cache.clear()
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        Profile.objects.create(user_id='other_user_id', username='other')
+        self.project = Project.objects.create(title='Mine', content='content', user_id='test_user_id')
+        other = Project.objects.create(title='Theirs', content='content', user_id='other_user_id')
+        JoinRequest.objects.create(project_id=self.project.id, sender_id='other_user_id', receiver_id='test_user_id')
+        JoinRequest.objects.create(project_id=other.id, sender_id='test_user_id', receiver_id='other_user_id')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+
+    def _full_scans(self, sql):
+        """Return the backend tables the plan for sql reads with a full scan."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Tiny test tables would otherwise always be scanned sequentially
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+                plan = [row[0] for row in cursor.fetchall()]
+                return [m.group(1) for line in plan for m in [re.search(r'Seq Scan on (backend_\w+)', line)] if m]
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[-1] for row in cursor.fetchall()]
+            return [m.group(1) for line in plan for m in [re.match(r'SCAN (?:TABLE )?(backend_\w+)$', line)] if m]
+
+    def _assert_indexed(self, method, path, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(
+                path, data, format='json', HTTP_AUTHORIZATION=f'Bearer {self.test_token}'
+            )
+        self.assertLess(response.status_code, 500)
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT') or 'backend_' not in sql:
+                continue
+            self.assertEqual(self._full_scans(sql), [], f'{method.upper()} {path} scans a full table:\n{sql}')
+
+    def test_profile_views(self):
+        self._assert_indexed('get', '/me/')
+        self._assert_indexed('get', '/profile/other_user_id/')
+
+    def test_project_views(self):
+        self._assert_indexed('get', '/homepage/')
+        self._assert_indexed('get', '/homepage/?page_size=1')
+        cursor = self.client.get('/homepage/?page_size=1').json()['next']
+        self._assert_indexed('get', f'/homepage/?page_size=1&cursor={cursor}')
+        self._assert_indexed('get', '/user-projects/test_user_id/')
+        self._assert_indexed('get', f'/projects/{self.project.id}/')
+
+    def test_join_request_views(self):
+        self._assert_indexed('get', '/join-request/user/test_user_id/')
+        self._assert_indexed('get', '/join-request/sent/')
+        self._assert_indexed('post', '/join-request/', {'project_id': self.project.id + 1})
+
+
+class JoinRequestExpandTests(APITestCase):
+    """Tests for ?expand= on the join-request lists"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+
+    def _add_requests(self, count, start=0):
+        for i in range(start, start + count):
+            Profile.objects.create(user_id=f'sender_{i}', username=f'sender{i}')
+            project = Project.objects.create(title=f'Project {i}', content='content', user_id='test_user_id')
+            JoinRequest.objects.create(project_id=project.id, sender_id=f'sender_{i}', receiver_id='test_user_id')
+
+    def _get(self, path):
+        return self.client.get(path, HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+
+    def test_expanded_objects_are_inlined(self):
+        """Test that sender, receiver and project are embedded"""
+        self._add_requests(1)
+        response = self._get('/join-request/user/test_user_id/?expand=sender,receiver,project')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.json()[0]
+        self.assertEqual(item['sender']['username'], 'sender0')
+        self.assertEqual(item['receiver']['username'], 'testuser')
+        self.assertEqual(item['project']['title'], 'Project 0')
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """Test that expansion uses a constant number of queries"""
+        path = '/join-request/user/test_user_id/?expand=sender,receiver,project'
+        self._add_requests(3)
+        self._get(path)  # warm the auth caches
+        with CaptureQueriesContext(connection) as small:
+            self._get(path)
+        self._add_requests(27, start=3)
+        with CaptureQueriesContext(connection) as large:
+            response = self._get(path)
+        self.assertEqual(len(response.json()), 30)
+        self.assertEqual(len(small), len(large))
+
+    def test_missing_related_object_is_null(self):
+        """Test that a request pointing at a deleted project expands to null"""
+        JoinRequest.objects.create(project_id=999, sender_id='test_user_id', receiver_id='someone')
+        response = self._get('/join-request/sent/?expand=project')
+        self.assertIsNone(response.json()[0]['project'])
+
+    def test_unknown_expansion(self):
+        """Test that unknown expansion names are rejected"""
+        response = self._get('/join-request/sent/?expand=owner')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DashboardTests(APITestCase):
+    """Tests for the /me/dashboard/ endpoint"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        Profile.objects.create(user_id='other_user_id', username='other')
+        mine = Project.objects.create(title='Mine', content='content', user_id='test_user_id')
+        theirs = Project.objects.create(title='Theirs', content='content', user_id='other_user_id')
+        JoinRequest.objects.create(project_id=mine.id, sender_id='other_user_id', receiver_id='test_user_id')
+        JoinRequest.objects.create(
+            project_id=theirs.id, sender_id='test_user_id', receiver_id='other_user_id', status='accepted'
+        )
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+
+    def test_dashboard_contents(self):
+        """Test that the dashboard aggregates the profile screen data"""
+        response = self.client.get(
+            '/me/dashboard/?expand=sender,project',
+            HTTP_AUTHORIZATION=f'Bearer {self.test_token}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['profile']['user_id'], 'test_user_id')
+        self.assertEqual([p['title'] for p in data['projects']], ['Mine'])
+        self.assertEqual(data['received_requests'][0]['sender']['username'], 'other')
+        self.assertEqual(data['sent_requests'][0]['project']['title'], 'Theirs')
+        self.assertEqual(data['counts'], {'pending_received': 1, 'pending_sent': 0})
+
+    def test_dashboard_query_count(self):
+        """Test that the dashboard runs a fixed number of queries once auth is warm"""
+        path = '/me/dashboard/?expand=sender,receiver,project'
+        self.client.get(path, HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+        with self.assertNumQueries(5):
+            self.client.get(path, HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+
+    def test_dashboard_requires_authentication(self):
+        """Test that anonymous requests are rejected"""
+        response = self.client.get('/me/dashboard/')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+
+class BatchTests(APITestCase):
+    """Tests for the /batch/ endpoint"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        self.project = Project.objects.create(title='Test Project', content='content', user_id='test_user_id')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.test_token}'}
+
+    def _batch(self, items, **extra):
+        # Test data lives in this test's transaction, which worker threads cannot see
+        with override_settings(BATCH_MAX_WORKERS=1):
+            return self.client.post('/batch/', items, format='json', **extra)
+
+    def test_results_match_direct_calls(self):
+        """Test that each item gets the same status and body as a direct call"""
+        paths = [
+            '/profile/test_user_id/',
+            f'/projects/{self.project.id}/',
+            '/projects/999999/',
+            '/user-projects/test_user_id/',
+            '/no-such-route/',
+        ]
+        response = self._batch([{'method': 'GET', 'path': path} for path in paths], **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()
+        self.assertEqual(len(results), len(paths))
+        for path, result in zip(paths, results):
+            direct = self.client.get(path, **self.auth)
+            self.assertEqual(result['status'], direct.status_code, path)
+            if direct.content and direct.status_code != status.HTTP_404_NOT_FOUND:
+                self.assertEqual(result['body'], direct.json(), path)
+
+    def test_writes_run_in_order(self):
+        """Test that a write is visible to later items in the same batch"""
+        response = self._batch([
+            {'method': 'POST', 'path': '/create-project/', 'body': {'title': 'New', 'content': 'Body'}},
+            {'method': 'GET', 'path': '/user-projects/test_user_id/'},
+        ], **self.auth)
+        created, listed = response.json()
+        self.assertEqual(created['status'], status.HTTP_201_CREATED)
+        self.assertIn('New', [p['title'] for p in listed['body']])
+
+    def test_outer_preconditions_do_not_apply_to_items(self):
+        """Test that conditional headers sent with the batch don't turn items into 304s or 412s"""
+        path = '/profile/test_user_id/'
+        direct = self.client.get(path, **self.auth)
+        soon = http_date(time.time() + 60)
+        for headers in (
+            {'HTTP_IF_NONE_MATCH': direct['ETag'], 'HTTP_IF_MODIFIED_SINCE': soon},
+            {'HTTP_IF_MATCH': '"stale"', 'HTTP_IF_UNMODIFIED_SINCE': http_date(0)},
+        ):
+            with self.subTest(headers=sorted(headers)):
+                response = self._batch([{'method': 'GET', 'path': path}], **self.auth, **headers)
+                self.assertEqual(response.json(), [{'status': status.HTTP_200_OK, 'body': direct.json()}])
+
+    def test_anonymous_batch_keeps_auth_errors(self):
+        """Test that sub-requests needing auth fail the same way as direct anonymous calls"""
+        direct = self.client.get('/me/')
+        response = self._batch([{'method': 'GET', 'path': '/me/'}])
+        self.assertEqual(response.json()[0]['status'], direct.status_code)
+
+    def test_invalid_batches(self):
+        """Test that malformed or oversized batches are rejected"""
+        self.assertEqual(self._batch({'path': '/me/'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._batch([{'path': 'me/'}]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._batch([{'path': '/batch/'}]).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self._batch([{'path': '/events/'}], **self.auth)
+        self.assertEqual(response.json()['errors'], ["Event streams cannot be batched"])
+        too_many = [{'path': '/homepage/'}] * (settings.BATCH_MAX_REQUESTS + 1)
+        self.assertEqual(self._batch(too_many).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_endless_streams_are_not_read(self):
+        """Test that a sub-request answered with a non-list stream is rejected instead of read"""
+        def endless():
+            while True:
+                yield ': keepalive\n\n'
+
+        def view(request):
+            return StreamingHttpResponse(endless(), content_type='text/event-stream')
+
+        with mock.patch('backend.batch_views.resolve', return_value=ResolverMatch(view, (), {})):
+            response = self._batch([{'method': 'GET', 'path': '/stream/'}], **self.auth)
+        self.assertEqual(response.json(), [
+            {'status': status.HTTP_400_BAD_REQUEST, 'body': {'detail': 'Streaming responses cannot be batched'}}
+        ])
+
+
+class ParallelBatchTests(TransactionTestCase):
+    """Tests for read-only batches dispatched on worker threads"""
+
+    def test_parallel_reads_keep_order(self):
+        """Test that parallel results come back in request order"""
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        projects = [
+            Project.objects.create(title=f'Project {i}', content='content', user_id='test_user_id')
+            for i in range(6)
+        ]
+        token = jwt.encode({'sub': 'test_user_id'}, settings.SUPABASE_JWT_SECRET, algorithm='HS256')
+        items = [{'method': 'GET', 'path': f'/projects/{p.id}/'} for p in projects]
+        response = APIClient().post('/batch/', items, format='json', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(
+            [result['body']['title'] for result in response.json()],
+            [p.title for p in projects]
+        )
+
+
+class BulkLookupTests(APITestCase):
+    """Tests for /profiles/?ids= and /projects/?ids="""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        Profile.objects.create(user_id='other_user_id', username='other')
+        self.projects = [
+            Project.objects.create(title=f'Project {i}', content='content', user_id='test_user_id')
+            for i in range(3)
+        ]
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.test_token}'}
+
+    def test_profiles_by_ids(self):
+        """Test that profiles come back in request order with missing ids reported"""
+        response = self.client.get('/profiles/?ids=other_user_id,nobody,test_user_id', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual([p['user_id'] for p in data['results']], ['other_user_id', 'test_user_id'])
+        self.assertEqual(data['missing'], ['nobody'])
+
+    def test_projects_by_ids_single_query(self):
+        """Test that projects are fetched with one query"""
+        ids = ','.join(str(p.id) for p in self.projects) + ',999999'
+        self.client.get(f'/projects/?ids={ids}', **self.auth)  # warm the auth caches
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/projects/?ids={ids}', **self.auth)
+        data = response.json()
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(data['missing'], [999999])
+
+    def test_invalid_ids(self):
+        """Test that missing, malformed and oversized id lists are rejected"""
+        self.assertEqual(self.client.get('/profiles/', **self.auth).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/projects/?ids=1,abc', **self.auth).status_code, status.HTTP_400_BAD_REQUEST)
+        for huge in (2 ** 63, -2 ** 63, 10 ** 30):
+            with self.subTest(id=huge):
+                response = self.client.get(f'/projects/?ids=1,{huge}', **self.auth)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.json(), {'detail': 'ids must be a comma-separated list of valid ids'})
+        too_many = ','.join(str(i) for i in range(settings.BULK_LOOKUP_MAX_IDS + 1))
+        self.assertEqual(
+            self.client.get(f'/projects/?ids={too_many}', **self.auth).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+
+class ConditionalGetTests(APITestCase):
+    """Tests for ETag / Last-Modified handling on read endpoints"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        self.project = Project.objects.create(title='Test Project', content='content', user_id='test_user_id')
+        JoinRequest.objects.create(project_id=1, sender_id='test_user_id', receiver_id='other_user_id')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.test_token}'}
+
+    def test_revalidation_returns_304(self):
+        """Test that every read endpoint answers a matching If-None-Match with 304"""
+        paths = [
+            '/homepage/',
+            '/homepage/?page_size=1',
+            '/user-projects/test_user_id/',
+            f'/projects/{self.project.id}/',
+            '/profile/test_user_id/',
+            '/join-request/sent/',
+            '/join-request/user/test_user_id/',
+        ]
+        for path in paths:
+            first = self.client.get(path, **self.auth)
+            self.assertEqual(first.status_code, status.HTTP_200_OK, path)
+            self.assertIn('ETag', first, path)
+            second = self.client.get(path, HTTP_IF_NONE_MATCH=first['ETag'], **self.auth)
+            self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED, path)
+            self.assertEqual(second.content, b'', path)
+
+    def test_304_skips_the_list_query(self):
+        """Test that a 304 is answered from the aggregate query alone"""
+        first = self.client.get('/join-request/sent/', **self.auth)
+        with self.assertNumQueries(1):
+            self.client.get('/join-request/sent/', HTTP_IF_NONE_MATCH=first['ETag'], **self.auth)
+
+    def test_changes_invalidate_etag(self):
+        """Test that updates and deletes produce a new validator"""
+        first = self.client.get('/homepage/')
+        self.client.patch(f'/projects/{self.project.id}/', {'title': 'Renamed'}, format='json', **self.auth)
+        second = self.client.get('/homepage/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+
+        third = self.client.get('/homepage/', HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(third.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.client.delete(f'/projects/{self.project.id}/', **self.auth)
+        fourth = self.client.get('/homepage/', HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(fourth.status_code, status.HTTP_200_OK)
+
+    def test_paginated_validators_read_only_the_page(self):
+        """Test that a paginated request is validated from its page, without counting the whole list"""
+        for i in range(3):
+            Project.objects.create(title=f'Project {i}', content='content', user_id='test_user_id')
+        for path in ('/homepage/?page_size=2', '/user-projects/test_user_id/?page_size=2', '/join-request/sent/?page_size=2'):
+            with self.subTest(path=path), CaptureQueriesContext(connections['default']) as ctx:
+                self.client.get(path, **self.auth)
+            for query in ctx.captured_queries:
+                self.assertNotIn('COUNT(', query['sql'].upper(), path)
+
+        first = self.client.get('/homepage/?page_size=2')
+        newest = Project.objects.order_by('-created_at', '-id').first()
+        self.assertEqual(
+            self.client.get('/homepage/?page_size=2', HTTP_IF_NONE_MATCH=first['ETag']).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        # A delete pulls an older row onto the page: same newest updated_at, different rows
+        self.client.delete(f"/projects/{Project.objects.order_by('-created_at', '-id')[1].pk}/", **self.auth)
+        second = self.client.get('/homepage/?page_size=2', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.json()['results'][0]['id'], newest.id)
+
+    def test_lists_ignore_if_modified_since(self):
+        """Test that lists send no Last-Modified, so a delete is never answered with a stale 304"""
+        older = timezone.now() - timedelta(days=1)
+        for path in ('/homepage/', '/user-projects/test_user_id/', '/homepage/?page_size=5'):
+            with self.subTest(path=path):
+                doomed = Project.objects.create(title='Doomed', content='content', user_id='test_user_id', created_at=older)
+                self.assertNotIn('Last-Modified', self.client.get(path, **self.auth))
+                self.client.delete(f'/projects/{doomed.id}/', **self.auth)
+                # Later than any updated_at, so a list Last-Modified would answer 304
+                response = self.client.get(path, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60), **self.auth)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                data = response.json()
+                projects = data['results'] if isinstance(data, dict) else data
+                self.assertNotIn('Doomed', [project['title'] for project in projects])
+
+    def test_if_modified_since(self):
+        """Test that If-Modified-Since is honoured"""
+        first = self.client.get(f'/projects/{self.project.id}/', **self.auth)
+        second = self.client.get(
+            f'/projects/{self.project.id}/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'], **self.auth
+        )
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class ResponseCacheTests(APITestCase):
+    """Tests for the shared response cache on public read endpoints"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        self.project = Project.objects.create(title='Test Project', content='content', user_id='test_user_id')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.test_token}'}
+
+    def test_cached_reads_skip_database(self):
+        """Test that repeat reads are served without queries"""
+        paths = ['/homepage/', '/homepage/?page_size=5', '/user-projects/test_user_id/', '/profile/test_user_id/']
+        for path in paths:
+            first = self.client.get(path, **self.auth)
+            with self.assertNumQueries(0):
+                second = self.client.get(path, **self.auth)
+            self.assertEqual(first.json(), second.json(), path)
+
+    def test_project_writes_invalidate(self):
+        """Test that creating, updating and deleting projects refresh cached lists"""
+        self.client.get('/homepage/')
+        self.client.get('/user-projects/test_user_id/', **self.auth)
+
+        self.client.post('/create-project/', {'title': 'New', 'content': 'Body'}, format='json', **self.auth)
+        self.assertEqual(len(self.client.get('/homepage/').json()), 2)
+        self.assertEqual(len(self.client.get('/user-projects/test_user_id/', **self.auth).json()), 2)
+
+        self.client.patch(f'/projects/{self.project.id}/', {'title': 'Renamed'}, format='json', **self.auth)
+        self.assertIn('Renamed', [p['title'] for p in self.client.get('/homepage/').json()])
+
+        self.client.delete(f'/projects/{self.project.id}/', **self.auth)
+        self.assertEqual(len(self.client.get('/user-projects/test_user_id/', **self.auth).json()), 1)
+
+    def test_profile_writes_invalidate(self):
+        """Test that profile updates refresh the cached profile"""
+        self.client.get('/profile/test_user_id/', **self.auth)
+        self.client.patch('/profile/test_user_id/', {'bio': 'New bio'}, format='json', **self.auth)
+        self.assertEqual(self.client.get('/profile/test_user_id/', **self.auth).json()['bio'], 'New bio')
+
+
+class SyncTests(APITestCase):
+    """Tests for the /sync/ delta endpoint"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        Profile.objects.create(user_id='other_user_id', username='otheruser', email='other@example.com')
+        self.project = Project.objects.create(title='Test Project', content='content', user_id='test_user_id')
+        self.join_request = JoinRequest.objects.create(
+            project_id=self.project.id, sender_id='other_user_id', receiver_id='test_user_id'
+        )
+        JoinRequest.objects.create(project_id=self.project.id, sender_id='third_user_id', receiver_id='other_user_id')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.test_token}'}
+
+    def _since(self, when):
+        return encode_cursor([when])
+
+    def test_full_snapshot(self):
+        """Test that a sync without a cursor returns everything visible to the caller"""
+        response = self.client.get('/sync/', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertTrue(data['full'])
+        self.assertEqual([p['id'] for p in data['projects']], [self.project.id])
+        self.assertEqual([r['id'] for r in data['join_requests']], [self.join_request.id])
+        self.assertEqual(data['deleted'], {'projects': [], 'join_requests': []})
+        self.assertTrue(data['cursor'])
+
+    def test_delta_returns_changes_and_deletes(self):
+        """Test that a cursor only returns rows changed or deleted after it"""
+        since = self._since(timezone.now())
+        new = Project.objects.create(title='New', content='Body', user_id='test_user_id')
+        deleted_id = self.join_request.id
+        self.join_request.delete()
+
+        data = self.client.get('/sync/', {'since': since}, **self.auth).json()
+        self.assertFalse(data['full'])
+        self.assertEqual([p['id'] for p in data['projects']], [new.id])
+        self.assertEqual(data['join_requests'], [])
+        self.assertEqual(data['deleted']['join_requests'], [deleted_id])
+
+    def test_deletes_of_others_join_requests_are_private(self):
+        """Test that a delta only reports deleted join requests the caller sent or received"""
+        since = self._since(timezone.now())
+        others_id = JoinRequest.objects.get(sender_id='third_user_id').id
+        own_id = self.join_request.id
+        JoinRequest.objects.filter(id__in=[others_id, own_id]).delete()
+
+        tombstone = Tombstone.objects.get(model='joinrequest', object_id=others_id)
+        self.assertEqual((tombstone.sender_id, tombstone.receiver_id), ('third_user_id', 'other_user_id'))
+        data = self.client.get('/sync/', {'since': since}, **self.auth).json()
+        self.assertEqual(data['deleted']['join_requests'], [own_id])
+
+    def test_project_delete_is_tombstoned(self):
+        """Test that deleting a project through the API records a tombstone"""
+        project_id = self.project.id
+        self.client.delete(f'/projects/{project_id}/', **self.auth)
+        self.assertTrue(Tombstone.objects.filter(model='project', object_id=project_id).exists())
+
+    def test_invalid_cursor(self):
+        """Test that malformed, naive and impossible since cursors are rejected"""
+        for since in ('not-a-cursor', self._since('2024-06-01T12:00:00'), self._since('2024-13-01T00:00:00+00:00')):
+            with self.subTest(since=since):
+                response = self.client.get('/sync/', {'since': since}, **self.auth)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.json(), {'detail': 'Invalid since cursor'})
+
+    def test_expired_cursor(self):
+        """Test that a cursor older than tombstone retention asks for a full snapshot"""
+        since = self._since(timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1))
+        response = self.client.get('/sync/', {'since': since}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+
+class EventStreamTests(APITestCase):
+    """Tests for join-request push events and the /events/ stream"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        self.client = APIClient()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        Profile.objects.create(user_id='owner_id', username='owner', email='owner@example.com')
+        self.project = Project.objects.create(title='Test Project', content='content', user_id='owner_id')
+        self.sender_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.owner_token = jwt.encode(
+            {'sub': 'owner_id', 'email': 'owner@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.published = []
+        broker = get_broker()
+        original = broker.publish
+        broker.publish = lambda channel, event: self.published.append((channel, event))
+        self.addCleanup(setattr, broker, 'publish', original)
+
+    def test_events_published_on_commit(self):
+        """Test that creating and answering a join request notify the other party"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/join-request/', {'project_id': self.project.id}, format='json',
+                HTTP_AUTHORIZATION=f'Bearer {self.sender_token}'
+            )
+        self.assertEqual(self.published, [
+            (user_channel('owner_id'), {'type': 'join_request.created', 'data': response.data})
+        ])
+
+        self.published.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f"/join-request/{response.data['id']}/status/", {'status': 'accepted'}, format='json',
+                HTTP_AUTHORIZATION=f'Bearer {self.owner_token}'
+            )
+        self.assertEqual([(c, e['type']) for c, e in self.published], [
+            (user_channel('test_user_id'), 'join_request.updated')
+        ])
+
+    def test_rejected_write_publishes_nothing(self):
+        """Test that failed writes never emit events"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                '/join-request/', {'project_id': self.project.id}, format='json',
+                HTTP_AUTHORIZATION=f'Bearer {self.owner_token}'
+            )
+        self.assertEqual(self.published, [])
+
+    async def test_stream_requires_token(self):
+        """Test that the stream rejects anonymous callers"""
+        response = await events(AsyncRequestFactory().get('/events/'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_delivers_events(self):
+        """Test that a connected stream receives events for its user only"""
+        request = AsyncRequestFactory().get('/events/', headers={'Authorization': f'Bearer {self.owner_token}'})
+        response = await events(request)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+
+        publish = InProcessBroker.publish.__get__(get_broker())
+        publish(user_channel('test_user_id'), {'type': 'join_request.created', 'data': {'id': 1}})
+        publish(user_channel('owner_id'), {'type': 'join_request.created', 'data': {'id': 2}})
+        chunk = await asyncio.wait_for(anext(stream), 1)
+        self.assertEqual(chunk, b'event: join_request.created\ndata: {"id":2}\n\n')
+
+        # A client disconnect cancels the pending read, which unsubscribes
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(get_broker().subscriber_count(user_channel('owner_id')), 0)
+
+    async def test_unread_stream_unsubscribes_on_close(self):
+        """Test that closing a response that was never iterated still unsubscribes"""
+        request = AsyncRequestFactory().get('/events/', headers={'Authorization': f'Bearer {self.owner_token}'})
+        response = await events(request)
+        self.assertEqual(get_broker().subscriber_count(user_channel('owner_id')), 1)
+        response.close()
+        self.assertEqual(get_broker().subscriber_count(user_channel('owner_id')), 0)
+
+    def test_incomplete_broker_fails_on_creation(self):
+        """Test that a broker plugin missing part of the interface cannot be instantiated"""
+        class PublishOnlyBroker(Broker):
+            def publish(self, channel, event):
+                pass
+
+        with self.assertRaises(TypeError):
+            PublishOnlyBroker()
+
+
+def read_urlconf(async_reads):
+    """Return a urlconf with the read endpoints routed as ASYNC_READ_VIEWS=async_reads would."""
+    try:
+        with override_settings(ASYNC_READ_VIEWS=async_reads):
+            urlconf = types.ModuleType(f'{urls.__name__}_{"async" if async_reads else "sync"}')
+            urlconf.urlpatterns = importlib.reload(urls).urlpatterns
+            return urlconf
+    finally:
+        importlib.reload(urls)
+
+
+class EventStreamConnectionTests(TransactionTestCase):
+    """Tests for the database connections held by the /events/ stream"""
+
+    def test_connection_released_before_streaming(self):
+        """Test that the stream closes the connection authentication used before it starts"""
+        profile_cache.clear()
+        Profile.objects.create(user_id='owner_id', username='owner')
+        token = jwt.encode({'sub': 'owner_id'}, settings.SUPABASE_JWT_SECRET, algorithm='HS256')
+        request = AsyncRequestFactory().get('/events/', headers={'Authorization': f'Bearer {token}'})
+        with mock.patch.object(connection, 'close', wraps=connection.close) as close:
+            response = async_to_sync(events)(request)
+        self.addCleanup(response.close)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        close.assert_called_once()
+
+
+class AsyncReadViewTests(APITestCase):
+    """Tests for the native async read views"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sync_urls = read_urlconf(False)
+        cls.async_urls = read_urlconf(True)
+
+    def setUp(self):
+        """Set up test data and clients"""
+        self.enterContext(override_settings(ROOT_URLCONF=self.async_urls))
+        cache.clear()
+        profile_cache.clear()
+        self.factory = APIRequestFactory()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        Profile.objects.create(user_id='other_user_id', username='otheruser', email='other@example.com')
+        project = Project.objects.create(title='Test Project', content='content', user_id='test_user_id')
+        Project.objects.create(title='Other Project', content='content', user_id='other_user_id')
+        JoinRequest.objects.create(project_id=project.id, sender_id='other_user_id', receiver_id='test_user_id')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.test_token}'}
+
+    def _render(self, view, path, *args, method='get', **extra):
+        cache.clear()
+        response = view(getattr(self.factory, method)(path, **extra), *args)
+        response.render()
+        # DRF lists the allowed methods in set order
+        allow = set(response.get('Allow', '').split(', '))
+        return response.status_code, response.content, allow, response.get('Vary')
+
+    def test_matches_sync_views(self):
+        """Test that each async view returns the same status, bytes and headers as its sync counterpart"""
+        cases = [
+            ('get_projects', '/homepage/', ()),
+            ('get_projects', '/homepage/?page_size=1', ()),
+            ('get_projects', '/homepage/?query=Other', ()),
+            ('get_user_projects', '/user-projects/test_user_id/', ('test_user_id',)),
+            ('profile_detail', '/profile/other_user_id/', ('other_user_id',)),
+            ('profile_detail', '/profile/missing/', ('missing',)),
+            ('get_current_user', '/me/', ()),
+            ('get_received_join_requests', '/join-request/user/test_user_id/', ('test_user_id',)),
+            ('get_received_join_requests', '/join-request/user/test_user_id/?expand=sender', ('test_user_id',)),
+            ('get_received_join_requests', '/join-request/user/other_user_id/', ('other_user_id',)),
+            ('get_sent_join_requests', '/join-request/sent/?expand=bogus', ()),
+        ]
+        for name, path, args in cases:
+            with self.subTest(path=path):
+                expected = self._render(getattr(views, name), path, *args, **self.auth)
+                actual = self._render(async_to_sync(getattr(async_views, name)), path, *args, **self.auth)
+                self.assertEqual(actual, expected)
+
+    def test_routings_match(self):
+        """Test that the read routes answer the same with ASYNC_READ_VIEWS on and off"""
+        requests = [
+            ('get', '/homepage/', {}),
+            ('get', '/homepage/?page_size=1', {}),
+            ('get', '/user-projects/test_user_id/', self.auth),
+            ('get', '/profile/other_user_id/', self.auth),
+            ('get', '/me/', self.auth),
+            ('get', '/me/', {}),
+            ('get', '/join-request/user/test_user_id/', self.auth),
+            ('get', '/join-request/sent/', self.auth),
+            ('post', '/homepage/', {}),
+            ('post', '/join-request/sent/', {}),
+            ('post', '/join-request/sent/', self.auth),
+            ('options', '/homepage/', {}),
+            ('options', '/me/', self.auth),
+        ]
+
+        def fetch(urlconf, method, path, extra):
+            cache.clear()
+            profile_cache.clear()
+            with override_settings(ROOT_URLCONF=urlconf):
+                response = getattr(self.client, method)(path, **extra)
+            return (
+                response.status_code, response.content, set(response.get('Allow', '').split(', ')),
+                response.get('Vary'), response.get('ETag'), response.get('Content-Type'),
+            )
+
+        self.assertIsNot(resolve('/homepage/', self.sync_urls).func, resolve('/homepage/', self.async_urls).func)
+        for method, path, extra in requests:
+            with self.subTest(method=method, path=path, authenticated=bool(extra)):
+                self.assertEqual(fetch(self.async_urls, method, path, extra), fetch(self.sync_urls, method, path, extra))
+
+    def test_options(self):
+        """Test that async views answer OPTIONS like their sync counterparts instead of with a 405"""
+        cases = [
+            ('get_projects', '/homepage/', (), self.auth),
+            ('get_current_user', '/me/', (), self.auth),
+            ('get_current_user', '/me/', (), {}),
+            ('profile_detail', '/profile/other_user_id/', ('other_user_id',), self.auth),
+        ]
+        for name, path, args, extra in cases:
+            with self.subTest(path=path, authenticated=bool(extra)):
+                expected = self._render(getattr(views, name), path, *args, method='options', **extra)
+                actual = self._render(async_to_sync(getattr(async_views, name)), path, *args, method='options', **extra)
+                self.assertEqual(actual, expected)
+        self.assertEqual(actual[0], status.HTTP_200_OK)
+        self.assertIn('GET', actual[2])
+
+    def test_unauthenticated(self):
+        """Test that protected async views reject missing and invalid tokens like DRF does"""
+        response = self.client.get('/join-request/sent/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+        response = self.client.get('/me/', HTTP_AUTHORIZATION='Bearer invalid')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_writes_with_csrf_checks(self):
+        """Test that PATCH and PUT on the async-routed profile route pass Django's CSRF middleware"""
+        client = APIClient(enforce_csrf_checks=True)
+        for method, username in (('patch', 'patched'), ('put', 'put')):
+            with self.subTest(method=method):
+                response = getattr(client, method)(
+                    '/profile/test_user_id/', {'username': username}, format='json', **self.auth
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data['username'], username)
+                self.assertEqual(Profile.objects.get(user_id='test_user_id').username, username)
+
+        response = client.patch('/profile/other_user_id/', {'username': 'x'}, format='json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data, {'detail': 'Not authorized to update this profile'})
+
+    def test_default_authenticators(self):
+        """Test that async views without explicit authenticators accept DRF tokens like their sync versions"""
+        user = User.objects.create_user(username='token_user')
+        token = Token.objects.create(user=user)
+        response = self.client.get('/user-projects/test_user_id/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([project['title'] for project in response.json()], ['Test Project'])
+
+        # Supabase-only views still turn DRF tokens away
+        response = self.client.get('/join-request/sent/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_async_authentication_warm_path(self):
+        """Test that async authentication resolves a cached profile without queries"""
+        request = self.factory.get('/me/', **self.auth)
+        authenticate = async_to_sync(SupabaseAuthentication().aauthenticate)
+        profile, payload = authenticate(request)
+        self.assertEqual(profile.user_id, 'test_user_id')
+        with self.assertNumQueries(0):
+            profile, payload = authenticate(request)
+        self.assertTrue(profile.is_authenticated)
+
+
+class StubConnection:
+    """Stands in for a psycopg2 connection in the pool tests"""
+
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+        self.rollbacks = 0
+        self.info = mock.Mock(transaction_status=0, server_version=160000)
+        self.info.parameter_status.return_value = 'UTC'
+
+    def cursor(self):
+        return mock.MagicMock()
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Tests for backend.db.ConnectionPool against stub connections"""
+
+    def make_pool(self, **options):
+        self.created = []
+
+        def connect():
+            conn = StubConnection()
+            self.created.append(conn)
+            return conn
+
+        return ConnectionPool(
+            connect, check=pooled_backend.check_connection, reset=pooled_backend.reset_connection, **options
+        )
+
+    def test_connections_are_reused(self):
+        """Test that a returned connection is handed out again"""
+        pool = self.make_pool()
+        first = pool.getconn()
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        stats = pool.stats()
+        self.assertEqual((stats['created'], stats['checkouts'], stats['in_use']), (1, 2, 1))
+
+    def test_min_size_prefills(self):
+        """Test that min_size connections are opened on first use"""
+        pool = self.make_pool(min_size=3)
+        pool.getconn()
+        self.assertEqual(len(self.created), 3)
+        self.assertEqual(pool.stats()['idle'], 2)
+
+    def test_broken_connection_is_replaced(self):
+        """Test that checkout discards dead connections and reconnects"""
+        pool = self.make_pool()
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.closed = 1
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, conn)
+        self.assertEqual(pool.stats()['failed_checks'], 1)
+
+    def test_open_transaction_rolled_back_on_return(self):
+        """Test that connections come back without an open transaction"""
+        pool = self.make_pool()
+        conn = pool.getconn()
+        conn.info.transaction_status = 2  # INTRANS
+        pool.putconn(conn)
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertIs(pool.getconn(), conn)
+
+    def test_old_connections_recycled(self):
+        """Test that connections past max_lifetime are closed on return"""
+        pool = self.make_pool(max_lifetime=0)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['recycled'], 1)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_exhausted_pool_times_out(self):
+        """Test that checkouts beyond max_size wait and then fail"""
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_returned_connection(self):
+        """Test that a waiting checkout is served by a checkin from another thread"""
+        pool = self.make_pool(max_size=1, timeout=5)
+        conn = pool.getconn()
+        threading.Timer(0.05, pool.putconn, [conn]).start()
+        self.assertIs(pool.getconn(), conn)
+        stats = pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreater(stats['wait_time_max'], 0)
+
+    def test_failed_connect_releases_slot(self):
+        """Test that a connection error does not leak pool capacity"""
+        pool = ConnectionPool(mock.Mock(side_effect=[OSError('down'), StubConnection()]), max_size=1, timeout=0.05)
+        with self.assertRaises(OSError):
+            pool.getconn()
+        pool.getconn()
+        self.assertEqual(pool.stats()['connect_errors'], 1)
+
+
+class PooledBackendTests(SimpleTestCase):
+    """Tests for the backend.db engine with a stubbed driver"""
+
+    def setUp(self):
+        self.handler = ConnectionHandler({
+            'default': {},
+            'pooled': {'ENGINE': 'backend.db', 'NAME': 'stub', 'USER': 'u', 'HOST': 'localhost', 'POOL': {'max_size': 2}},
+        })
+        patcher = mock.patch.object(pooled_backend.Database, 'connect', side_effect=lambda **params: StubConnection())
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        jsonb = mock.patch('psycopg2.extras.register_default_jsonb')
+        jsonb.start()
+        self.addCleanup(jsonb.stop)
+
+    def test_close_returns_connection_to_pool(self):
+        """Test that Django's per-request close reuses the driver connection"""
+        wrapper = self.handler['pooled']
+        wrapper.ensure_connection()
+        first = wrapper.connection
+        wrapper.close()
+        self.assertFalse(first.closed)
+
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, first)
+        self.assertEqual(self.connect.call_count, 1)
+        stats = pool_stats()['pooled']
+        self.assertEqual((stats['in_use'], stats['max_size']), (1, 2))
+        wrapper.close()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Tests for read-replica routing against two local SQLite databases"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A second, separately migrated SQLite database plays the replica, so
+        # every read shows which database served it. It is added after the
+        # test runner's setup, which only knows about the configured databases.
+        cls.replica_dir = tempfile.mkdtemp()
+        connections.settings['replica'] = connections.configure_settings({
+            'default': dict(connections.settings['default']),
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3')},
+        })['replica']
+        # Allowed from here on, and flushed after each test like the primary
+        cls.databases = {'default', 'replica'}
+        call_command('migrate', database='replica', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.databases = {'default'}
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        shutil.rmtree(cls.replica_dir)
+        super().tearDownClass()
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        profile_cache.clear()
+        self.client = APIClient()
+        for alias in ('default', 'replica'):
+            Profile.objects.using(alias).create(user_id='test_user_id', username='testuser', email='test@example.com')
+            Project.objects.using(alias).create(title=f'on {alias}', content='content', user_id='test_user_id')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.test_token}'}
+
+    def titles(self, **extra):
+        # Searches are not cached, so every call reads a database
+        response = self.client.get('/homepage/', {'query': 'e'}, **extra)
+        return [project['title'] for project in response.json()]
+
+    def test_safe_requests_read_replica(self):
+        """Test that GETs are served from the replica"""
+        self.assertEqual(self.titles(), ['on replica'])
+        self.assertEqual(self.titles(**self.auth), ['on replica'])
+
+    def test_writes_use_primary_and_pin_writer(self):
+        """Test that a writer reads the primary until the pin expires, others keep the replica"""
+        response = self.client.post('/create-project/', {'title': 'New', 'content': 'Body'}, format='json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Project.objects.using('default').filter(title='New').exists())
+        self.assertFalse(Project.objects.using('replica').filter(title='New').exists())
+
+        self.assertEqual(set(self.titles(**self.auth)), {'on default', 'New'})
+        self.assertEqual(self.titles(), ['on replica'])
+
+        cache.delete('db-pin:test_user_id')
+        self.assertEqual(self.titles(**self.auth), ['on replica'])
+
+    def test_failed_write_does_not_pin(self):
+        """Test that rejected writes leave the caller on the replica"""
+        response = self.client.post('/join-request/', {}, format='json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.titles(**self.auth), ['on replica'])
+
+    def test_cached_responses_are_built_from_primary(self):
+        """Test that a response cache miss reads the primary, so a lagging replica cannot fill the cache"""
+        self.assertEqual([p['title'] for p in self.client.get('/homepage/').json()], ['on default'])
+        self.client.post('/create-project/', {'title': 'New', 'content': 'Body'}, format='json', **self.auth)
+        self.assertEqual({p['title'] for p in self.client.get('/homepage/').json()}, {'on default', 'New'})
+        cache.delete('db-pin:test_user_id')
+        self.assertEqual({p['title'] for p in self.client.get('/homepage/', **self.auth).json()}, {'on default', 'New'})
+
+    def test_router_decisions(self):
+        """Test that reads outside requests or inside transactions stay on the primary"""
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Project))
+        token = allow_replica_reads(True)
+        try:
+            self.assertEqual(router.db_for_read(Project), 'replica')
+            with transaction.atomic():
+                self.assertIsNone(router.db_for_read(Project))
+        finally:
+            reset_replica_reads(token)
+        self.assertEqual(router.db_for_write(Project), 'default')
+
+
+class MetricsTests(APITestCase):
+    """Tests for request metrics and the /metrics endpoint"""
+
+    def setUp(self):
+        """Set up test data and reset the histograms"""
+        cache.clear()
+        profile_cache.clear()
+        for histogram in metrics.HISTOGRAMS:
+            histogram.clear()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        self.project = Project.objects.create(title='Test Project', content='content', user_id='test_user_id')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+
+    def test_request_histograms(self):
+        """Test that a request is recorded under its route with query count, db time, size and auth time"""
+        response = self.client.get(f'/projects/{self.project.id}/', HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        route = 'projects/<int:pk>/'
+        _, queries, count = metrics.request_queries.collect()[(route,)]
+        self.assertEqual(count, 1)
+        self.assertGreaterEqual(queries, 1)
+        self.assertGreater(metrics.request_db_time.collect()[(route,)][1], 0)
+        self.assertEqual(metrics.response_size.collect()[(route,)][1], len(response.content))
+        self.assertEqual(metrics.auth_duration.collect()[(route, 'success')][2], 1)
+
+        body = metrics.render()
+        self.assertIn(
+            'http_request_duration_seconds_bucket{route="projects/<int:pk>/",method="GET",status="200",le="+Inf"} 1',
+            body,
+        )
+        self.assertIn('# TYPE http_request_db_queries histogram', body)
+        self.assertIn('supabase_auth_duration_seconds_count{route="projects/<int:pk>/",outcome="success"} 1', body)
+        self.assertIn('# TYPE auth_token_cache_hits_total counter', body)
+
+    def test_auth_outcomes_and_unmatched_routes(self):
+        """Test that failed and anonymous authentication and unknown paths are labelled"""
+        self.client.get('/me/', HTTP_AUTHORIZATION='Bearer invalid')
+        self.client.get('/homepage/')
+        self.client.get('/no-such-path/')
+
+        auth = metrics.auth_duration.collect()
+        self.assertIn(('me/', 'failure'), auth)
+        self.assertIn(('homepage/', 'anonymous'), auth)
+        self.assertIn(('unmatched', 'GET', '404'), metrics.request_duration.collect())
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_protected(self):
+        """Test that METRICS_TOKEN is required when set"""
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_closed_without_token(self):
+        """Test that /metrics is only served without METRICS_TOKEN when DEBUG is on"""
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_200_OK)
+
+    def test_histogram_merges_thread_shards(self):
+        """Test that observations from finished and live threads are summed into cumulative buckets"""
+        histogram = metrics.Histogram('test_seconds', 'Test.', ('route',), (0.1, 1.0))
+
+        def observe():
+            for value in (0.05, 0.5, 5.0):
+                histogram.observe(value, 'a')
+
+        threads = [threading.Thread(target=observe) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        observe()
+
+        cumulative, total, count = histogram.collect()[('a',)]
+        self.assertEqual(cumulative, [5, 10, 15])
+        self.assertEqual(count, 15)
+        self.assertAlmostEqual(total, 5 * 5.55)
+        # Shards of the finished threads were folded away
+        self.assertEqual(len(histogram._shards), 1)
+
+
+@override_settings(BATCH_MAX_WORKERS=1)  # Parallel sub-requests would query on connections the capture cannot see
+class QueryBudgetTests(TestCase):
+    """
+    Request every route in backend/urls.py with N and then 10N rows of data
+    and check that the number of queries stays the same and within the
+    view's declared budget (see backend/budgets.py).
+    """
+
+    N = 3
+
+    # (method, path, body) for each route. Placeholders are filled in from
+    # the seeded rows: {project} is one of the caller's projects, {other_project}
+    # one they have not asked to join, {join_request} one they received.
+    ENDPOINTS = [
+        ('GET', '/', None),
+        ('POST', '/create-profile/', {'username': 'testuser'}),
+        ('GET', '/profile/other_user_id/', None),
+        ('PATCH', '/profile/test_user_id/', {'bio': 'Updated'}),
+        ('GET', '/profiles/?ids={profile_ids}', None),
+        ('GET', '/me/', None),
+        ('GET', '/me/dashboard/', None),
+        ('GET', '/me/dashboard/?expand=sender,receiver,project', None),
+        ('POST', '/create-project/', {'title': 'New', 'content': 'Body'}),
+        ('GET', '/projects/?ids={project_ids}', None),
+        ('GET', '/projects/{project}/', None),
+        ('PUT', '/projects/{project}/', {'title': 'Renamed', 'content': 'Body', 'user_id': 'test_user_id'}),
+        ('DELETE', '/projects/{project}/', None),
+        ('GET', '/user-projects/test_user_id/', None),
+        ('GET', '/user-projects/test_user_id/?page_size=2', None),
+        ('GET', '/homepage/', None),
+        ('GET', '/homepage/?page_size=2', None),
+        ('GET', '/homepage/?query=Project', None),
+        ('PATCH', '/join-request/{join_request}/status/', {'status': 'accepted'}),
+        ('POST', '/join-request/moderate/', {'status': 'declined', 'project_id': '{project}'}),
+        ('POST', '/join-request/', {'project_id': '{other_project}'}),
+        ('GET', '/join-request/user/test_user_id/', None),
+        ('GET', '/join-request/user/test_user_id/?expand=sender,receiver,project', None),
+        ('GET', '/join-request/sent/', None),
+        ('GET', '/join-request/sent/?page_size=2', None),
+        ('GET', '/sync/', None),
+        ('GET', '/sync/?since={since}', None),
+        ('POST', '/api/auth/', {'user_id': 'test_user_id', 'email': 'test@example.com'}),
+        ('POST', '/batch/', [{'method': 'GET', 'path': '/homepage/'}, {'method': 'GET', 'path': '/join-request/sent/'}]),
+        ('GET', '/metrics', None),
+    ]
+
+    # Routes the harness cannot drive through the test client
+    NOT_EXERCISED = {
+        'events/',  # Never-ending stream; see EventStreamTests
+    }
+
+    def setUp(self):
+        """Set up the caller and the client"""
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        self.test_token = jwt.encode(
+            {'sub': 'test_user_id', 'email': 'test@example.com'},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.test_token}')
+
+    def _seed(self, rows):
+        """Create rows of every kind of data and return the path placeholders."""
+        since = timezone.now() - timedelta(minutes=1)
+        profiles = [f'user_{i}' for i in range(rows)]
+        Profile.objects.bulk_create([Profile(user_id=user_id, username=user_id) for user_id in ['other_user_id', *profiles]])
+        mine = Project.objects.bulk_create([
+            Project(title=f'Project {i}', content='content', user_id='test_user_id') for i in range(rows)
+        ])
+        theirs = Project.objects.bulk_create([
+            Project(title=f'Project {i}', content='content', user_id=profiles[i]) for i in range(rows)
+        ])
+        received = JoinRequest.objects.bulk_create([
+            JoinRequest(project_id=mine[0].id, sender_id=user_id, receiver_id='test_user_id') for user_id in profiles
+        ])
+        JoinRequest.objects.bulk_create([
+            JoinRequest(project_id=project.id, sender_id='test_user_id', receiver_id=project.user_id)
+            for project in theirs[1:]
+        ])
+        Tombstone.objects.bulk_create([Tombstone(model='project', object_id=-i) for i in range(rows)])
+        return {
+            'project': mine[0].id,
+            'other_project': theirs[0].id,
+            'join_request': received[0].id,
+            'project_ids': ','.join(str(project.id) for project in mine + theirs),
+            'profile_ids': ','.join(profiles),
+            'since': encode_cursor([since]),
+        }
+
+    def _run(self, method, path, body, rows):
+        """Make one request against rows of seeded data; return (view, status, queries)."""
+        with transaction.atomic():
+            values = self._seed(rows)
+            path = path.format(**values)
+            if isinstance(body, dict):
+                body = {key: value.format(**values) if isinstance(value, str) else value for key, value in body.items()}
+            # Budgets are for cold caches
+            cache.clear()
+            profile_cache.clear()
+            token_cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                response = getattr(self.client, method.lower())(path, body, format='json')
+            transaction.set_rollback(True)
+        return resolve(path.split('?')[0]).func, response.status_code, ctx.captured_queries
+
+    def test_every_route_declares_a_budget(self):
+        """Test that each route has a query budget and is exercised by the harness"""
+        # Any id will do to find the route
+        exercised = {resolve(path.format_map(defaultdict(lambda: '1')).split('?')[0]).route for _, path, _ in self.ENDPOINTS}
+        for pattern in urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue  # Debug-only includes
+            route = str(pattern.pattern)
+            with self.subTest(route=route):
+                self.assertTrue(hasattr(pattern.callback, 'query_budget'), f'{route} declares no query budget')
+                if route not in self.NOT_EXERCISED:
+                    self.assertIn(route, exercised, f'{route} is missing from QueryBudgetTests.ENDPOINTS')
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Test that each endpoint runs the same number of queries for N and 10N rows, within budget"""
+        for method, path, body in self.ENDPOINTS:
+            with self.subTest(method=method, path=path):
+                view, small_status, small = self._run(method, path, body, self.N)
+                _, large_status, large = self._run(method, path, body, 10 * self.N)
+                self.assertLess(small_status, 500)
+                self.assertEqual(small_status, large_status)
+                self.assertEqual(
+                    len(large), len(small),
+                    f'{method} {path} ran {len(small)} queries for {self.N} rows but {len(large)} for {10 * self.N}:\n'
+                    + '\n'.join(query['sql'] for query in large),
+                )
+                budget = get_query_budget(view, method)
+                if budget is not None:
+                    self.assertLessEqual(
+                        len(small), budget,
+                        f'{method} {path} ran {len(small)} queries, over its budget of {budget}:\n'
+                        + '\n'.join(query['sql'] for query in small),
+                    )
+
+    def test_over_budget_requests_are_logged(self):
+        """Test that MetricsMiddleware warns about a request that exceeds its budget"""
+        profile_cache.clear()
+        with mock.patch.dict(resolve('/me/').func.query_budget, {'*': 0}):
+            with self.assertLogs('backend.middleware', 'WARNING') as logs:
+                self.client.get('/me/')
+        self.assertIn('GET me/ ran 1 queries, over its budget of 0', logs.output[0])
+
+
+class AsyncQueryBudgetTests(QueryBudgetTests):
+    """QueryBudgetTests with the read endpoints routed to the async views"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.enterClassContext(override_settings(ROOT_URLCONF=read_urlconf(True)))
+
+
+class RecordingHandler(logging.Handler):
+    """Handler that keeps formatted messages and the thread that wrote them."""
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.gate = gate
+        self.written = []
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.written.append((threading.current_thread(), self.format(record)))
+
+
+class BackgroundLoggingTests(SimpleTestCase):
+    """Tests for BackgroundHandler and SamplingFilter"""
+
+    def _logger(self, handler):
+        logger = logging.getLogger(f'backend.tests.logging.{self._testMethodName}')
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        self.addCleanup(handler.close)
+        return logger
+
+    def test_formats_and_writes_on_writer_thread(self):
+        """Test that records are formatted and written off the calling thread"""
+        target = RecordingHandler()
+        handler = BackgroundHandler([target])
+        logger = self._logger(handler)
+
+        logger.info("Request: %s %s", 'GET', '/homepage/')
+        handler.flush()
+
+        [(thread, message)] = target.written
+        self.assertEqual(message, 'Request: GET /homepage/')
+        self.assertIsNot(thread, threading.current_thread())
+
+    def test_records_are_rendered_when_logged(self):
+        """Test that the writer sees arguments and tracebacks as they were when the record was logged"""
+        release = threading.Event()
+        target = RecordingHandler(release)
+        handler = BackgroundHandler([target])
+        logger = self._logger(handler)
+
+        state = {'status': 'pending'}
+        logger.info("State: %s", state)
+        state['status'] = 'accepted'
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.exception("Failed")
+        release.set()
+        handler.flush()
+
+        [(_, first), (_, second)] = target.written
+        self.assertEqual(first, "State: {'status': 'pending'}")
+        self.assertTrue(second.startswith('Failed\nTraceback'))
+        self.assertIn('ValueError: boom', second)
+        # Written once, by the record's own message
+        self.assertEqual(second.count('Traceback'), 1)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test that records are dropped and counted when the writer falls behind"""
+        release = threading.Event()
+        target = RecordingHandler(release)
+        handler = BackgroundHandler([target], queue_size=1)
+        logger = self._logger(handler)
+
+        started = time.perf_counter()
+        for i in range(5):
+            logger.warning("record %d", i)
+        self.assertLess(time.perf_counter() - started, 1)
+        release.set()
+        handler.flush()
+
+        self.assertGreater(handler.dropped, 0)
+        self.assertEqual(len(target.written) + handler.dropped, 5)
+
+    def test_sampling_filter(self):
+        """Test that debug records are sampled per logger while other levels pass"""
+        sampler = SamplingFilter({'app': 0, 'app.verbose': 1})
+
+        def record(name, level=logging.DEBUG):
+            return logging.LogRecord(name, level, __file__, 0, 'message', (), None)
+
+        self.assertFalse(sampler.filter(record('app')))
+        self.assertFalse(sampler.filter(record('app.views')))
+        self.assertTrue(sampler.filter(record('app.verbose.detail')))
+        self.assertTrue(sampler.filter(record('app.views', logging.WARNING)))
+        self.assertTrue(sampler.filter(record('other')))
+
+
+class ExceptionHandlerTests(APITestCase):
+    """Tests for tiered error logging in custom_exception_handler"""
+
+    def setUp(self):
+        """Set up an expired token and reset the error counters"""
+        error_log.clear()
+        self.expired_token = jwt.encode(
+            {'sub': 'test_user_id', 'exp': timezone.now() - timedelta(minutes=5)},
+            settings.SUPABASE_JWT_SECRET,
+            algorithm='HS256'
+        )
+
+    def test_client_errors_are_logged_once_and_counted(self):
+        """Test that repeated 401s produce one short record and a counter"""
+        with self.assertLogs('backend.utils', 'INFO') as logs:
+            for _ in range(5):
+                response = self.client.get('/me/', HTTP_AUTHORIZATION=f'Bearer {self.expired_token}')
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json()['detail'], 'Token expired')
+
+        [record] = logs.records
+        self.assertEqual(record.levelno, logging.INFO)
+        self.assertIsNone(record.exc_info)
+        self.assertEqual(record.getMessage(), 'GET me/ -> 401 AuthenticationFailed: Token expired')
+        self.assertEqual(error_log.totals(), {('me/', 401, 'AuthenticationFailed'): 5})
+
+        body = metrics.render()
+        self.assertIn('api_errors_total{route="me/",status="401",exception="AuthenticationFailed"} 5', body)
+
+    def test_suppressed_errors_are_reported_after_the_window(self):
+        """Test that the next record after a window reports how many were not logged"""
+        key = ('me/', 401, 'AuthenticationFailed')
+        self.assertEqual(error_log.record(key, 60, now=0), (True, 0))
+        self.assertEqual(error_log.record(key, 60, now=1), (False, 0))
+        self.assertEqual(error_log.record(key, 60, now=2), (False, 0))
+        self.assertEqual(error_log.record(key, 60, now=61), (True, 2))
+
+    def test_server_errors_keep_tracebacks(self):
+        """Test that unexpected exceptions are logged with their traceback"""
+        request = APIRequestFactory().get('/boom/')
+        try:
+            raise ValueError('boom')
+        except ValueError as exc:
+            with self.assertLogs('backend.utils', 'ERROR') as logs:
+                response = custom_exception_handler(exc, {'request': request, 'view': None})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.data, {'detail': 'Internal server error', 'message': 'boom'})
+        [record] = logs.records
+        self.assertEqual(record.exc_info[0], ValueError)
+        self.assertIn('Traceback', logs.output[0])
+
+
+
+class FastSerializationTests(APITestCase):
+    """Tests for the values_list()/orjson path used by the list endpoints"""
+
+    def setUp(self):
+        created = timezone.now().replace(microsecond=123456)
+        for i, (owner, title) in enumerate([
+            ('owner', 'Plain'),
+            ('0', 'Zero owner'),
+            ('', 'Empty owner'),
+            ('owner', 'Ünïcödé ✓ 🐬'),
+            ('owner', 'Line\u2028and\u2029paragraph separators'),
+            ('owner', 'Control\x00\x1f "quotes" \\ and </script>'),
+        ]):
+            project = Project.objects.create(title=title, content=f'Content {i}', user_id=owner)
+            Project.objects.filter(pk=project.pk).update(created_at=created - timedelta(minutes=i))
+        JoinRequest.objects.create(project_id=1, sender_id='a', receiver_id='owner', message=None)
+        JoinRequest.objects.create(project_id=2, sender_id='b', receiver_id='owner', message='Hi there')
+
+    def _drf_bytes(self, data):
+        return JSONRenderer().render(data)
+
+    def _old_feed(self, queryset):
+        # What get_projects rendered before the fast path
+        data = ProjectSerializer(queryset, many=True).data
+        for project in data:
+            if not project.get('user_id') or project.get('user_id') == '0':
+                project['user_id'] = 'unknown'
+        return data
+
+    def test_rows_render_like_model_serializers(self):
+        """Test that values rows and orjson give JSONRenderer's exact bytes"""
+        projects = Project.objects.order_by('-created_at')
+        self.assertEqual(
+            FastJSONRenderer().render(project_feed_values.data(projects)),
+            self._drf_bytes(self._old_feed(projects)),
+        )
+        self.assertEqual(
+            FastJSONRenderer().render(project_values.data(projects)),
+            self._drf_bytes(ProjectSerializer(projects, many=True).data),
+        )
+        join_requests = JoinRequest.objects.order_by('id')
+        self.assertEqual(
+            FastJSONRenderer().render(join_request_values.data(join_requests)),
+            self._drf_bytes(JoinRequestSerializer(join_requests, many=True).data),
+        )
+
+    def test_feed_matches_previous_output(self):
+        """Test that the homepage renders unknown owners and pages as before"""
+        expected = self._old_feed(Project.objects.order_by('-created_at'))
+        response = self.client.get('/homepage/')
+        self.assertEqual(response.content, self._drf_bytes(expected))
+        self.assertEqual([p['user_id'] for p in response.json()].count('unknown'), 2)
+
+        items, cursor = [], None
+        while True:
+            page = self.client.get('/homepage/', {'page_size': 4, **({'cursor': cursor} if cursor else {})}).json()
+            items += page['results']
+            cursor = page['next']
+            if not cursor:
+                break
+        self.assertEqual(items, list(expected))
+
+    def test_cursors_cover_ordering_columns_not_serialized(self):
+        """Test that pagination works when ordering by an annotation such as a search rank"""
+        queryset = Project.objects.annotate(
+            rank=Case(When(user_id='owner', then=Value(1.0)), default=Value(0.5), output_field=FloatField())
+        ).order_by('-rank', '-created_at')
+        expected = [p['id'] for p in ProjectSerializer(queryset, many=True).data]
+
+        ids, cursor = [], None
+        while True:
+            params = {'page_size': 4, **({'cursor': cursor} if cursor else {})}
+            request = Request(APIRequestFactory().get('/homepage/', params))
+            rows, cursor = paginate_queryset(request, project_values.rows(queryset), project_values.position)
+            ids += [item['id'] for item in project_values.serialize(rows)]
+            if not cursor:
+                break
+        self.assertEqual(ids, expected)
+
+    def test_renderer_falls_back_to_json_renderer(self):
+        """Test that indented output and data orjson rejects still match JSONRenderer"""
+        data = {'big': 2 ** 70, 1: 'int key', 'nested': [{'when': timezone.now()}]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render({'a': [1]}, 'application/json; indent=2'),
+            JSONRenderer().render({'a': [1]}, 'application/json; indent=2'),
+        )
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+@override_settings(STREAMING_MIN_ROWS=5, STREAMING_CHUNK_SIZE=2)
+class StreamingResponseTests(APITestCase):
+    """Tests for streaming large unpaginated lists"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        profile_cache.clear()
+        self.factory = APIRequestFactory()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com')
+        for i in range(7):
+            project = Project.objects.create(title=f'Project {i} ✓', content='content', user_id='0' if i == 3 else 'test_user_id')
+            JoinRequest.objects.create(project_id=project.id, sender_id=f'sender_{i}', receiver_id='test_user_id')
+        token = jwt.encode({'sub': 'test_user_id'}, settings.SUPABASE_JWT_SECRET, algorithm='HS256')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def _get(self, view, path, *args):
+        cache.clear()
+        response = view(self.factory.get(path, **self.auth), *args)
+        if not response.streaming:
+            response.render()
+            return response, response.content
+        if response.is_async:
+            async def collect():
+                return b''.join([chunk async for chunk in response])
+            return response, async_to_sync(collect)()
+        return response, b''.join(response)
+
+    def test_streams_the_same_bytes(self):
+        """Test that long lists are streamed with the bytes and validators of a rendered list"""
+        cases = [
+            ('get_projects', '/homepage/', ()),
+            ('get_received_join_requests', '/join-request/user/test_user_id/', ('test_user_id',)),
+        ]
+        for name, path, args in cases:
+            for module in (views, async_views):
+                view = getattr(module, name)
+                if module is async_views:
+                    view = async_to_sync(view)
+                with self.subTest(path=path, module=module.__name__):
+                    with override_settings(STREAMING_MIN_ROWS=None):
+                        expected, expected_body = self._get(view, path, *args)
+                    response, body = self._get(view, path, *args)
+                    self.assertFalse(expected.streaming)
+                    self.assertTrue(response.streaming)
+                    self.assertEqual(body, expected_body)
+                    self.assertEqual(response['Content-Type'], 'application/json')
+                    self.assertEqual(response['ETag'], expected['ETag'])
+
+    def test_short_paginated_and_expanded_lists_are_not_streamed(self):
+        """Test that only long, plain, unpaginated lists are streamed"""
+        for path in ('/homepage/?page_size=3', '/homepage/?cursor='):
+            response, body = self._get(views.get_projects, path)
+            self.assertFalse(response.streaming)
+        response, body = self._get(views.get_received_join_requests, '/join-request/user/test_user_id/?expand=sender', 'test_user_id')
+        self.assertFalse(response.streaming)
+        with override_settings(STREAMING_MIN_ROWS=7):
+            response, body = self._get(views.get_projects, '/homepage/')
+            self.assertFalse(response.streaming)
+
+    def test_streamed_lists_are_not_cached(self):
+        """Test that a streamed feed is neither served from nor stored in the response cache"""
+        for _ in range(2):
+            response = views.get_projects(self.factory.get('/homepage/'))
+            self.assertTrue(response.streaming)
+            b''.join(response)
+        self.assertEqual(get_cached_response(response_cache_key(self.factory.get('/homepage/'), 'projects')), None)
+
+    def test_batch_embeds_streamed_lists(self):
+        """Test that /batch/ embeds a streamed sub-response like any other"""
+        response = self.client.post('/batch/', [{'method': 'GET', 'path': '/join-request/sent/'}], format='json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [item] = response.json()
+        self.assertEqual(item['status'], 200)
+        self.assertEqual(len(item['body']), 0)
+        response = self.client.post(
+            '/batch/', [{'method': 'GET', 'path': '/join-request/user/test_user_id/'}], format='json', **self.auth
+        )
+        [item] = response.json()
+        self.assertEqual([request['sender_id'] for request in item['body']], [f'sender_{i}' for i in reversed(range(7))])
+
+
+@override_settings(PROJECT_SUMMARY_LENGTH=10)
+class SparseFieldsetTests(APITestCase):
+    """Tests for ?fields= and ?projection=summary"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        cache.clear()
+        profile_cache.clear()
+        self.factory = APIRequestFactory()
+        Profile.objects.create(user_id='test_user_id', username='testuser', email='test@example.com', bio='bio')
+        self.projects = [
+            Project.objects.create(title=f'Project {i}', content=f'Long content number {i} ' * 20, user_id='test_user_id')
+            for i in range(5)
+        ]
+        JoinRequest.objects.create(project_id=self.projects[0].id, sender_id='test_user_id', receiver_id='test_user_id')
+        token = jwt.encode({'sub': 'test_user_id'}, settings.SUPABASE_JWT_SECRET, algorithm='HS256')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def _get(self, path, **params):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get(path, params, **self.auth)
+        return response, [query['sql'] for query in queries.captured_queries]
+
+    def test_fields_limit_keys_and_columns(self):
+        """Test that ?fields= returns only those keys and selects only those columns"""
+        for path in ('/homepage/', '/user-projects/test_user_id/'):
+            with self.subTest(path=path):
+                response, sql = self._get(path, fields='id,title')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.json()[0], {'id': self.projects[-1].id, 'title': 'Project 4'})
+                self.assertFalse(any('"content"' in query for query in sql))
+
+    def test_summary_truncates_content_in_the_database(self):
+        """Test that ?projection=summary returns a content snippet cut by the query"""
+        response, sql = self._get('/homepage/', projection='summary')
+        item = response.json()[0]
+        self.assertEqual(item['content'], 'Long conte')
+        self.assertEqual(set(item), {'id', 'title', 'content', 'user_id', 'created_at', 'updated_at'})
+        self.assertTrue(any('SUBSTR' in query.upper() for query in sql))
+
+        response, sql = self._get('/homepage/', projection='summary', fields='content')
+        self.assertEqual(response.json()[0], {'content': 'Long conte'})
+
+    def test_pages_without_ordering_fields(self):
+        """Test that cursors still work when ?fields= leaves out the ordering columns"""
+        titles, cursor = [], None
+        while True:
+            params = {'fields': 'title', 'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            page = self._get('/homepage/', **params)[0].json()
+            self.assertTrue(all(set(item) == {'title'} for item in page['results']))
+            titles += [item['title'] for item in page['results']]
+            cursor = page['next']
+            if not cursor:
+                break
+        self.assertEqual(titles, [f'Project {i}' for i in reversed(range(5))])
+
+    def test_object_and_bulk_endpoints(self):
+        """Test that single-object and bulk lookups honour ?fields="""
+        cases = [
+            (f'/projects/{self.projects[0].id}/', {'title': 'Project 0'}),
+            ('/profile/test_user_id/', {'username': 'testuser'}),
+            ('/me/', {'username': 'testuser'}),
+        ]
+        fields = {'/profile/test_user_id/': 'username', '/me/': 'username'}
+        for path, expected in cases:
+            with self.subTest(path=path):
+                response = self._get(path, fields=fields.get(path, 'title'))[0]
+                self.assertEqual(response.json(), expected)
+
+        ids = f'{self.projects[1].id},999,{self.projects[0].id}'
+        response = self._get('/projects/', ids=ids, fields='title', projection='summary')[0]
+        self.assertEqual(response.json(), {'results': [{'title': 'Project 1'}, {'title': 'Project 0'}], 'missing': [999]})
+        response = self._get('/profiles/', ids='test_user_id', fields='bio')[0]
+        self.assertEqual(response.json(), {'results': [{'bio': 'bio'}], 'missing': []})
+
+    def test_join_request_lists(self):
+        """Test that join request lists take ?fields= but keep the ids expansions need"""
+        response = self._get('/join-request/sent/', fields='status')[0]
+        self.assertEqual(response.json(), [{'status': 'pending'}])
+        response = self._get('/join-request/sent/', fields='status,receiver_id', expand='receiver')[0]
+        self.assertEqual(response.json()[0]['receiver']['username'], 'testuser')
+        response = self._get('/join-request/sent/', fields='status', expand='receiver')[0]
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'fields': 'Must include receiver_id'})
+
+    def test_invalid_parameters(self):
+        """Test that unknown fields and projections are rejected"""
+        for path, params, error in [
+            ('/homepage/', {'fields': 'title,secret'}, {'fields': 'Unknown field(s): secret'}),
+            ('/homepage/', {'projection': 'tiny'}, {'projection': 'Unknown projection: tiny'}),
+            ('/join-request/sent/', {'projection': 'summary'}, {'projection': 'Unknown projection: summary'}),
+            ('/me/', {'fields': 'password'}, {'fields': 'Unknown field(s): password'}),
+        ]:
+            with self.subTest(path=path, params=params):
+                response = self._get(path, **params)[0]
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.json(), error)
+
+    def test_async_views_match(self):
+        """Test that the async views project like the sync ones"""
+        for name, path, args in [
+            ('get_projects', '/homepage/?fields=title,user_id&projection=summary', ()),
+            ('get_user_projects', '/user-projects/test_user_id/?fields=content&projection=summary&page_size=2', ('test_user_id',)),
+            ('get_sent_join_requests', '/join-request/sent/?fields=status', ()),
+            ('profile_detail', '/profile/test_user_id/?fields=username', ('test_user_id',)),
+        ]:
+            with self.subTest(path=path):
+                responses = []
+                for view in (getattr(views, name), async_to_sync(getattr(async_views, name))):
+                    cache.clear()
+                    response = view(self.factory.get(path, **self.auth), *args)
+                    response.render()
+                    responses.append((response.status_code, response.content))
+                self.assertEqual(responses[0], responses[1])
+
+
+class JoinRequestCreateTests(APITestCase):
+    """Tests for creating join requests with a single INSERT ... SELECT"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        profile_cache.clear()
+        Profile.objects.create(user_id='owner_id', username='owner')
+        Profile.objects.create(user_id='sender_id', username='sender')
+        self.project = Project.objects.create(title='Project', content='content', user_id='owner_id')
+        self.sender = {'HTTP_AUTHORIZATION': f"Bearer {jwt.encode({'sub': 'sender_id'}, settings.SUPABASE_JWT_SECRET, algorithm='HS256')}"}
+        self.owner = {'HTTP_AUTHORIZATION': f"Bearer {jwt.encode({'sub': 'owner_id'}, settings.SUPABASE_JWT_SECRET, algorithm='HS256')}"}
+
+    def _post(self, data, auth=None):
+        return self.client.post('/join-request/', data, format='json', **(auth or self.sender))
+
+    def test_creates_in_one_statement(self):
+        """Test that a join request is created with one query once the caller is known"""
+        self._post({'project_id': 0})  # Warms the profile cache
+        with self.assertNumQueries(1):
+            response = self._post({'project_id': self.project.id, 'message': 'Hi'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        join_request = JoinRequest.objects.get()
+        self.assertEqual(response.data, JoinRequestSerializer(join_request).data)
+        self.assertEqual(
+            (join_request.receiver_id, join_request.sender_id, join_request.message, join_request.status),
+            ('owner_id', 'sender_id', 'Hi', 'pending'),
+        )
+
+    def test_error_responses(self):
+        """Test that failures keep their previous statuses and bodies"""
+        self._post({'project_id': self.project.id})
+        cases = [
+            ({}, None, 400, {'detail': 'project_id is required'}),
+            ({'project_id': 'abc'}, None, 400, {'project_id': ['A valid integer is required.']}),
+            ({'project_id': self.project.id + 1}, None, 404, {'detail': 'Project not found'}),
+            ({'project_id': self.project.id}, self.owner, 400, {'detail': 'Cannot join your own project'}),
+            ({'project_id': self.project.id}, None, 400, {'detail': 'Join request already exists'}),
+        ]
+        for data, auth, code, body in cases:
+            with self.subTest(data=data):
+                response = self._post(data, auth)
+                self.assertEqual(response.status_code, code)
+                self.assertEqual(response.json(), body)
+        self.assertEqual(JoinRequest.objects.count(), 1)
+
+
+class ConcurrentJoinRequestTests(TransactionTestCase):
+    """Tests for join request creation under concurrent requests"""
+
+    def test_parallel_duplicates_create_one_request(self):
+        """Test that simultaneous taps from several threads create exactly one request"""
+        connection = connections['default']
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # Shared-cache in-memory SQLite fails concurrent writers with "table is locked" instead of waiting
+            self.skipTest("needs a database that lets concurrent writers wait")
+        Profile.objects.create(user_id='owner_id', username='owner')
+        Profile.objects.create(user_id='sender_id', username='sender')
+        project = Project.objects.create(title='Project', content='content', user_id='owner_id')
+        token = jwt.encode({'sub': 'sender_id'}, settings.SUPABASE_JWT_SECRET, algorithm='HS256')
+        threads = 8
+        start = threading.Barrier(threads)
+        codes = []
+
+        def tap():
+            try:
+                start.wait()
+                response = APIClient().post(
+                    '/join-request/', {'project_id': project.id}, format='json', HTTP_AUTHORIZATION=f'Bearer {token}'
+                )
+                codes.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=tap) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(sorted(codes), [201] + [400] * (threads - 1))
+        self.assertEqual(JoinRequest.objects.filter(project_id=project.id, sender_id='sender_id').count(), 1)
+
+
+class DuplicateJoinRequestMigrationTests(TransactionTestCase):
+    """Tests for the duplicate join request cleanup in migration 0007"""
+
+    before = [('backend', '0006_project_search_vector')]
+
+    def test_keeps_answered_then_newest_request(self):
+        """Test that duplicates lose to an answered request, then to the newest one, and are logged"""
+        executor = MigrationExecutor(connection)
+        after = [key for key in executor.loader.graph.leaf_nodes() if key[0] == 'backend']
+        executor.migrate(self.before)
+        OldJoinRequest = executor.loader.project_state(self.before).apps.get_model('backend', 'JoinRequest')
+        now = timezone.now()
+
+        def add(project_id, status, minutes_ago):
+            return OldJoinRequest.objects.create(
+                project_id=project_id, sender_id='sender_id', receiver_id='owner_id', status=status,
+                created_at=now - timedelta(minutes=minutes_ago),
+            ).id
+
+        answered = add(1, 'declined', 15)
+        add(1, 'pending', 10)
+        add(1, 'pending', 20)
+        add(2, 'pending', 20)
+        newest = add(2, 'pending', 10)
+        single = add(3, 'pending', 5)
+
+        executor = MigrationExecutor(connection)
+        with self.assertLogs('backend.migrations', 'WARNING') as logs:
+            executor.migrate(after)
+        self.assertEqual(sorted(JoinRequest.objects.values_list('id', flat=True)), [answered, newest, single])
+        self.assertIn('Removed 3 duplicate join requests', logs.output[0])
+
+
+class JoinRequestModerationTests(APITestCase):
+    """Tests for accepting or declining many join requests at once"""
+
+    def setUp(self):
+        """Set up test data and clients"""
+        profile_cache.clear()
+        Profile.objects.create(user_id='owner_id', username='owner')
+        self.project = Project.objects.create(title='Project', content='content', user_id='owner_id')
+        other = Project.objects.create(title='Other', content='content', user_id='owner_id')
+        self.pending = [
+            JoinRequest.objects.create(project_id=self.project.id, sender_id=f'sender_{i}', receiver_id='owner_id')
+            for i in range(5)
+        ]
+        self.answered = JoinRequest.objects.create(
+            project_id=self.project.id, sender_id='sender_x', receiver_id='owner_id', status='accepted'
+        )
+        self.elsewhere = JoinRequest.objects.create(project_id=other.id, sender_id='sender_0', receiver_id='owner_id')
+        self.not_mine = JoinRequest.objects.create(project_id=999, sender_id='sender_0', receiver_id='someone_else')
+        token = jwt.encode({'sub': 'owner_id'}, settings.SUPABASE_JWT_SECRET, algorithm='HS256')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        self.client.get('/me/', **self.auth)  # Warms the profile cache
+
+    def _moderate(self, data):
+        return self.client.post('/join-request/moderate/', data, format='json', **self.auth)
+
+    def _statuses(self):
+        return dict(JoinRequest.objects.values_list('id', 'status'))
+
+    def test_listed_requests_in_one_query(self):
+        """Test that listed pending requests are answered with one UPDATE and the rest skipped"""
+        ids = [self.pending[0].id, self.pending[1].id, self.answered.id, self.not_mine.id, 12345]
+        with self.assertNumQueries(1):
+            response = self._moderate({'status': 'accepted', 'ids': ids})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(item['id'] for item in response.data['results']), ids[:2])
+        self.assertEqual(response.data['skipped'], ids[2:])
+        for item in response.data['results']:
+            self.assertEqual(item, JoinRequestSerializer(JoinRequest.objects.get(pk=item['id'])).data)
+
+        statuses = self._statuses()
+        self.assertEqual([statuses[pk] for pk in ids[:4]], ['accepted', 'accepted', 'accepted', 'pending'])
+        self.assertEqual(statuses[self.pending[2].id], 'pending')
+
+    def test_all_pending_for_a_project(self):
+        """Test that project_id answers only that project's pending requests"""
+        # The ownership check, then the UPDATE
+        with self.assertNumQueries(2):
+            response = self._moderate({'status': 'declined', 'project_id': self.project.id})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(response.data['skipped'], [])
+        statuses = self._statuses()
+        self.assertTrue(all(statuses[request.id] == 'declined' for request in self.pending))
+        self.assertEqual(statuses[self.answered.id], 'accepted')
+        self.assertEqual(statuses[self.elsewhere.id], 'pending')
+
+    def test_project_must_be_the_callers(self):
+        """Test that project_id for someone else's or a missing project is refused without writing"""
+        theirs = Project.objects.create(title='Theirs', content='content', user_id='someone_else')
+        JoinRequest.objects.create(project_id=theirs.id, sender_id='sender_0', receiver_id='owner_id')
+        before = self._statuses()
+        for project_id, code, detail in [
+            (theirs.id, status.HTTP_403_FORBIDDEN, 'Not authorized'),
+            (theirs.id + 1000, status.HTTP_404_NOT_FOUND, 'Project not found'),
+        ]:
+            with self.subTest(project_id=project_id):
+                response = self._moderate({'status': 'accepted', 'project_id': project_id})
+                self.assertEqual(response.status_code, code)
+                self.assertEqual(response.json(), {'detail': detail})
+        self.assertEqual(self._statuses(), before)
+
+    def test_notifies_each_sender(self):
+        """Test that every updated request notifies its sender once committed"""
+        published = []
+        broker = get_broker()
+        original = broker.publish
+        broker.publish = lambda channel, event: published.append((channel, event['type']))
+        self.addCleanup(setattr, broker, 'publish', original)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._moderate({'status': 'accepted', 'ids': [self.pending[3].id, self.pending[4].id]})
+        self.assertEqual(sorted(published), [
+            (user_channel('sender_3'), 'join_request.updated'),
+            (user_channel('sender_4'), 'join_request.updated'),
+        ])
+
+    def test_invalid_bodies(self):
+        """Test that malformed moderation requests are rejected without writing"""
+        for data in [
+            {'status': 'pending', 'ids': [self.pending[0].id]},
+            {'status': 'accepted'},
+            {'status': 'accepted', 'ids': [self.pending[0].id], 'project_id': self.project.id},
+            {'status': 'accepted', 'ids': []},
+            {'status': 'accepted', 'ids': ['x']},
+        ]:
+            with self.subTest(data=data):
+                self.assertEqual(self._moderate(data).status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(JOIN_REQUEST_MODERATION_MAX_IDS=2):
+            response = self._moderate({'status': 'accepted', 'ids': [1, 2, 3]})
+            self.assertEqual(response.json(), {'ids': ['At most 2 ids per request']})
+        self.assertEqual(set(self._statuses().values()), {'pending', 'accepted'})
+        self.assertEqual(JoinRequest.objects.filter(status='accepted').count(), 1)
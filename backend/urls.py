@@ -1,8 +1,14 @@
 # backend/urls.py
 from django.urls import path, include
 from django.conf import settings
-from . import views
+from . import views, async_views
 from . auth_views import supabase_auth
+from . batch_views import batch
+from . event_views import events
+from . metrics import metrics_view
+
+# Read endpoints are served by native async views when ASYNC_READ_VIEWS is on (ASGI deployments)
+reads = async_views if getattr(settings, 'ASYNC_READ_VIEWS', False) else views
 
 urlpatterns = [
     # Root path
@@ -10,22 +16,38 @@ urlpatterns = [
 
     # Profiles
     path('create-profile/', views.create_profile),
-    path('profile/<str:user_id>/', views.profile_detail),  # Handles both GET and PATCH
-    path('me/', views.get_current_user),  # Add this function
+    path('profile/<str:user_id>/', reads.profile_detail),  # Handles both GET and PATCH
+    path('profiles/', views.get_profiles),  # GET with ?ids=a,b,c
+    path('me/', reads.get_current_user),  # Add this function
+    path('me/dashboard/', views.get_dashboard),  # Profile, projects and join requests in one call
 
     # Projects
     path('create-project/', views.create_project),
+    path('projects/', views.get_projects_by_ids),  # GET with ?ids=1,2,3
     path('projects/<int:pk>/', views.project_detail),  # GET, PUT, DELETE
-    path('user-projects/<str:user_id>/', views.get_user_projects),
-    path('homepage/', views.get_projects),  # GET with ?query=
+    path('user-projects/<str:user_id>/', reads.get_user_projects),
+    path('homepage/', reads.get_projects),  # GET with ?query=
 
     # Join-requests 
     path('join-request/<int:pk>/status/', views.update_join_request_status),
+    path('join-request/moderate/', views.moderate_join_requests),  # POST; accept/decline many at once
     path('join-request/', views.create_join_request),
-    path('join-request/user/<str:user_id>/', views.get_received_join_requests),
-    path('join-request/sent/', views.get_sent_join_requests),
+    path('join-request/user/<str:user_id>/', reads.get_received_join_requests),
+    path('join-request/sent/', reads.get_sent_join_requests),
+
+    # Delta sync for the mobile client (GET with ?since=<cursor>)
+    path('sync/', views.sync),
     
     path('api/auth/', supabase_auth, name='supabase_auth'), # Authentication endpoint
+
+    # Several API calls in one round trip
+    path('batch/', batch),
+
+    # Server-Sent Events push channel (ASGI only)
+    path('events/', events),
+
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view),
 ]
 
 
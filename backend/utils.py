@@ -1,33 +1,126 @@
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
+from django.conf import settings
 import logging
-import traceback
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+
+class ErrorAggregator:
+    """
+    Counts errors and decides which ones are worth a log record: the first
+    of a kind in each window is logged, the rest are only counted and
+    summarised on the next record of that kind. Totals are exported at
+    /metrics as api_errors_total.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}  # (route, status, exception) -> count
+        self._windows = {}  # (counter key, detail) -> [window start, suppressed]
+
+    def record(self, key, window, detail=None, now=None):
+        """
+        Count one error. Returns (log, suppressed): whether to log this one,
+        and how many of its kind were counted without a record since the
+        last one.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._totals[key] = self._totals.get(key, 0) + 1
+            entry = self._windows.get((key, detail))
+            if entry is None or now - entry[0] >= window:
+                self._windows[(key, detail)] = [now, 0]
+                return True, entry[1] if entry else 0
+            entry[1] += 1
+            return False, 0
+
+    def totals(self):
+        with self._lock:
+            return dict(self._totals)
+
+    def clear(self):
+        with self._lock:
+            self._totals.clear()
+            self._windows.clear()
+
+
+error_log = ErrorAggregator()
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None) if request is not None else None
+    if match is not None:
+        return match.route
+    return request.path if request is not None else 'unknown'
+
+
+def _origin(exc):
+    # Where the exception was raised, so different bugs in one view are logged separately
+    tb = exc.__traceback__
+    if tb is None:
+        return None
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    return f"{tb.tb_frame.f_code.co_filename}:{tb.tb_lineno}"
+
+
+def _describe(exc):
+    # The message when it is a plain string, else the error codes (for validation errors)
+    detail = getattr(exc, 'detail', None)
+    if isinstance(detail, str):
+        return detail
+    return exc.get_codes() if hasattr(exc, 'get_codes') else exc
+
+
+def _log(level, method, key, suppressed, description, exc_info=None):
+    route, status_code, exception = key
+    extra = {'route': route, 'status_code': status_code, 'exception': exception, 'suppressed': suppressed}
+    if suppressed:
+        logger.log(
+            level, "%s %s -> %d %s: %s (%d more since last logged)",
+            method, route, status_code, exception, description, suppressed, exc_info=exc_info, extra=extra,
+        )
+    else:
+        logger.log(
+            level, "%s %s -> %d %s: %s",
+            method, route, status_code, exception, description, exc_info=exc_info, extra=extra,
+        )
+
+
 def custom_exception_handler(exc, context):
     """
     Custom exception handler for better error reporting.
+
+    Logging is tiered so routine errors stay cheap: expected client errors
+    (4xx, e.g. expired tokens and 404s) get one short record, and only
+    unexpected errors get a traceback. Repeats of the same error within
+    ERROR_LOG_WINDOW_SECONDS are counted instead of logged.
     """
-    # Log the error
-    logger.error(f"Exception: {exc}")
-    logger.error(traceback.format_exc())
-    
-    # Get the view and request
-    view = context.get('view')
     request = context.get('request')
     
-    if view:
-        logger.error(f"View: {view.__class__.__name__}")
-    
-    if request:
-        logger.error(f"URL: {request.path}")
-        logger.error(f"Method: {request.method}")
-        logger.error(f"User: {getattr(request, 'user', 'AnonymousUser')}")
-    
     # Call REST framework's default exception handler first
     response = exception_handler(exc, context)
     
+    status_code = response.status_code if response is not None else 500
+    key = (_route(request), status_code, exc.__class__.__name__)
+    method = request.method if request is not None else '-'
+    window = getattr(settings, 'ERROR_LOG_WINDOW_SECONDS', 60)
+    
+    if status_code < 500:
+        log, suppressed = error_log.record(key, window)
+        if log:
+            _log(logging.INFO, method, key, suppressed, _describe(exc))
+        # Logged (or deliberately counted) here; skip Django's per-response warning
+        response._has_been_logged = True
+    else:
+        log, suppressed = error_log.record(key, window, detail=_origin(exc))
+        if log:
+            # Formatted by the handler, off the request path with BackgroundHandler
+            _log(logging.ERROR, method, key, suppressed, exc, exc_info=(type(exc), exc, exc.__traceback__))
+    
     # If this is a 500 error or another unhandled exception
     if response is None:
         return Response(
@@ -43,4 +136,4 @@ def custom_exception_handler(exc, context):
                 "code": getattr(exc, 'code', 'authentication_failed')
             }
             
-    return response
\ No newline at end of file
+    return response
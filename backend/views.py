@@ -3,49 +3,185 @@ from django.db.models import Q
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
-from .models import Profile, Project, JoinRequest
-from .serializers import ProfileSerializer, ProjectSerializer, JoinRequestSerializer
+from .models import Profile, Project, JoinRequest, Tombstone
+from .serializers import (
+    ProfileSerializer, ProjectSerializer, JoinRequestSerializer, JoinRequestCreateSerializer,
+    JoinRequestModerationSerializer, parse_expand, expand_join_requests,
+    parse_fields, parse_projection, parse_join_request_projection, select_fields, project_values, project_feed_values, join_request_values,
+)
 from .permissions import IsAuthenticatedWithProfile
-from .authentication import SupabaseAuthentication
+from .authentication import SupabaseAuthentication, invalidate_profile
+from .budgets import query_budget
+from .search import search_projects
+from .pagination import wants_pagination, paginate_queryset, page_data, encode_cursor, decode_position, BIGINT_MAX
+from .conditional import object_validators, queryset_validators, not_modified, set_validators
+from .streaming import wants_streaming, streaming_response
+from .cache import response_cache_key, get_cached_response, cache_response, invalidate_responses
+from .routers import read_from_primary
+from .events import publish_on_commit
+from . import join_request_writes
 import logging
 import jwt
+from datetime import timedelta
 from django.conf import settings
+from django.utils import timezone
 
 
 logger = logging.getLogger(__name__)       
 
+def _cached_read(request, key):
+    """
+    Serve a response cached with cache_response(), honouring conditional
+    headers against its stored validators. Returns None on a cache miss.
+    """
+    entry = get_cached_response(key)
+    if entry is None:
+        # The response about to be built will be cached for everyone; build it from the primary
+        read_from_primary()
+        return None
+    data, validators = entry
+    return not_modified(request, validators) or set_validators(Response(data), validators)
+
 # ───────── Basic landing ─────────
+@query_budget(0)
 def myapp(request):
     return render(request, 'main.html')
 
 # Get current user profile
+@query_budget(1)
 @api_view(['GET'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
 def get_current_user(request):
     # Get user_id directly from the profile
     user_id = request.user.user_id  # Changed from request.user.username
+    fields = parse_fields(request, ProfileSerializer)
     
     try:
         # The profile is already available as request.user
         serializer = ProfileSerializer(request.user)
-        return Response(serializer.data)
+        return Response(select_fields(serializer.data, fields))
     except Exception as e:
-        logger.error(f"Error in get_current_user: {str(e)}")
+        logger.error("Error in get_current_user: %s", e)
         return Response({"detail": f"Error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# Everything the profile screen needs in one response
+@query_budget(6)
+@api_view(['GET'])
+@authentication_classes([SupabaseAuthentication])
+@permission_classes([IsAuthenticatedWithProfile])
+def get_dashboard(request):
+    user_id = request.user.user_id
+    expand = parse_expand(request)
+    
+    # One query per list; the profile itself comes from authentication
+    projects = Project.objects.filter(user_id=user_id).order_by('-created_at')
+    received = join_request_values.data(JoinRequest.objects.filter(receiver_id=user_id).order_by('-created_at'))
+    sent = join_request_values.data(JoinRequest.objects.filter(sender_id=user_id).order_by('-created_at'))
+    
+    # Expand both lists together so related rows are still fetched in one batch
+    expand_join_requests(received + sent, expand)
+    
+    return Response({
+        'profile': ProfileSerializer(request.user).data,
+        'projects': project_values.data(projects),
+        'received_requests': received,
+        'sent_requests': sent,
+        'counts': {
+            'pending_received': sum(1 for item in received if item['status'] == 'pending'),
+            'pending_sent': sum(1 for item in sent if item['status'] == 'pending'),
+        },
+    })
+
 # Profile views
+@query_budget(2)
 @api_view(['GET'])
 def get_profile(request, user_id):
+    fields = parse_fields(request, ProfileSerializer)
+    cache_key = response_cache_key(request, f'profile:{user_id}')
+    cached = _cached_read(request, cache_key)
+    if cached:
+        return cached
+    
     try:
         profile = Profile.objects.get(user_id=user_id)
-        serializer = ProfileSerializer(profile)
-        return Response(serializer.data)
     except Profile.DoesNotExist:
         return Response({"detail": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+    
+    validators = object_validators(request, profile)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+    data = select_fields(ProfileSerializer(profile).data, fields)
+    cache_response(cache_key, data, validators)
+    return set_validators(Response(data), validators)
+
+# Bulk lookups: /profiles/?ids=a,b,c and /projects/?ids=1,2,3
+def _parse_ids(request, cast=str):
+    """
+    Parse ?ids= into a de-duplicated list, keeping the requested order.
+    Returns (ids, error_response).
+    """
+    raw = [value.strip() for value in request.query_params.get('ids', '').split(',') if value.strip()]
+    if not raw:
+        return None, Response({"detail": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    max_ids = getattr(settings, 'BULK_LOOKUP_MAX_IDS', 100)
+    try:
+        ids = list(dict.fromkeys(cast(value) for value in raw))
+    except ValueError:
+        return None, Response({"detail": "ids must be a comma-separated list of valid ids"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > max_ids:
+        return None, Response({"detail": f"At most {max_ids} ids per request"}, status=status.HTTP_400_BAD_REQUEST)
+    return ids, None
 
+def _bigint(value):
+    # Larger ids make the database driver raise OverflowError
+    value = int(value)
+    if not -BIGINT_MAX <= value <= BIGINT_MAX:
+        raise ValueError(f"{value} is out of range")
+    return value
+
+def _bulk_lookup_response(ids, by_id, serialize):
+    # Results follow the requested order; unknown ids are listed under "missing"
+    found = [by_id[i] for i in ids if i in by_id]
+    return Response({
+        'results': serialize(found),
+        'missing': [i for i in ids if i not in by_id],
+    })
+
+@query_budget(2)
+@api_view(['GET'])
+def get_profiles(request):
+    user_ids, error = _parse_ids(request)
+    if error:
+        return error
+    
+    fields = parse_fields(request, ProfileSerializer)
+    profiles = {profile.user_id: profile for profile in Profile.objects.filter(user_id__in=user_ids)}
+    return _bulk_lookup_response(
+        user_ids, profiles, lambda found: select_fields(ProfileSerializer(found, many=True).data, fields)
+    )
+
+@query_budget(2)
+@api_view(['GET'])
+@authentication_classes([SupabaseAuthentication])
+@permission_classes([IsAuthenticatedWithProfile])
+def get_projects_by_ids(request):
+    project_ids, error = _parse_ids(request, cast=_bigint)
+    if error:
+        return error
+    
+    # Only the requested columns are selected; ordering by id makes rows carry it for the lookup
+    values = parse_projection(request, project_values)
+    rows = values.rows(Project.objects.filter(id__in=project_ids).order_by('id'))
+    projects = {values.position(row, ['id'])[0]: row for row in rows}
+    return _bulk_lookup_response(project_ids, projects, values.serialize)
+
+@query_budget(3)
 @api_view(['POST'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -68,10 +204,13 @@ def create_profile(request):
     serializer = ProfileSerializer(data=data)
     if serializer.is_valid():
         serializer.save()
+        invalidate_profile(user_id)
+        invalidate_responses(f'profile:{user_id}')
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Modified to handle both PATCH and PUT methods
+@query_budget(3)
 @api_view(['PATCH', 'PUT'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -90,37 +229,53 @@ def update_profile(request, user_id):
     serializer = ProfileSerializer(profile, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
+        invalidate_profile(user_id)
+        invalidate_responses(f'profile:{user_id}')
         return Response(serializer.data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Project views
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_projects(request):
     search_query = request.query_params.get('query', None)
+    values = parse_projection(request, project_feed_values)
+    
+    # Only the unfiltered feed is cached; search results are too varied to be worth it
+    cache_key = None
+    if not search_query:
+        cache_key = response_cache_key(request, 'projects')
+        cached = _cached_read(request, cache_key)
+        if cached:
+            return cached
     
     if search_query:
-        # Search in title, content, and user profiles
-        projects = Project.objects.filter(
-            Q(title__icontains=search_query) | 
-            Q(content__icontains=search_query) |
-            Q(user_id__in=Profile.objects.filter(
-                Q(username__icontains=search_query) | 
-                Q(bio__icontains=search_query)
-            ).values_list('user_id', flat=True))
-        ).order_by('-created_at')
+        # Search in title, content, and user profiles, most relevant first
+        projects = search_projects(Project.objects.all(), search_query)
     else:
         projects = Project.objects.all().order_by('-created_at')
     
-    # Fix for projects with user_id = 0 or empty
-    serializer = ProjectSerializer(projects, many=True)
-    data = serializer.data
-    for project in data:
-        if not project.get('user_id') or project.get('user_id') == '0':
-            project['user_id'] = 'unknown'
-    
-    return Response(data)
+    # Answer 304 before fetching or serializing anything if the client is current
+    validators = queryset_validators(request, projects)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+    
+    # Owners stored as '' or '0' are rendered as 'unknown' by the query itself
+    if wants_pagination(request):
+        rows, next_cursor = paginate_queryset(request, values.rows(projects), values.position)
+        data = page_data(values.serialize(rows), next_cursor)
+    elif wants_streaming(validators):
+        # Too large to hold in memory (or the cache) at once
+        return set_validators(streaming_response(values, projects), validators)
+    else:
+        data = values.data(projects)
+    if cache_key:
+        cache_response(cache_key, data, validators)
+    return set_validators(Response(data), validators)
 
+@query_budget(2)
 @api_view(['POST'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -135,9 +290,11 @@ def create_project(request):
     serializer = ProjectSerializer(data=data)
     if serializer.is_valid():
         serializer.save()
+        invalidate_responses('projects', f'user-projects:{user_id}')
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(GET=2, PUT=3, PATCH=3, DELETE=4)
 @api_view(['GET', 'PUT', 'DELETE', 'PATCH'])  # Added PATCH
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -151,8 +308,13 @@ def project_detail(request, pk):
     user_id = request.user.user_id  # Changed from request.user.username
     
     if request.method == 'GET':
+        validators = object_validators(request, project)
+        cached = not_modified(request, validators)
+        if cached:
+            return cached
         serializer = ProjectSerializer(project)
-        return Response(serializer.data)
+        data = select_fields(serializer.data, parse_fields(request, ProjectSerializer))
+        return set_validators(Response(data), validators)
     
     # Only allow update/delete if user is the creator
     if project.user_id != user_id:
@@ -164,20 +326,40 @@ def project_detail(request, pk):
         serializer = ProjectSerializer(project, data=request.data, partial=partial)
         if serializer.is_valid():
             serializer.save()
+            invalidate_responses('projects', f'user-projects:{user_id}', f'user-projects:{project.user_id}')
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
         project.delete()
+        invalidate_responses('projects', f'user-projects:{user_id}')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+@query_budget(3)
 @api_view(['GET'])
 def get_user_projects(request, user_id):
+    values = parse_projection(request, project_values)
+    cache_key = response_cache_key(request, f'user-projects:{user_id}')
+    cached = _cached_read(request, cache_key)
+    if cached:
+        return cached
+    
     projects = Project.objects.filter(user_id=user_id).order_by('-created_at')
-    serializer = ProjectSerializer(projects, many=True)
-    return Response(serializer.data)
+    validators = queryset_validators(request, projects)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+    
+    if wants_pagination(request):
+        rows, next_cursor = paginate_queryset(request, values.rows(projects), values.position)
+        data = page_data(values.serialize(rows), next_cursor)
+    else:
+        data = values.data(projects)
+    cache_response(cache_key, data, validators)
+    return set_validators(Response(data), validators)
 
 # Join Request views
+@query_budget(3)  # 2 on success; rejected creates spend one more finding out why
 @api_view(['POST'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -186,39 +368,30 @@ def create_join_request(request):
     sender_id = request.user.user_id  # Changed from request.user.username
     
     # Get project_id from request
-    project_id = request.data.get('project_id')
-    if not project_id:
+    if not request.data.get('project_id'):
         return Response({"detail": "project_id is required"}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Get project to find receiver_id
-    try:
-        project = Project.objects.get(pk=project_id)
-    except Project.DoesNotExist:
-        return Response({"detail": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+    serializer = JoinRequestCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    # Check if user is trying to join their own project
-    if project.user_id == sender_id:
+    # One INSERT ... SELECT: finds the owner, skips own projects and lets the
+    # unique (project_id, sender_id) constraint reject duplicates, even concurrent ones
+    join_request, outcome = join_request_writes.create_join_request(
+        serializer.validated_data['project_id'], sender_id, serializer.validated_data['message']
+    )
+    if outcome == join_request_writes.PROJECT_NOT_FOUND:
+        return Response({"detail": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+    if outcome == join_request_writes.OWN_PROJECT:
         return Response({"detail": "Cannot join your own project"}, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Check if request already exists
-    if JoinRequest.objects.filter(project_id=project_id, sender_id=sender_id).exists():
+    if outcome == join_request_writes.DUPLICATE:
         return Response({"detail": "Join request already exists"}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Create join request
-    data = {
-        'project_id': project_id,
-        'sender_id': sender_id,
-        'receiver_id': project.user_id,
-        'message': request.data.get('message', ''),
-        'status': 'pending'
-    }
-    
-    serializer = JoinRequestSerializer(data=data)
-    if serializer.is_valid():
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = JoinRequestSerializer(join_request).data
+    publish_on_commit([join_request.receiver_id], 'join_request.created', data)
+    return Response(data, status=status.HTTP_201_CREATED)
 
+@query_budget(3)
 @api_view(['PATCH', 'PUT'])  # Added PUT for compatibility
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -244,8 +417,47 @@ def update_join_request_status(request, pk):
     join_request.save()
     
     serializer = JoinRequestSerializer(join_request)
+    publish_on_commit([join_request.sender_id], 'join_request.updated', serializer.data)
     return Response(serializer.data)
 
+@query_budget(3)
+@api_view(['POST'])
+@authentication_classes([SupabaseAuthentication])
+@permission_classes([IsAuthenticatedWithProfile])
+def moderate_join_requests(request):
+    """
+    Accept or decline many join requests at once: {"status", "ids": [...]}
+    or {"status", "project_id"} for every pending request on a project the
+    caller owns. Only pending requests addressed to the caller are changed,
+    in a single UPDATE; listed ids that were not are returned under "skipped".
+    """
+    serializer = JoinRequestModerationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    ids = serializer.validated_data.get('ids')
+    project_id = serializer.validated_data.get('project_id')
+    if project_id is not None:
+        owner_id = Project.objects.filter(pk=project_id).values_list('user_id', flat=True).first()
+        if owner_id is None:
+            return Response({"detail": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+        if owner_id != request.user.user_id:
+            return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
+
+    updated = join_request_writes.moderate_join_requests(
+        request.user.user_id, serializer.validated_data['status'], ids=ids, project_id=project_id,
+    )
+    
+    data = JoinRequestSerializer(updated, many=True).data
+    for item in data:
+        publish_on_commit([item['sender_id']], 'join_request.updated', item)
+    updated_ids = {item['id'] for item in data}
+    return Response({
+        'results': data,
+        'skipped': [pk for pk in ids or () if pk not in updated_ids],
+    })
+
+@query_budget(4)
 @api_view(['GET'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -255,10 +467,28 @@ def get_received_join_requests(request, user_id):
     if token_user_id != user_id:
         return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
     
+    expand = parse_expand(request)
+    values = parse_join_request_projection(request, expand)
     join_requests = JoinRequest.objects.filter(receiver_id=user_id).order_by('-created_at')
-    serializer = JoinRequestSerializer(join_requests, many=True)
-    return Response(serializer.data)
+    
+    # Expanded objects change independently of the requests, so only plain lists get validators
+    validators = None
+    if not expand:
+        validators = queryset_validators(request, join_requests)
+        cached = not_modified(request, validators)
+        if cached:
+            return cached
+    
+    if wants_pagination(request):
+        rows, next_cursor = paginate_queryset(request, values.rows(join_requests), values.position)
+        response = Response(page_data(expand_join_requests(values.serialize(rows), expand), next_cursor))
+    elif wants_streaming(validators):
+        response = streaming_response(values, join_requests)
+    else:
+        response = Response(expand_join_requests(values.data(join_requests), expand))
+    return set_validators(response, validators) if validators else response
 
+@query_budget(4)
 @api_view(['GET'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -266,10 +496,28 @@ def get_sent_join_requests(request):
     # Get user_id directly from the profile
     user_id = request.user.user_id  # Changed from request.user.username
     
+    expand = parse_expand(request)
+    values = parse_join_request_projection(request, expand)
     join_requests = JoinRequest.objects.filter(sender_id=user_id).order_by('-created_at')
-    serializer = JoinRequestSerializer(join_requests, many=True)
-    return Response(serializer.data)
+    
+    # Expanded objects change independently of the requests, so only plain lists get validators
+    validators = None
+    if not expand:
+        validators = queryset_validators(request, join_requests, vary_on_user=True)
+        cached = not_modified(request, validators)
+        if cached:
+            return cached
+    
+    if wants_pagination(request):
+        rows, next_cursor = paginate_queryset(request, values.rows(join_requests), values.position)
+        response = Response(page_data(expand_join_requests(values.serialize(rows), expand), next_cursor))
+    elif wants_streaming(validators):
+        response = streaming_response(values, join_requests)
+    else:
+        response = Response(expand_join_requests(values.data(join_requests), expand))
+    return set_validators(response, validators) if validators else response
 
+@query_budget(GET=2, PATCH=3, PUT=3)
 @api_view(['GET', 'PATCH', 'PUT'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([IsAuthenticatedWithProfile])
@@ -277,14 +525,27 @@ def profile_detail(request, user_id):
     """
     Get or update a profile.
     """
+    # Profiles read the same for every caller, so GETs share get_profile's cache
+    if request.method == 'GET':
+        fields = parse_fields(request, ProfileSerializer)
+        cache_key = response_cache_key(request, f'profile:{user_id}')
+        cached = _cached_read(request, cache_key)
+        if cached:
+            return cached
+    
     try:
         profile = Profile.objects.get(user_id=user_id)
     except Profile.DoesNotExist:
         return Response({"detail": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = ProfileSerializer(profile)
-        return Response(serializer.data)
+        validators = object_validators(request, profile)
+        cached = not_modified(request, validators)
+        if cached:
+            return cached
+        data = select_fields(ProfileSerializer(profile).data, fields)
+        cache_response(cache_key, data, validators)
+        return set_validators(Response(data), validators)
     
     elif request.method in ['PATCH', 'PUT']:
         # Verify user is updating their own profile
@@ -296,5 +557,64 @@ def profile_detail(request, user_id):
         serializer = ProfileSerializer(profile, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            invalidate_profile(user_id)
+            invalidate_responses(f'profile:{user_id}')
             return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+# Delta sync
+@query_budget(4)
+@api_view(['GET'])
+@authentication_classes([SupabaseAuthentication])
+@permission_classes([IsAuthenticatedWithProfile])
+def sync(request):
+    """
+    Return projects and the caller's join requests changed since ?since=,
+    plus the ids of those deleted (from tombstones). Without ?since= the
+    response is a full snapshot. Pass the returned cursor on the next call.
+    """
+    user_id = request.user.user_id
+    
+    # Taken before querying, and rewound by a small overlap so rows committed
+    # by transactions that started earlier are not skipped. Re-sent rows are
+    # harmless: clients upsert by id.
+    now = timezone.now()
+    next_cursor = encode_cursor([now - timedelta(seconds=getattr(settings, 'SYNC_OVERLAP_SECONDS', 5))])
+    
+    projects = Project.objects.all()
+    join_requests = JoinRequest.objects.filter(Q(sender_id=user_id) | Q(receiver_id=user_id))
+    deleted = {'projects': [], 'join_requests': []}
+    
+    since_param = request.query_params.get('since')
+    if since_param:
+        try:
+            # An aware datetime, whatever the client sent
+            [since] = decode_position(since_param, ['updated_at'])
+        except ValidationError:
+            return Response({"detail": "Invalid since cursor"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Tombstones older than the retention window may be pruned already
+        retention = timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+        if since < now - retention:
+            return Response({"detail": "Sync cursor expired, fetch a full snapshot"}, status=status.HTTP_410_GONE)
+        
+        projects = projects.filter(updated_at__gt=since)
+        join_requests = join_requests.filter(updated_at__gt=since)
+        # Deleted projects are public; deleted join requests are only reported to their two users
+        own_join_requests = Q(model=JoinRequest._meta.model_name) & (Q(sender_id=user_id) | Q(receiver_id=user_id))
+        tombstones = Tombstone.objects.filter(
+            Q(model=Project._meta.model_name) | own_join_requests, deleted_at__gt=since
+        ).values_list('model', 'object_id')
+        for model, object_id in tombstones:
+            if model == Project._meta.model_name:
+                deleted['projects'].append(object_id)
+            elif model == JoinRequest._meta.model_name:
+                deleted['join_requests'].append(object_id)
+    
+    return Response({
+        'projects': project_feed_values.data(projects.order_by('updated_at')),
+        'join_requests': join_request_values.data(join_requests.order_by('updated_at')),
+        'deleted': deleted,
+        'cursor': next_cursor,
+        'full': not since_param,
+    })
@@ -0,0 +1,37 @@
+import 'package:frontend/models/join_request.dart';
+import 'package:frontend/models/profile.dart';
+import 'package:frontend/models/project.dart';
+
+// Everything the profile screen shows, returned by /me/dashboard/
+class Dashboard {
+  final Profile profile;
+  final List<Project> projects;
+  final List<JoinRequest> receivedRequests;
+  final List<JoinRequest> sentRequests;
+  final int pendingReceived;
+  final int pendingSent;
+
+  Dashboard({
+    required this.profile,
+    required this.projects,
+    required this.receivedRequests,
+    required this.sentRequests,
+    required this.pendingReceived,
+    required this.pendingSent,
+  });
+
+  factory Dashboard.fromJson(Map<String, dynamic> json) {
+    final List projects = json['projects'];
+    final List received = json['received_requests'];
+    final List sent = json['sent_requests'];
+    return Dashboard(
+      profile: Profile.fromJson(json['profile']),
+      projects: projects.map((item) => Project.fromJson(item)).toList(),
+      receivedRequests:
+          received.map((item) => JoinRequest.fromJson(item)).toList(),
+      sentRequests: sent.map((item) => JoinRequest.fromJson(item)).toList(),
+      pendingReceived: json['counts']['pending_received'],
+      pendingSent: json['counts']['pending_sent'],
+    );
+  }
+}
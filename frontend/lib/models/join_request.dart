@@ -1,3 +1,6 @@
+import 'package:frontend/models/profile.dart';
+import 'package:frontend/models/project.dart';
+
 class JoinRequest {
   final int? id;
   final int projectId;
@@ -8,6 +11,11 @@ class JoinRequest {
   final DateTime createdAt;
   final DateTime updatedAt;
 
+  // Related objects, present when the list was fetched with ?expand=
+  final Profile? sender;
+  final Profile? receiver;
+  final Project? project;
+
   JoinRequest({
     this.id,
     required this.projectId,
@@ -17,6 +25,9 @@ class JoinRequest {
     required this.status,
     required this.createdAt,
     required this.updatedAt,
+    this.sender,
+    this.receiver,
+    this.project,
   });
 
   factory JoinRequest.fromJson(Map<String, dynamic> json) {
@@ -29,6 +40,11 @@ class JoinRequest {
       status: json['status'],
       createdAt: DateTime.parse(json['created_at']),
       updatedAt: DateTime.parse(json['updated_at']),
+      sender: json['sender'] != null ? Profile.fromJson(json['sender']) : null,
+      receiver:
+          json['receiver'] != null ? Profile.fromJson(json['receiver']) : null,
+      project:
+          json['project'] != null ? Project.fromJson(json['project']) : null,
     );
   }
 
@@ -55,3 +55,24 @@ class Project {
     );
   }
 }
+
+// One page of the project feed returned when pagination is requested
+class ProjectPage {
+  final List<Project> projects;
+  final String? nextCursor;
+
+  ProjectPage({
+    required this.projects,
+    this.nextCursor,
+  });
+
+  bool get hasMore => nextCursor != null;
+
+  factory ProjectPage.fromJson(Map<String, dynamic> json) {
+    final List results = json['results'];
+    return ProjectPage(
+      projects: results.map((item) => Project.fromJson(item)).toList(),
+      nextCursor: json['next'],
+    );
+  }
+}
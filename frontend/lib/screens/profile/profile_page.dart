@@ -84,17 +84,12 @@ class ProfilePageState extends State<ProfilePage>
         throw Exception('User not authenticated');
       }
 
-      // Load profile
-      _profile = await _apiService.getProfile(userId);
-
-      // Load user projects
-      _userProjects = await _apiService.getUserProjects(userId);
-
-      // Load received join requests
-      _receivedRequests = await _apiService.getReceivedJoinRequests(userId);
-
-      // Load sent join requests
-      _sentRequests = await _apiService.getSentJoinRequests();
+      // Load profile, projects and join requests in a single round trip
+      final dashboard = await _apiService.getDashboard();
+      _profile = dashboard.profile;
+      _userProjects = dashboard.projects;
+      _receivedRequests = dashboard.receivedRequests;
+      _sentRequests = dashboard.sentRequests;
 
       if (!mounted) return;
 
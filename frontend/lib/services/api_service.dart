@@ -10,6 +10,7 @@ import 'package:frontend/utils/constants.dart';
 import 'package:frontend/models/profile.dart';
 import 'package:frontend/models/project.dart';
 import 'package:frontend/models/join_request.dart';
+import 'package:frontend/models/dashboard.dart';
 import 'package:frontend/utils/error_handler.dart';
 import 'package:flutter/foundation.dart';
 
@@ -160,6 +161,27 @@ class ApiService {
     }
   }
 
+  // Get the current user's profile, projects and join requests in one call
+  Future<Dashboard> getDashboard() async {
+    try {
+      final headers = await _getHeaders();
+      safeLog('Fetching dashboard');
+
+      final response = await http.get(
+        Uri.parse(
+            '$apiBaseUrl${ApiEndpoints.dashboard}?expand=$joinRequestExpand'),
+        headers: headers,
+      );
+
+      safeLog('Dashboard response code: ${response.statusCode}');
+
+      return Dashboard.fromJson(_handleResponse(response));
+    } catch (e) {
+      ErrorHandler.logError('ApiService.getDashboard', e);
+      rethrow;
+    }
+  }
+
   // Create profile
   Future<Profile> createProfile(Profile profile) async {
     try {
@@ -248,6 +270,30 @@ class ApiService {
     }
   }
 
+  // Get one page of projects (homepage). Pass the previous page's
+  // nextCursor to fetch the following page.
+  Future<ProjectPage> getProjectsPage(
+      {String? query, String? cursor, int pageSize = 20}) async {
+    try {
+      final headers = await _getHeaders();
+      final params = <String, String>{'page_size': '$pageSize'};
+      if (query != null && query.isNotEmpty) params['query'] = query;
+      if (cursor != null) params['cursor'] = cursor;
+      final uri = Uri.parse('$apiBaseUrl${ApiEndpoints.homepage}')
+          .replace(queryParameters: params);
+
+      safeLog('Fetching projects page${query != null ? ' with query' : ''}');
+
+      final response = await http.get(uri, headers: headers);
+      safeLog('Projects page response code: ${response.statusCode}');
+
+      return ProjectPage.fromJson(_handleResponse(response));
+    } catch (e) {
+      ErrorHandler.logError('ApiService.getProjectsPage', e);
+      rethrow;
+    }
+  }
+
   // Create project
   Future<Project> createProject(Project project) async {
     try {
@@ -357,6 +403,9 @@ class ApiService {
 
   // JOIN REQUEST ENDPOINTS
 
+  // Related objects inlined into join request lists so cards need no extra calls
+  static const String joinRequestExpand = 'sender,receiver,project';
+
   // Create join request
   Future<JoinRequest> createJoinRequest(int projectId, String? message) async {
     try {
@@ -413,7 +462,8 @@ class ApiService {
       safeLog('Fetching received join requests for user ID: $userId');
 
       final response = await http.get(
-        Uri.parse('$apiBaseUrl${ApiEndpoints.receivedJoinRequests}$userId/'),
+        Uri.parse(
+            '$apiBaseUrl${ApiEndpoints.receivedJoinRequests}$userId/?expand=$joinRequestExpand'),
         headers: headers,
       );
 
@@ -434,7 +484,8 @@ class ApiService {
       safeLog('Fetching sent join requests');
 
       final response = await http.get(
-        Uri.parse('$apiBaseUrl${ApiEndpoints.sentJoinRequests}'),
+        Uri.parse(
+            '$apiBaseUrl${ApiEndpoints.sentJoinRequests}?expand=$joinRequestExpand'),
         headers: headers,
       );
 
@@ -16,6 +16,7 @@ class ApiEndpoints {
   static const String getProfile = '/profile/'; // + user_id
   static const String updateProfile = '/profile/'; // + user_id
   static const String getCurrentUser = '/me/';
+  static const String dashboard = '/me/dashboard/';
 
   // Project endpoints
   static const String createProject = '/create-project/';
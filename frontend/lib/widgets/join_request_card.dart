@@ -45,16 +45,17 @@ class _JoinRequestCardState extends State<JoinRequestCard> {
     });
 
     try {
-      // Load sender profile
-      _senderProfile = await _apiService.getProfile(widget.request.senderId);
+      // Load sender profile (already embedded when the list was expanded)
+      _senderProfile = widget.request.sender ??
+          await _apiService.getProfile(widget.request.senderId);
 
       // Load receiver profile
-      _receiverProfile =
+      _receiverProfile = widget.request.receiver ??
           await _apiService.getProfile(widget.request.receiverId);
 
       // Load project details to get the title
       try {
-        final project =
+        final project = widget.request.project ??
             await _apiService.getProjectDetails(widget.request.projectId);
         _projectTitle = project.title;
       } catch (e) {